@@ -1,6 +1,6 @@
 import os
-import pickle
 from wpilib.command import CommandGroup
+from utilities.asset_store import ASSET_STORE
 from utilities.drivetrain_path_follower import DrivetrainPathFollower
 
 
@@ -10,10 +10,8 @@ class AutonForward(CommandGroup):
         super().__init__()
         self.requires(robot.driveTrain)
 
-        # Read up the pickled path file of trajectories
-        with open(os.path.join(os.path.dirname(__file__),
-                               'forward.pickle'), "rb") as fp:
-            path = pickle.load(fp)
+        # Read up the trajectory files of the paths
+        path = ASSET_STORE.loadTrajectory(os.path.join(os.path.dirname(__file__), 'forward.traj'))
 
         # Add commands to run
         self.addSequential(DrivetrainPathFollower(robot, path, False))
@@ -1,6 +1,6 @@
 import os
-import pickle
 from wpilib.command import CommandGroup
+from utilities.asset_store import ASSET_STORE
 from utilities.drivetrain_path_follower import DrivetrainPathFollower
 from commands.shoot_cube_into_scale import ShootCubeIntoScale
 
@@ -11,9 +11,8 @@ class AutonLeftStartLeftScale(CommandGroup):
         super().__init__()
         self.requires(robot.driveTrain)
 
-        # Read up the pickled path file of trajectories
-        with open(os.path.join(os.path.dirname(__file__), 'left_start_left_scale.pickle'), "rb") as fp:
-            path = pickle.load(fp)
+        # Read up the trajectory files of the paths
+        path = ASSET_STORE.loadTrajectory(os.path.join(os.path.dirname(__file__), 'left_start_left_scale.traj'))
 
         # Add commands to run
         self.addSequential(DrivetrainPathFollower(robot, path, False))
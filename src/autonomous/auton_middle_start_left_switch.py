@@ -1,6 +1,6 @@
 import os
-import pickle
 from wpilib.command import CommandGroup
+from utilities.asset_store import ASSET_STORE
 from utilities.drivetrain_path_follower import DrivetrainPathFollower
 from commands.boom_to_switch import BoomToSwitch
 from commands.boom_to_intake import BoomToIntake
@@ -15,27 +15,14 @@ class AutonMiddleStartLeftSwitch(CommandGroup):
     def __init__(self, robot):
         super().__init__()
         self.requires(robot.driveTrain)
+        self.robot = robot
 
-        # Read up the pickled path file of trajectories
-        with open(os.path.join(os.path.dirname(__file__),
-                               'middle_start_left_switch.pickle'), "rb") as fp:
-            path = pickle.load(fp)
-        with open(os.path.join(os.path.dirname(__file__),
-                               'left_switch_cube_retrieval.pickle'), "rb") as fp:
-            cubePosPath = pickle.load(fp)
-        with open(os.path.join(os.path.dirname(__file__),
-                               'left_cube_retrieval_cube_get.pickle'), "rb") as fp:
-            cubeGetPath = pickle.load(fp)
-        with open(os.path.join(os.path.dirname(__file__),
-                               'left_cube_get_switch_prep.pickle'), "rb") as fp:
-            cubeSwitchPrepPath = pickle.load(fp)
-        with open(os.path.join(os.path.dirname(__file__),
-                               'switch_prep_left_switch.pickle'), "rb") as fp:
-            cubeSwitchPath = pickle.load(fp)
-
-        # Zero gyro and encoders
-        robot.driveTrain.zeroGyro()
-        robot.driveTrain.zeroQuadratureEncoder()
+        # Read up the trajectory files of the paths
+        path = ASSET_STORE.loadTrajectory(os.path.join(os.path.dirname(__file__), 'middle_start_left_switch.traj'))
+        cubePosPath = ASSET_STORE.loadTrajectory(os.path.join(os.path.dirname(__file__), 'left_switch_cube_retrieval.traj'))
+        cubeGetPath = ASSET_STORE.loadTrajectory(os.path.join(os.path.dirname(__file__), 'left_cube_retrieval_cube_get.traj'))
+        cubeSwitchPrepPath = ASSET_STORE.loadTrajectory(os.path.join(os.path.dirname(__file__), 'left_cube_get_switch_prep.traj'))
+        cubeSwitchPath = ASSET_STORE.loadTrajectory(os.path.join(os.path.dirname(__file__), 'switch_prep_left_switch.traj'))
 
         # Go to switch
         self.addParallel(BoomToSwitch(robot))
@@ -59,3 +46,10 @@ class AutonMiddleStartLeftSwitch(CommandGroup):
         # Go to switch
         self.addSequential(DrivetrainPathFollower(robot, cubeSwitchPath, False, True))
         self.addSequential(ShootCubeIntoSwitch(robot))
+
+    def initialize(self):
+        """
+        Zero the gyro and encoders when the routine starts.  The routine is built during robotInit, long before it is run.
+        """
+        self.robot.driveTrain.zeroGyro()
+        self.robot.driveTrain.zeroQuadratureEncoder()
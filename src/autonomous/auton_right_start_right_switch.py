@@ -1,6 +1,6 @@
 import os
-import pickle
 from wpilib.command import CommandGroup
+from utilities.asset_store import ASSET_STORE
 from commands.shoot_cube_into_switch import ShootCubeIntoSwitch
 from commands.boom_to_switch import BoomToSwitch
 from utilities.drivetrain_path_follower import DrivetrainPathFollower
@@ -12,9 +12,8 @@ class AutonRightStartRightSwitch(CommandGroup):
         super().__init__()
         self.requires(robot.driveTrain)
 
-        # Read up the pickled path file of trajectories
-        with open(os.path.join(os.path.dirname(__file__), 'right_start_right_switch.pickle'), "rb") as fp:
-            path = pickle.load(fp)
+        # Read up the trajectory files of the paths
+        path = ASSET_STORE.loadTrajectory(os.path.join(os.path.dirname(__file__), 'right_start_right_switch.traj'))
 
         # Add commands to run
         self.addParallel(BoomToSwitch(robot))
@@ -47,4 +47,4 @@ waypoints = [
      pf.Waypoint(X_WALL_TO_SCALE_NEAR + math.sin(pf.d2r(20.0)) * 0.5 * Y_ROBOT_WIDTH - 0.5 * X_ROBOT_LENGTH, Y_WALL_TO_SCALE_FAR,                  pf.d2r(-20.0)),
 ]
 
-GenerateTalonMotionProfileArcPath(os.path.dirname(__file__), "left_start_left_scale", waypoints, settings)
+GenerateTalonMotionProfileArcPath(os.path.dirname(__file__), "right_start_right_scale", waypoints, settings)
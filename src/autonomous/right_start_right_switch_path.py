@@ -44,4 +44,4 @@ waypoints = [
     pf.Waypoint(X_WALL_TO_SWITCH_CENTER,      24 / 12 + yOffset, pf.d2r(-90.0)),
 ]
 
-GenerateTalonMotionProfileArcPath(os.path.dirname(__file__), "right_start_right_scale", waypoints, settings)
+GenerateTalonMotionProfileArcPath(os.path.dirname(__file__), "right_start_right_switch", waypoints, settings)
@@ -15,6 +15,10 @@ class BoomJoystick(Command):
         self.requires(robot.boom)
         self.robot = robot
 
+    def initialize(self):
+        # Stop any motion profile an interrupted boom command left running
+        self.robot.boom.releaseMotionProfile()
+
     def execute(self):
         # Get the joystick inputs.  -'ve is up and +'ve is down, joytick up returns -'ve
         boomThrottle = -self.robot.oi.operatorJoystick.getY()
@@ -0,0 +1,107 @@
+from wpilib.command import Command
+from utilities.motion_profile_controller import MotionProfileController
+from utilities.boom_profile import LoadBoomMovePoints
+from constants import BOOM_STATE, LOGGER_LEVEL
+import logging
+logger = logging.getLogger(__name__)
+logger.setLevel(LOGGER_LEVEL)
+
+
+class BoomMotionProfileCommand(Command):
+    """
+    The base of the commands that move the boom to one of its positions with a motion profile.  A subclass passes the boom state it moves to,
+    the target position in degrees, and the canned motion profile points for each boom state it can start from.
+
+    If the last boom command was interrupted part way through its motion profile, that motion profile is retargeted.  Otherwise, if the boom
+    is where one of the canned motion profiles starts, that is run, and if it isn't, a motion profile is generated from where the pot is now.
+    """
+    def __init__(self, robot, target_state, target_position_deg, canned_points):
+        super().__init__()
+        self.requires(robot.boom)
+        self.robot = robot
+        self.finished = True
+        self.motionProfileController = None
+        self.targetState = target_state
+        self.targetPositionDeg = target_position_deg
+        self.cannedPoints = canned_points
+
+        # The pot position where the canned motion profiles from each boom state start
+        self.startPositionsDeg = {BOOM_STATE.Intake: robot.boom.POT_INTAKE_POSITION_DEG,
+                                  BOOM_STATE.Switch: robot.boom.POT_SWITCH_POSITION_DEG,
+                                  BOOM_STATE.Scale: robot.boom.POT_SCALE_POSITION_DEG}
+        self.description = "Boom to %s Command" % (target_state.name)
+
+    def initialize(self):
+        self.finished = False
+
+        # Retarget the motion profile an interrupted boom command left running rather than stopping the boom and starting over
+        self.motionProfileController = self.robot.boom.retargetMotionProfile(self.targetPositionDeg)
+        if self.motionProfileController is not None:
+            logger.info("%s retargeted the running motion profile" % (self.description))
+            return
+
+        # The boom is at an unknown position or already at the target
+        points = self.cannedPoints.get(self.robot.boomState)
+        if points is None:
+            self._startProfileFromPot("BoomState: %s" % (self.robot.boomState))
+            return
+
+        # Double-check the pot to ensure the boom is where the canned motion profile starts
+        startPotError = abs(self.robot.boom.getPotPositionInDegrees() - self.startPositionsDeg[self.robot.boomState])
+        if startPotError < self.robot.boom.POT_ERROR_LIMIT:
+            logger.info("%s from the %s, startUnits %i" % (self.description, self.robot.boomState.name.lower(), self.robot.boom.getPotPosition()))
+            self.motionProfileController = MotionProfileController((self.robot.boom.talon,), (points,))
+            self.motionProfileController.start()
+        else:
+            self._startProfileFromPot("StartPotError: %3.1f" % (startPotError))
+
+    def _startProfileFromPot(self, reason):
+        """
+        This method will start a motion profile generated from where the pot is now, for when the boom isn't where one of the canned
+        motion profiles starts.
+        """
+        points = LoadBoomMovePoints(self.robot.boom, self.targetPositionDeg)
+        if points is None:
+            logger.info("%s not started - the boom is already at the %s" % (self.description, self.targetState.name.lower()))
+            self.finished = True
+            return
+
+        logger.info("%s using a generated motion profile - %s" % (self.description, reason))
+        self.motionProfileController = MotionProfileController((self.robot.boom.talon,), (points,))
+        self.motionProfileController.start()
+
+    def execute(self):
+        if not self.finished:
+            if self.motionProfileController.isFinished():
+                self.finished = True
+            else:
+                self.motionProfileController.control()
+
+            # Publish the boom telemetry
+            self.robot.boom.updateTelemetry()
+
+    def isFinished(self):
+        return self.finished
+
+    def interrupted(self):
+        # Leave a motion profile that is still running for the next boom command to retarget
+        if not self.finished and self.motionProfileController is not None:
+            self.robot.boom.handOffMotionProfile(self.motionProfileController, self.__class__.__name__)
+            self.motionProfileController = None
+            self.robot.boomState = BOOM_STATE.Unknown
+        else:
+            self.end()
+
+    def end(self):
+        endPotError = self.robot.boom.getPotPositionInDegrees() - self.targetPositionDeg
+        if abs(endPotError) < self.robot.boom.POT_ERROR_LIMIT:
+            self.robot.boomState = self.targetState
+        else:
+            self.robot.boomState = BOOM_STATE.Unknown
+            logger.warning("%s finish poorly - endPotError: %3.1f" % (self.description, endPotError))
+        self.robot.boom.initOpenLoop()
+
+        # Stop streaming and save the instrumentation of the motion profile, if one was run
+        if self.motionProfileController is not None:
+            self.motionProfileController.stop()
+            self.motionProfileController.getRecorder().dump(self.__class__.__name__)
@@ -1,6 +1,7 @@
 import os
 import pathfinder as pf
-from utilities.functions import GenerateMotionProfile
+from collections import namedtuple
+from utilities.functions import GenerateMotionProfile, GenerateTrajectory
 
 
 SAMPLE_PERIOD = 10                  # MS
@@ -12,9 +13,14 @@ POSITION_UNITS = 1023 * (1 / 10)    # 10-bit ADC / 10-turn pot...rotations
 VELOCITY_UNITS = 1023 / 100         # 10-bit ADC / 100ms...natural units of Talon velocity
 
 # Generate the path
-info, trajectory = pf.generate([pf.Waypoint(0.0, 0.0, 0.0), pf.Waypoint(DISTANCE, 0.0, 0.0)],
-                               pf.FIT_HERMITE_CUBIC, 1000000, SAMPLE_PERIOD / 1000, MAX_VELOCITY,
-                               MAX_ACCELERATION, MAX_JERK)
+PathFinderSettings = namedtuple("PathFinderSettings", ["order", "samples", "period", "maxVelocity", "maxAcceleration", "maxJerk"])
+settings = PathFinderSettings(order=pf.FIT_HERMITE_CUBIC,
+                              samples=1000000,
+                              period=SAMPLE_PERIOD / 1000,
+                              maxVelocity=MAX_VELOCITY,
+                              maxAcceleration=MAX_ACCELERATION,
+                              maxJerk=MAX_JERK)
+trajectory = GenerateTrajectory([pf.Waypoint(0.0, 0.0, 0.0), pf.Waypoint(DISTANCE, 0.0, 0.0)], settings)
 
 GenerateMotionProfile(os.path.dirname(__file__), "boom_switch_to_scale", trajectory,
                       POSITION_UNITS, VELOCITY_UNITS)
@@ -116,6 +116,8 @@ TALON_DEFAULT_MOTION_CONTROL_FRAME_PERIOD_MS = 10
 MISC CONSTANTS
 """
 FILE_OUTPUT_PATH = "C:\\Users\\ejmcc\\CIS4607\\git\\"
+MP_RECORDING_PATH = None    # Set to a directory (e.g. "/home/lvuser/mp_recordings") to save each motion profile run
+TELEMETRY_RECORDING_PATH = "/home/lvuser/telemetry"     # The RoboRIO directory for the match telemetry logs, None to turn them off
 
 
 class BOOM_STATE(enum.IntEnum):
@@ -126,3 +128,15 @@ class BOOM_STATE(enum.IntEnum):
     Switch = 1
     Intake = 2
     Unknown = 3
+
+
+class PATH_FOLLOWER(enum.IntEnum):
+    """
+    DRIVETRAIN PATH FOLLOWER SELECTION
+    """
+    MotionProfile = 0   # Stream the path to the Talon MPEs
+    Ramsete = 1         # Track the path on the RoboRIO (utilities/ramsete_controller.py)
+
+
+# The follower used by every drivetrain path that doesn't choose one, so both followers can be compared on the same autonomous routines
+DRIVETRAIN_PATH_FOLLOWER = PATH_FOLLOWER.MotionProfile
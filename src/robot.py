@@ -1,4 +1,4 @@
-from wpilib import Timer, TimedRobot, run, SendableChooser, CameraServer
+from wpilib import Timer, TimedRobot, run, SendableChooser, CameraServer, RobotController
 from wpilib.command import Scheduler
 from wpilib.driverstation import DriverStation
 from wpilib.smartdashboard import SmartDashboard
@@ -7,6 +7,9 @@ from subsystems.intake_motors import IntakeMotors
 from subsystems.drivetrain import DriveTrain
 from subsystems.boom import Boom
 from oi import OI
+from utilities.asset_store import ASSET_STORE
+from utilities.telemetry import TELEMETRY
+from utilities.telemetry_recorder import TELEMETRY_RECORDER
 from autonomous.auton_forward import AutonForward
 from autonomous.auton_left_start_left_scale import AutonLeftStartLeftScale
 from autonomous.auton_right_start_right_scale import AutonRightStartRightScale
@@ -22,6 +25,9 @@ logger.setLevel(LOGGER_LEVEL)
 
 class Pitchfork(TimedRobot):
 
+    # The robot is disabled for this long before the match telemetry log is closed
+    END_OF_MATCH_DISABLED_S = 5.0
+
     def robotInit(self):
         """
         Robot-wide initialization code goes here.  For the command-based programming framework,
@@ -101,8 +107,16 @@ class Pitchfork(TimedRobot):
                                          },
                                }
 
+        # Build every autonomous routine now.  The routine constructors read up all of their trajectory files and create their commands, which
+        # is too much work for the first autonomous loop.  autonomousInit is then just a dictionary lookup.
+        self.autonomousRoutines = {}
+        self.buildAutonomousRoutines(self.chooserOptions)
+        logger.info("Built %i autonomous routines" % (len(self.autonomousRoutines)))
+        ASSET_STORE.logStats()
+
         # Create a timer for data logging
         self.timer = Timer()
+        TELEMETRY_RECORDER.register("BatteryVoltage", RobotController.getInputVoltage)
 
         # Create the camera server
         CameraServer.launch()
@@ -124,6 +138,20 @@ class Pitchfork(TimedRobot):
         #                                   self.timer.get())
         #===========================================================================================
 
+    def buildAutonomousRoutines(self, options):
+        """
+        Walk the autonomous chooser options and create one instance of each routine class.  The instances are kept in the autonomousRoutines
+        dictionary, keyed on the routine class.
+        """
+        for option in options.values():
+            if 'command' not in option:
+                self.buildAutonomousRoutines(option)
+            elif option['command'] not in self.autonomousRoutines:
+                try:
+                    self.autonomousRoutines[option['command']] = option['command'](self)
+                except Exception:
+                    logger.exception("Failed to build autonomous routine %s" % (option['command'].__name__))
+
     def disabledInit(self):
         """
         Initialization code for disabled mode should go here.  This method will be called each
@@ -132,16 +160,28 @@ class Pitchfork(TimedRobot):
         self.timer.stop()
         self.timer.reset()
 
+        # The scheduler doesn't run while disabled, so end the running commands now.  This stops their motion profiles and anything left
+        # streaming by an interrupted boom command.
+        Scheduler.getInstance().removeAll()
+        self.boom.releaseMotionProfile()
+
+        self.disabledTime = Timer.getFPGATimestamp()
+
     def disabledPeriodic(self):
         """
         Periodic code for disabled mode should go here.  This method will be called every 20ms.
         """
+        # Finish the telemetry log of the match.  The short disabled period between autonomous and teleop stays in the same log.
+        if TELEMETRY_RECORDER.isRecording() and Timer.getFPGATimestamp() - self.disabledTime > self.END_OF_MATCH_DISABLED_S:
+            TELEMETRY_RECORDER.stop()
+
         if self.timer.running:
             self.timer.stop()
             self.timer.reset()
 
     def robotPeriodic(self):
-        pass
+        # Service the telemetry switch and mark the end of this loop's telemetry
+        TELEMETRY.periodic(self.timer.get())
 
     def autonomousInit(self):
         """
@@ -152,6 +192,7 @@ class Pitchfork(TimedRobot):
         self.scheduleAutonomous = True
         if not self.timer.running:
             self.timer.start()
+        TELEMETRY_RECORDER.start("autonomous")
 
         # The game specific data will be a 3-character string representing where the teams switch,
         # scale, switch are located.  For example, "LRR" means your teams closest switch is on the
@@ -165,7 +206,11 @@ class Pitchfork(TimedRobot):
         logger.info("Starting Position %s" % (self.startingPosition))
         logger.info("Scale Enable %s" % (self.scaleDisable))
         
-        self.autonCommand = self.chooserOptions[self.startingPosition][self.gameData[0]][self.gameData[1]][self.scaleDisable]['command'](self)
+        autonClass = self.chooserOptions[self.startingPosition][self.gameData[0]][self.gameData[1]][self.scaleDisable]['command']
+        self.autonCommand = self.autonomousRoutines.get(autonClass)
+        if self.autonCommand is None:
+            logger.warning("Autonomous routine %s was not built during robotInit" % (autonClass.__name__))
+            self.autonCommand = autonClass(self)
         self.autonCommand.start()
 
     def autonomousPeriodic(self):
@@ -182,6 +227,9 @@ class Pitchfork(TimedRobot):
         if not self.timer.running:
             self.timer.start()
 
+        # Keep recording into the autonomous log if this is the teleop period of the same match
+        TELEMETRY_RECORDER.start("teleop")
+
     def teleopPeriodic(self):
         """
         Periodic code for teleop mode should go here.  This method will be called every 20ms.
@@ -2,11 +2,23 @@ from wpilib.command import Subsystem
 from ctre.wpi_talonsrx import WPI_TalonSRX
 from ctre._impl.autogen.ctre_sim_enums import LimitSwitchSource, LimitSwitchNormal
 from commands.boom_joystick import BoomJoystick
+from utilities.boom_profile import BuildBoomRetargetPoints
+from utilities.telemetry import TELEMETRY
+from utilities.telemetry_recorder import TELEMETRY_RECORDER
 from constants import BOOM_MOTOR, LOGGER_LEVEL
 import logging
 logger = logging.getLogger(__name__)
 logger.setLevel(LOGGER_LEVEL)
 
+# The telemetry of the boom motion profiles, read from the boom subsystem
+BOOM_TELEMETRY = TELEMETRY.register("Boom", (
+    ("EncPos", lambda boom: boom.talon.getSensorCollection().getAnalogInRaw()),
+    ("ActPos", lambda boom: boom.talon.getActiveTrajectoryPosition()),
+    ("EncVel", lambda boom: boom.talon.getAnalogInVel()),
+    ("ActVel", lambda boom: boom.talon.getActiveTrajectoryVelocity()),
+    ("PrimaryTarget", lambda boom: boom.talon.getClosedLoopTarget(0)),
+    ("PrimaryError", lambda boom: boom.talon.getClosedLoopError(0))))
+
 
 class Boom(Subsystem):
     """
@@ -32,10 +44,21 @@ class Boom(Subsystem):
         # Map the CIM motors to the TalonSRX's
         self.talon = WPI_TalonSRX(BOOM_MOTOR)
 
+        # The motion profile left running by an interrupted boom command, and the name of that command
+        self.handedOffMotionProfile = None
+        self.handedOffName = None
+
         # Setup the default motor controller setup
         self.initOpenLoop()
         self.initClosedLoop()
 
+        # Record the boom in the match telemetry logs
+        TELEMETRY_RECORDER.register("BoomPot", self.getPotPosition)
+        TELEMETRY_RECORDER.register("BoomActPos", self.talon.getActiveTrajectoryPosition)
+        TELEMETRY_RECORDER.register("BoomPrimaryError", lambda: self.talon.getClosedLoopError(0))
+        TELEMETRY_RECORDER.register("BoomBottomBufferCount", lambda: self.talon.getMotionProfileStatus().btmBufferCnt)
+        TELEMETRY_RECORDER.register("BoomVoltage", self.talon.getMotorOutputVoltage)
+
     def initOpenLoop(self):
         """
         This method will setup the default settings of the motor controllers.
@@ -139,6 +162,62 @@ class Boom(Subsystem):
         """
         return self.talon.getClosedLoopError(0)
 
+    def updateTelemetry(self):
+        """
+        This method will publish the boom telemetry.  It does nothing unless telemetry is switched on.
+        """
+        BOOM_TELEMETRY.update(self)
+
+    def handOffMotionProfile(self, motion_profile_controller, name):
+        """
+        This method is called by a boom command that is interrupted part way through a motion profile.  The motion profile is left running so
+        the next boom command can retarget it instead of stopping the boom.  Until then periodic() services it.
+        """
+        self.releaseMotionProfile()
+        self.handedOffMotionProfile = motion_profile_controller
+        self.handedOffName = name
+
+    def retargetMotionProfile(self, end_position_deg):
+        """
+        This method will splice a move to the end position onto the motion profile handed off by an interrupted boom command and return the
+        motion profile controller, which then belongs to the caller.  Returns None if there is no motion profile to retarget or it can't be
+        retargeted, in which case it has been stopped.
+        """
+        motionProfileController = self.handedOffMotionProfile
+        if motionProfileController is None:
+            return None
+        self.handedOffMotionProfile = None
+        if motionProfileController.splice((BuildBoomRetargetPoints(self, end_position_deg),)):
+            return motionProfileController
+        self._stopMotionProfile(motionProfileController, self.handedOffName)
+        return None
+
+    def releaseMotionProfile(self):
+        """
+        This method will stop the motion profile handed off by an interrupted boom command, if there is one, and put the boom back in open
+        loop.  Anything else that takes the boom has to call this first.
+        """
+        if self.handedOffMotionProfile is not None:
+            self._stopMotionProfile(self.handedOffMotionProfile, self.handedOffName)
+            self.handedOffMotionProfile = None
+            self.initOpenLoop()
+
+    def periodic(self):
+        """
+        This method is called by the scheduler every loop.  Nothing calls control() on a handed off motion profile, so it is called here to keep
+        the end of profile and loop timeout handling running, and the motion profile is released once it is finished.
+        """
+        if self.handedOffMotionProfile is not None:
+            if self.handedOffMotionProfile.isFinished():
+                logger.info("Handed off %s motion profile finished" % (self.handedOffName))
+                self.releaseMotionProfile()
+            else:
+                self.handedOffMotionProfile.control()
+
+    def _stopMotionProfile(self, motion_profile_controller, name):
+        motion_profile_controller.stop()
+        motion_profile_controller.getRecorder().dump(name)
+
     def initDefaultCommand(self):
         """
         This method will set the default command for this subsystem.
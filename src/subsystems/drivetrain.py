@@ -5,6 +5,7 @@ from ctre.wpi_talonsrx import WPI_TalonSRX
 from ctre.pigeonimu import PigeonIMU
 from ctre._impl.autogen.ctre_sim_enums import RemoteSensorSource
 from commands.drive_joystick import DriveJoystick
+from utilities.telemetry_recorder import TELEMETRY_RECORDER
 from constants import DRIVETRAIN_FRONT_LEFT_MOTOR, DRIVETRAIN_REAR_LEFT_MOTOR, DRIVETRAIN_PIGEON, \
     DRIVETRAIN_FRONT_RIGHT_MOTOR, DRIVETRAIN_REAR_RIGHT_MOTOR, LOGGER_LEVEL, \
     TALON_DEFAULT_QUADRATURE_STATUS_FRAME_PERIOD_MS, TALON_DEFAULT_MOTION_CONTROL_FRAME_PERIOD_MS
@@ -46,6 +47,17 @@ class DriveTrain(Subsystem):
         # Setup the default motor controller setup
         self.initControllerSetup()
 
+        # Record the drivetrain in the match telemetry logs
+        for side, talon in (("Left", self.leftTalon), ("Right", self.rightTalon)):
+            TELEMETRY_RECORDER.register(side + "EncPos", lambda talon=talon: talon.getSelectedSensorPosition(0))
+            TELEMETRY_RECORDER.register(side + "EncVel", lambda talon=talon: talon.getSelectedSensorVelocity(0))
+            TELEMETRY_RECORDER.register(side + "PrimaryError", lambda talon=talon: talon.getClosedLoopError(0))
+            TELEMETRY_RECORDER.register(side + "SecondaryError", lambda talon=talon: talon.getClosedLoopError(1))
+            TELEMETRY_RECORDER.register(side + "TopBufferCount", talon.getMotionProfileTopLevelBufferCount)
+            TELEMETRY_RECORDER.register(side + "BottomBufferCount", lambda talon=talon: talon.getMotionProfileStatus().btmBufferCnt)
+            TELEMETRY_RECORDER.register(side + "Voltage", talon.getMotorOutputVoltage)
+        TELEMETRY_RECORDER.register("Yaw", self.getYaw)
+
     def initControllerSetup(self):
         """
         This method will setup the default settings of the motor controllers.
@@ -168,6 +180,12 @@ class DriveTrain(Subsystem):
         self.pigeonIMU.setYaw(0, 10)
         self.pigeonIMU.setAccumZAngle(0, 10)
 
+    def getYaw(self):
+        """
+        This method will return the yaw of the gyro in degrees.
+        """
+        return self.pigeonIMU.getYawPitchRoll()[0]
+
     def initQuadratureEncoder(self):
         """
         This method will initialize the encoders for quadrature feedback.
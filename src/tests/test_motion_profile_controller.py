@@ -0,0 +1,223 @@
+import csv
+import glob
+import os
+import pytest
+from ctre.wpi_talonsrx import WPI_TalonSRX
+import utilities.motion_profile_controller
+import utilities.motion_profile_recorder
+from utilities.motion_profile_controller import MotionProfileController
+from utilities.motion_profile_recorder import RECORDING_WRITER
+from utilities.talon_mp_emulator import TalonSRXEmulator
+from utilities.asset_store import ASSET_STORE
+from utilities.trajectory_points import LoadTrajectoryPoints
+from constants import PATH_FOLLOWER
+
+SRC_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+LOOP_MS = 20
+
+
+class SimulatedClock():
+    """
+    A clock for the emulated Talons that only moves when the test advances it, one millisecond at a time.
+    """
+    def __init__(self):
+        self.ms = 0
+
+    def __call__(self):
+        return self.ms / 1000
+
+
+class SimulatedScheduler():
+    """
+    A stand-in for NOTIFIER_SCHEDULER that runs the streaming callbacks on the simulated clock instead of a notifier thread.
+    """
+    def __init__(self, clock):
+        self._clock = clock
+        self._callbacks = {}
+
+    def register(self, callback, period_ms):
+        self._callbacks[callback] = [period_ms, self._clock.ms + period_ms]
+
+    def unregister(self, callback):
+        self._callbacks.pop(callback, None)
+
+    def setPeriod(self, callback, period_ms):
+        if callback not in self._callbacks:
+            return False
+        if self._callbacks[callback][0] != period_ms:
+            self.register(callback, period_ms)
+        return True
+
+    def isRegistered(self, callback):
+        return callback in self._callbacks
+
+    def run(self):
+        for callback, timing in list(self._callbacks.items()):
+            if self._callbacks.get(callback) is timing and timing[1] <= self._clock.ms:
+                timing[1] += timing[0]
+                callback()
+
+
+@pytest.fixture
+def clock():
+    return SimulatedClock()
+
+
+@pytest.fixture
+def scheduler(clock, monkeypatch):
+    scheduler = SimulatedScheduler(clock)
+    monkeypatch.setattr(utilities.motion_profile_controller, "NOTIFIER_SCHEDULER", scheduler)
+    return scheduler
+
+
+def RunSimulated(execute, is_finished, clock, scheduler, timeout_s=30):
+    """
+    Call execute() every 20ms loop, the same as the scheduler does for a command, and run the notifier callbacks every millisecond in between,
+    until is_finished() or the timeout.
+    """
+    while not is_finished():
+        assert clock.ms < timeout_s * 1000, "The motion profile did not finish in %is" % (timeout_s)
+        if clock.ms % LOOP_MS == 0:
+            execute()
+        clock.ms += 1
+        scheduler.run()
+
+
+def LoadPath(*names):
+    return ASSET_STORE.loadTrajectory(os.path.join(SRC_DIR, *names))
+
+
+def test_boom_motion_profile(clock, scheduler):
+    points = LoadTrajectoryPoints(LoadPath("commands", "boom_intake_to_scale.traj"), False, 1, 0)
+    talon = TalonSRXEmulator(clock=clock)
+    controller = MotionProfileController((talon,), (points,))
+
+    controller.start()
+    RunSimulated(controller.control, controller.isFinished, clock, scheduler)
+    controller.stop()
+
+    assert talon.underrunCnt == 0
+    assert controller.getRecorder().underrunCnt == 0
+    assert talon.processCnt == len(points)
+    assert talon.getSelectedSensorPosition(0) == int(points[-1].position)
+    assert not scheduler.isRegistered(controller._streamToMotionProfileBuffer)
+
+
+def test_empty_splice_is_rejected(clock, scheduler):
+    points = LoadTrajectoryPoints(LoadPath("commands", "boom_intake_to_scale.traj"), False, 1, 0)
+    talon = TalonSRXEmulator(clock=clock)
+    controller = MotionProfileController((talon,), (points,))
+
+    # Run until the Talon MPE is executing, the only time a splice is taken
+    controller.start()
+    RunSimulated(controller.control, lambda: controller._executing, clock, scheduler)
+    btmBufferCnt = talon.getMotionProfileStatus().btmBufferCnt
+    with pytest.raises(ValueError):
+        controller.splice(((),))
+    assert talon.getMotionProfileStatus().btmBufferCnt == btmBufferCnt
+
+    # The motion profile runs on to the end of the original points
+    RunSimulated(controller.control, controller.isFinished, clock, scheduler)
+    controller.stop()
+    assert talon.underrunCnt == 0
+    assert talon.getSelectedSensorPosition(0) == int(points[-1].position)
+
+
+def test_recording_is_saved_in_the_background(clock, scheduler, tmp_path, monkeypatch):
+    monkeypatch.setattr(utilities.motion_profile_recorder, "MP_RECORDING_PATH", str(tmp_path))
+    points = LoadTrajectoryPoints(LoadPath("commands", "boom_intake_to_switch.traj"), False, 0, 0)
+    controller = MotionProfileController((TalonSRXEmulator(clock=clock),), (points,))
+
+    controller.start()
+    RunSimulated(controller.control, controller.isFinished, clock, scheduler)
+    controller.stop()
+    loops = controller.getRecorder().loops
+
+    # The dumped copy is saved even though the recorder is reset for the next run straight away
+    controller.getRecorder().dump("BoomToSwitch")
+    controller.getRecorder().reset()
+    RECORDING_WRITER.flush()
+
+    fileNames = glob.glob(os.path.join(str(tmp_path), "BoomToSwitch_*[0-9].csv"))
+    assert len(fileNames) == 1
+    with open(fileNames[0], newline="") as fp:
+        rows = list(csv.reader(fp))
+    assert rows[0] == list(controller.getRecorder().columns)
+    assert len(rows) == loops + 1
+
+
+@pytest.mark.parametrize("reverse", [False, True])
+def test_drivetrain_motion_profile(clock, scheduler, reverse):
+    path = LoadPath("autonomous", "first_cube_middle_start_right_switch.traj")
+    points = (LoadTrajectoryPoints(path["left"], reverse, 0, 1),
+              LoadTrajectoryPoints(path["right"], reverse, 0, 1, heading_points=path["left"]))
+    talons = (TalonSRXEmulator(0, clock), TalonSRXEmulator(1, clock))
+    controller = MotionProfileController(talons, points, WPI_TalonSRX.ControlMode.MotionProfileArc, ("Left", "Right"))
+
+    controller.start()
+    RunSimulated(controller.control, controller.isFinished, clock, scheduler)
+    controller.stop()
+
+    for talon, sidePoints in zip(talons, points):
+        assert talon.underrunCnt == 0
+        assert talon.getSelectedSensorPosition(0) == int(sidePoints[-1].position)
+    assert controller.getRecorder().underrunCnt == 0
+
+    # The controller should finish within a few loops of the end of the path
+    pathMS = sum(int(point.timeDur) for point in points[0])
+    assert pathMS <= clock.ms < pathMS + 20 * LOOP_MS
+
+
+class EmulatedDriveTrain():
+    """
+    The parts of the drivetrain subsystem used by the path follower, with emulated Talons.
+    """
+    MP_SLOT0_SELECT = 0
+    MP_SLOT1_SELECT = 1
+
+    def __init__(self, clock):
+        self.leftTalon = TalonSRXEmulator(0, clock)
+        self.rightTalon = TalonSRXEmulator(1, clock)
+        self.streamRateMS = None
+        self.cleanedUp = False
+
+    def initiaizeDrivetrainMotionProfileControllers(self, stream_rate_ms):
+        self.streamRateMS = stream_rate_ms
+
+    def cleanUpDrivetrainMotionProfileControllers(self):
+        self.cleanedUp = True
+
+    def pidKludge(self):
+        pass
+
+
+class EmulatedRobot():
+    def __init__(self, clock):
+        self.driveTrain = EmulatedDriveTrain(clock)
+
+
+def test_drivetrain_path_follower(clock, scheduler):
+    from utilities.drivetrain_path_follower import DrivetrainPathFollower
+
+    robot = EmulatedRobot(clock)
+    path = LoadPath("autonomous", "first_cube_middle_start_right_switch.traj")
+    command = DrivetrainPathFollower(robot, path, False, follower=PATH_FOLLOWER.MotionProfile)
+
+    command.initialize()
+    RunSimulated(command.execute, command.isFinished, clock, scheduler)
+    command.end()
+
+    assert robot.driveTrain.streamRateMS == int(path["left"][0][3] / 2)
+    assert robot.driveTrain.cleanedUp
+    for talon, points in ((robot.driveTrain.leftTalon, command.leftPoints), (robot.driveTrain.rightTalon, command.rightPoints)):
+        assert talon.underrunCnt == 0
+        assert talon.getSelectedSensorPosition(0) == int(points[-1].position)
+    assert not scheduler.isRegistered(command.pathFollower._streamToMotionProfileBuffer)
+
+
+def test_emulator_getters_need_the_pid_index():
+    talon = TalonSRXEmulator()
+    for getter in (talon.getSelectedSensorPosition, talon.getSelectedSensorVelocity, talon.getClosedLoopError, talon.getClosedLoopTarget):
+        with pytest.raises(TypeError):
+            getter()
+        getter(0)
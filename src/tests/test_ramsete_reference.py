@@ -0,0 +1,54 @@
+import glob
+import math
+import os
+import numpy as np
+import pytest
+from utilities.trajectory_file import LoadTrajectoryFile
+from utilities.ramsete_controller import RamseteReference, FEET_PER_TICK
+from constants import ROBOT_WHEELBASE_FT
+
+SRC_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PATH_FILES = sorted(fileName for fileName in glob.glob(os.path.join(SRC_DIR, "autonomous", "*.traj"))
+                    if "left" in LoadTrajectoryFile(fileName))
+
+
+def WheelHeading(path, reverse):
+    """
+    The heading of a path in radians from the difference of the wheel positions, relative to the start.
+    """
+    sign = -1 if reverse else 1
+    left = sign * FEET_PER_TICK * np.asarray(path["left"].position, dtype=np.float64)
+    right = sign * FEET_PER_TICK * np.asarray(path["right"].position, dtype=np.float64)
+    theta = (right - left) / ROBOT_WHEELBASE_FT
+    return theta - theta[0]
+
+
+@pytest.mark.parametrize("reverse", [False, True])
+@pytest.mark.parametrize("file_name", PATH_FILES, ids=os.path.basename)
+def test_reference_heading_follows_the_wheels(file_name, reverse):
+    path = LoadTrajectoryFile(file_name)
+    reference = RamseteReference(path, reverse)
+    np.testing.assert_allclose(reference.table[:-1, 2], WheelHeading(path, reverse), atol=1e-9)
+
+
+@pytest.mark.parametrize("file_name", [fileName for fileName in PATH_FILES if not fileName.endswith("_reverse.traj")],
+                         ids=os.path.basename)
+def test_reference_heading_matches_generated_heading(file_name):
+    """
+    The paths built by the current GeneratePath hold the heading in rotations, which should agree with the wheels to within a degree.
+    """
+    path = LoadTrajectoryFile(file_name)
+    heading = np.asarray(path["left"].heading, dtype=np.float64)
+    if np.abs(heading).max() > 1.0:
+        pytest.skip("built with the older heading units")
+    reference = RamseteReference(path, False)
+    np.testing.assert_allclose(np.degrees(reference.table[:-1, 2]), (heading - heading[0]) * 360, atol=1.0)
+
+
+def test_reference_turns_with_the_path():
+    """
+    first_cube_middle_start_right_switch turns about 90 degrees to the right and back.
+    """
+    path = LoadTrajectoryFile(os.path.join(SRC_DIR, "autonomous", "first_cube_middle_start_right_switch.traj"))
+    reference = RamseteReference(path, False)
+    assert math.degrees(reference.table[:, 2].min()) == pytest.approx(-90.7, abs=1.0)
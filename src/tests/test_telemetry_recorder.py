@@ -0,0 +1,37 @@
+import glob
+import os
+import utilities.telemetry_recorder
+from utilities.telemetry_recorder import TelemetryRecorder, ReadTelemetryLog
+
+
+class ManualScheduler():
+    """
+    A stand-in for NOTIFIER_SCHEDULER that never calls back, so the test calls the sample callback itself.
+    """
+    def register(self, callback, period_ms):
+        pass
+
+    def unregister(self, callback):
+        pass
+
+
+def test_channel_registered_while_recording_waits_for_the_next_log(tmp_path, monkeypatch):
+    monkeypatch.setattr(utilities.telemetry_recorder, "NOTIFIER_SCHEDULER", ManualScheduler())
+    recorder = TelemetryRecorder(str(tmp_path))
+    recorder.register("First", lambda: 1.0)
+    recorder.register("Second", lambda: 2.0)
+    recorder.start("test")
+    recorder.register("Late", lambda: 3.0)
+
+    # Fill every row of the ring, the last row is where a wider row would run off the end
+    for _ in range(recorder.CAPACITY):
+        recorder._sample()
+    recorder.stop()
+    assert recorder._closed.wait(5.0)
+
+    fileNames = glob.glob(os.path.join(str(tmp_path), "*-test.tlog"))
+    assert len(fileNames) == 1
+    names, rows = ReadTelemetryLog(fileNames[0])
+    assert names == ["Time", "First", "Second"]
+    assert len(rows) == recorder.CAPACITY
+    assert all(row[1:] == [1.0, 2.0] for row in rows)
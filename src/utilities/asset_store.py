@@ -0,0 +1,72 @@
+import os
+import threading
+from utilities.trajectory_file import LoadTrajectoryFile
+from constants import LOGGER_LEVEL
+import logging
+logger = logging.getLogger(__name__)
+logger.setLevel(LOGGER_LEVEL)
+
+
+class AssetStore():
+    """
+    A process-wide store of the trajectory files used by the drivetrain paths and the boom motion profiles.  Each file is loaded once and the
+    same read-only trajectory object is handed to every command that asks for it.  Objects derived from the trajectories (such as the prebuilt
+    Talon trajectory points) are kept here as well.  Use the ASSET_STORE instance below instead of creating a new store.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._assets = {}
+        self._derived = {}
+        self.hits = 0
+        self.misses = 0
+        self.bytesResident = 0
+
+    def loadTrajectory(self, file_name):
+        """
+        This method will return the trajectory in the file, loading it the first time it is asked for.
+        """
+        key = os.path.normcase(os.path.abspath(file_name))
+        with self._lock:
+            asset = self._assets.get(key)
+            if asset is not None:
+                self.hits += 1
+                return asset
+            self.misses += 1
+            asset = LoadTrajectoryFile(key)
+            self._assets[key] = asset
+            self.bytesResident += os.path.getsize(key)
+            logger.debug("Loaded %s" % (key))
+            return asset
+
+    def getDerived(self, key, build):
+        """
+        This method will return the object derived from the trajectories under the key, calling build() to create it the first time the key is
+        asked for.  The key must identify everything the object depends on.
+        """
+        with self._lock:
+            if key in self._derived:
+                self.hits += 1
+                return self._derived[key]
+            self.misses += 1
+            derived = build()
+            self._derived[key] = derived
+            return derived
+
+    def getStats(self):
+        """
+        This method will return the store counters as a dictionary.
+        """
+        with self._lock:
+            return {"files": len(self._assets),
+                    "derived": len(self._derived),
+                    "hits": self.hits,
+                    "misses": self.misses,
+                    "bytesResident": self.bytesResident}
+
+    def logStats(self):
+        logger.info("Asset store: %(files)i files, %(derived)i derived, %(hits)i hits, %(misses)i misses, %(bytesResident)i bytes resident" %
+                    self.getStats())
+
+
+ASSET_STORE = AssetStore()
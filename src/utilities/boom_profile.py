@@ -0,0 +1,238 @@
+"""
+Jerk-limited (S-curve) motion profiles for the boom, generated on the RoboRIO from wherever the boom is to wherever it needs to be.
+
+The profile is a sequence of constant-jerk segments.  Each change of velocity is the classic three segment S-curve (jerk up, constant
+acceleration, jerk down), and the distance covered by one of these is just the average velocity times its duration, so the whole profile is
+solved in closed form except for the peak velocity of a short move, which is found by bisection on the closed-form distance.  Sampling the
+segments at the point period gives the same [position, velocity, heading, duration] points as the canned boom_*.traj files, so the result goes
+through BuildTrajectoryPoints() like any other path.
+
+Everything is in pot native units: ADC counts for position and counts / 100ms for velocity, the same as the canned boom motion profiles.
+"""
+import math
+from utilities.asset_store import ASSET_STORE
+from utilities.trajectory_points import BuildTrajectoryPoints
+from constants import LOGGER_LEVEL
+import logging
+logger = logging.getLogger(__name__)
+logger.setLevel(LOGGER_LEVEL)
+
+# The limits used to generate the canned boom motion profiles (see commands/boom_*_mp_generator.py), in pot counts and seconds
+POSITION_UNITS = 1023 * (1 / 10)                # 10-bit ADC / 10-turn pot...counts per rotation
+MAX_VELOCITY = 4.0 * POSITION_UNITS             # counts / second
+MAX_ACCELERATION = 8.0 * POSITION_UNITS         # counts / second^2
+MAX_JERK = 15.0 * POSITION_UNITS                # counts / second^3
+SAMPLE_PERIOD = 10                              # ms
+
+# The pot counts per degree, the inverse of Boom.getPotPositionInDegrees()
+POT_COUNTS_PER_DEG = 1024 / 3600
+
+# The start and end of a profile are rounded to this many counts before the profile is built, so nearby requests share the cached points.
+# Moves shorter than this are not worth running.
+POSITION_QUANTUM = 2
+
+# The motion profile controller waits for more than MIN_NUM_POINTS points in the Talon before enabling the profile, so short profiles are
+# padded out with points holding the end position.
+MIN_NUM_POINTS = 8
+
+
+def _VelocityChangeSegments(v1, v2, max_acceleration, max_jerk):
+    """
+    This function will return the (duration, jerk) segments of an S-curve velocity change from v1 to v2, starting and ending at zero
+    acceleration.
+    """
+    dv = abs(v2 - v1)
+    if dv == 0.0:
+        return []
+    jerk = math.copysign(max_jerk, v2 - v1)
+    if dv >= max_acceleration * max_acceleration / max_jerk:
+        jerkTime = max_acceleration / max_jerk
+        accelerationTime = dv / max_acceleration - jerkTime
+    else:
+        jerkTime = math.sqrt(dv / max_jerk)
+        accelerationTime = 0.0
+    return [(jerkTime, jerk), (accelerationTime, 0.0), (jerkTime, -jerk)]
+
+
+def _VelocityChangeTime(v1, v2, max_acceleration, max_jerk):
+    """
+    This function will return the duration of an S-curve velocity change from v1 to v2.
+    """
+    dv = abs(v2 - v1)
+    if dv >= max_acceleration * max_acceleration / max_jerk:
+        return dv / max_acceleration + max_acceleration / max_jerk
+    return 2.0 * math.sqrt(dv / max_jerk)
+
+
+def _VelocityChangeDistance(v1, v2, max_acceleration, max_jerk):
+    """
+    This function will return the distance covered by an S-curve velocity change from v1 to v2.  The S-curve is symmetric, so it is the
+    average velocity times the duration.
+    """
+    return 0.5 * (v1 + v2) * _VelocityChangeTime(v1, v2, max_acceleration, max_jerk)
+
+
+class SCurveProfile():
+    """
+    A jerk-limited profile from a start position and velocity (at zero acceleration) to rest at an end position.  If the boom can't stop
+    before the end position, or is moving away from it, the profile first brings it to rest and then moves it back.
+    """
+
+    BISECTION_ITERATIONS = 40
+
+    def __init__(self, start, end, start_velocity=0.0, max_velocity=MAX_VELOCITY, max_acceleration=MAX_ACCELERATION, max_jerk=MAX_JERK):
+        self.start = start
+        self.end = end
+        self.startVelocity = start_velocity
+        self._maxVelocity = max_velocity
+        self._maxAcceleration = max_acceleration
+        self._maxJerk = max_jerk
+
+        # Build the (duration, jerk) segments and then the position, velocity, and acceleration at the start of each one
+        self._segments = []
+        self._plan(start, start_velocity)
+        self._knots = []
+        self.duration = 0.0
+        position, velocity, acceleration = start, start_velocity, 0.0
+        for duration, jerk in self._segments:
+            self._knots.append((self.duration, position, velocity, acceleration, jerk))
+            position, velocity, acceleration = self._advance(position, velocity, acceleration, jerk, duration)
+            self.duration += duration
+
+    def _plan(self, position, velocity):
+        """
+        Append the segments that take the boom from the position and velocity to rest at the end position.
+        """
+        distance = self.end - position
+        direction = math.copysign(1.0, distance if distance != 0.0 else velocity)
+        distance = abs(distance)
+        speed = direction * velocity
+
+        # Moving away from the end, or too fast to stop before it.  Stop first and then plan again from where the boom comes to rest.
+        if speed < 0.0 or _VelocityChangeDistance(speed, 0.0, self._maxAcceleration, self._maxJerk) > distance:
+            self._segments.extend(_VelocityChangeSegments(velocity, 0.0, self._maxAcceleration, self._maxJerk))
+            stopPosition = position + direction * _VelocityChangeDistance(speed, 0.0, self._maxAcceleration, self._maxJerk)
+            if abs(self.end - stopPosition) > 1e-9:
+                self._plan(stopPosition, 0.0)
+            return
+
+        # Find the peak speed.  The distance is increasing in the peak speed, so bisect on it when the move is too short to reach the limit.
+        def Distance(peak):
+            return (_VelocityChangeDistance(speed, peak, self._maxAcceleration, self._maxJerk) +
+                    _VelocityChangeDistance(peak, 0.0, self._maxAcceleration, self._maxJerk))
+
+        peak = max(self._maxVelocity, speed)
+        if Distance(peak) > distance:
+            low, high = speed, peak
+            for _ in range(self.BISECTION_ITERATIONS):
+                peak = 0.5 * (low + high)
+                if Distance(peak) > distance:
+                    high = peak
+                else:
+                    low = peak
+            peak = low
+        cruiseTime = (distance - Distance(peak)) / peak if peak > 0.0 else 0.0
+
+        self._segments.extend(_VelocityChangeSegments(velocity, direction * peak, self._maxAcceleration, self._maxJerk))
+        self._segments.append((cruiseTime, 0.0))
+        self._segments.extend(_VelocityChangeSegments(direction * peak, 0.0, self._maxAcceleration, self._maxJerk))
+
+    @staticmethod
+    def _advance(position, velocity, acceleration, jerk, t):
+        return (position + velocity * t + acceleration * t * t / 2 + jerk * t * t * t / 6,
+                velocity + acceleration * t + jerk * t * t / 2,
+                acceleration + jerk * t)
+
+    def sample(self, t):
+        """
+        This method will return the (position, velocity) of the profile at time t in seconds.
+        """
+        if t >= self.duration or not self._knots:
+            return self.end, 0.0
+        index = len(self._knots) - 1
+        while self._knots[index][0] > t:
+            index -= 1
+        startTime, position, velocity, acceleration, jerk = self._knots[index]
+        position, velocity, _ = self._advance(position, velocity, acceleration, jerk, t - startTime)
+        return position, velocity
+
+    def getPoints(self, period_ms=SAMPLE_PERIOD):
+        """
+        This method will return the profile as [position, velocity, heading, duration] points (see BuildTrajectoryPoints()), sampled every
+        period_ms with velocity in counts / 100ms.  The last point is always at rest at the end position.
+        """
+        period = period_ms / 1000
+        numPoints = max(int(math.ceil(self.duration / period)) + 1, MIN_NUM_POINTS)
+        points = []
+        index = 0
+        for i in range(numPoints):
+            t = i * period
+            if t >= self.duration:
+                points.append([self.end, 0.0, 0.0, period_ms])
+                continue
+
+            # The samples are in time order, so walk the segments forward instead of searching for each one
+            while index + 1 < len(self._knots) and self._knots[index + 1][0] <= t:
+                index += 1
+            startTime, position, velocity, acceleration, jerk = self._knots[index]
+            position, velocity, _ = self._advance(position, velocity, acceleration, jerk, t - startTime)
+            points.append([position, velocity / 10, 0.0, period_ms])
+        return points
+
+
+def QuantizePosition(position):
+    """
+    This function will round a pot position to the profile cache quantum.
+    """
+    return int(round(position / POSITION_QUANTUM)) * POSITION_QUANTUM
+
+
+def LoadBoomProfilePoints(start_position, end_position, profile_slot_select0=0, profile_slot_select1=0):
+    """
+    This function will return the TrajectoryPoints of a boom move from the start to the end pot position (in counts).  Like the canned boom
+    profiles, the positions are relative to the start and the first point zeroes the position.  The start and end are quantized first and the
+    points are shared through the asset store, so a profile only depends on the quantized distance and is built once.  Returns None if the
+    move is shorter than the quantum.
+    """
+    distance = QuantizePosition(end_position) - QuantizePosition(start_position)
+    if distance == 0:
+        return None
+
+    def Build():
+        points = SCurveProfile(0.0, float(distance)).getPoints()
+        logger.debug("Built a %i count boom profile with %i points" % (distance, len(points)))
+        return BuildTrajectoryPoints(points, False, profile_slot_select0, profile_slot_select1)
+
+    return ASSET_STORE.getDerived(("BoomProfile", distance, profile_slot_select0, profile_slot_select1), Build)
+
+
+def LoadBoomMovePoints(boom, end_position_deg):
+    """
+    This function will return the TrajectoryPoints that move the boom from where the pot is now to the end position, given in degrees like
+    the Boom POT_*_POSITION_DEG constants.  The canned intake to scale profile runs on the multi-position PID slot, so any move that passes
+    the switch does as well.  Returns None if the boom is already there.
+    """
+    startPosition = boom.getPotPosition()
+    endPosition = end_position_deg * POT_COUNTS_PER_DEG
+    switchPosition = boom.POT_SWITCH_POSITION_DEG * POT_COUNTS_PER_DEG
+    profileSlotSelect0 = 1 if min(startPosition, endPosition) < switchPosition < max(startPosition, endPosition) else 0
+    return LoadBoomProfilePoints(startPosition, endPosition, profileSlotSelect0)
+
+
+def BuildBoomRetargetPoints(boom, end_position_deg):
+    """
+    This function will return the TrajectoryPoints that take the boom from the active point of its running motion profile to the end
+    position (in degrees), for splicing onto that motion profile (see MotionProfileController.splice()).  The new profile starts from the
+    active trajectory position and velocity, assuming no acceleration, and its first point is the one after the active point.  The running
+    profile zeroed the position at its start, so the end position is moved into the same frame, and the PID slots of the active point are
+    kept.  These depend on the state of the boom, so they are not cached.
+    """
+    talon = boom.talon
+    status = talon.getMotionProfileStatus()
+    startPosition = talon.getActiveTrajectoryPosition()
+    startVelocity = talon.getActiveTrajectoryVelocity() * 10
+    endPosition = end_position_deg * POT_COUNTS_PER_DEG - (boom.getPotPosition() - talon.getSelectedSensorPosition(0))
+    points = SCurveProfile(startPosition, endPosition, startVelocity).getPoints()[1:]
+    logger.debug("Retargeting the boom from %i counts at %3.1f counts/100ms to %i counts with %i points" %
+                 (startPosition, startVelocity / 10, endPosition, len(points)))
+    return BuildTrajectoryPoints(points, False, status.profileSlotSelect0, status.profileSlotSelect1, zero_position=False)
@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+"""
+This script will rebuild every autonomous path and boom motion profile in one go.  Each path script is run in a pool of worker processes with
+the review plots turned off, and a summary of the wall time per script is printed at the end.  Run it from the src directory:
+
+    python -m utilities.build_paths                     # Rebuild everything
+    python -m utilities.build_paths -j 4 left_start     # Rebuild the scripts with "left_start" in their name using 4 processes
+    python -m utilities.build_paths --no-cache          # Ignore the path cache (utilities/path_cache.py) and regenerate everything
+"""
+import argparse
+import glob
+import os
+import runpy
+import sys
+import time
+import traceback
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+SRC_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# The path definitions are standalone scripts that generate their path files when they are run
+SCRIPT_PATTERNS = [os.path.join("autonomous", "*_path.py"),
+                   os.path.join("autonomous", "*", "*.py"),
+                   os.path.join("commands", "boom_*_mp_generator.py")]
+
+
+def FindPathScripts(filters=None):
+    """
+    This function will return the path and boom motion profile scripts, optionally only the ones with one of the filter strings in their name.
+    """
+    scripts = []
+    for pattern in SCRIPT_PATTERNS:
+        for script in sorted(glob.glob(os.path.join(SRC_DIR, pattern))):
+            if os.path.basename(script).startswith("__"):
+                continue
+            if filters and not any(f in os.path.relpath(script, SRC_DIR) for f in filters):
+                continue
+            scripts.append(script)
+    return scripts
+
+
+def _initializeWorker(use_cache=True):
+    """
+    Run once in each worker process.  Select the off-screen matplotlib backend before pyplot is imported, turn off the review plots and set up
+    the path cache.
+    """
+    os.environ["MPLBACKEND"] = "Agg"
+    if SRC_DIR not in sys.path:
+        sys.path.insert(0, SRC_DIR)
+    import matplotlib
+    matplotlib.use("Agg")
+    from utilities import functions
+    functions.ENABLE_PLOTTING = False
+    functions.PATH_CACHE.enabled = use_cache
+
+
+def _runScript(script):
+    """
+    Run a single path script and return the script, the wall time, the files it wrote, the number of cache hits, and the traceback if it
+    failed.
+    """
+    import matplotlib.pyplot as plt
+    from utilities import functions
+    del functions.GENERATED_FILES[:]
+    hits = sum(functions.PATH_CACHE.hits.values())
+    error = None
+    start = time.perf_counter()
+    try:
+        runpy.run_path(script, run_name="__main__")
+    except Exception:
+        error = traceback.format_exc()
+    finally:
+        plt.close("all")
+    hits = sum(functions.PATH_CACHE.hits.values()) - hits
+    return script, time.perf_counter() - start, list(functions.GENERATED_FILES), hits, error
+
+
+def BuildPaths(scripts, jobs=None, use_cache=True):
+    """
+    This function will run the path scripts across a process pool and return a list of the results from _runScript().
+    """
+    results = []
+    with ProcessPoolExecutor(max_workers=jobs, initializer=_initializeWorker, initargs=(use_cache,)) as executor:
+        futures = [executor.submit(_runScript, script) for script in scripts]
+        for future in as_completed(futures):
+            script, wallTime, files, hits, error = future.result()
+            print("%-60s %7.2fs %s" % (os.path.relpath(script, SRC_DIR), wallTime,
+                                       "FAILED" if error else "ok (%i cache hits)" % (hits)))
+            results.append((script, wallTime, files, error))
+    return results
+
+
+def PrintSummary(results, totalTime):
+    """
+    This function will print the wall time of each script (slowest first), any failures, and any path file written by more than one script.
+    """
+    print("\n%-60s %8s  %s" % ("Script", "Time", "Files"))
+    for script, wallTime, files, error in sorted(results, key=lambda result: -result[1]):
+        print("%-60s %7.2fs  %s" % (os.path.relpath(script, SRC_DIR), wallTime,
+                                    ", ".join(os.path.basename(f) for f in files) if not error else "FAILED"))
+
+    for script, wallTime, files, error in results:
+        if error:
+            print("\nERROR: %s failed\n%s" % (os.path.relpath(script, SRC_DIR), error))
+
+    # Two scripts writing the same file means the result depends on which one finished last
+    writers = Counter(os.path.abspath(f) for _, _, files, _ in results for f in set(files))
+    for fileName, count in sorted(writers.items()):
+        if count > 1:
+            print("WARNING: %s is written by %i scripts" % (os.path.relpath(fileName, SRC_DIR), count))
+
+    print("\nBuilt %i scripts in %1.2fs (%1.2fs of script time)" %
+          (len(results), totalTime, sum(result[1] for result in results)))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Rebuild the autonomous paths and boom motion profiles.")
+    parser.add_argument("filters", nargs="*", help="only run the scripts with one of these strings in their name")
+    parser.add_argument("-j", "--jobs", type=int, default=None, help="number of worker processes (default: one per CPU)")
+    parser.add_argument("--no-cache", action="store_true", help="regenerate every path even if it is in the path cache")
+    parser.add_argument("-l", "--list", action="store_true", help="list the scripts and exit")
+    args = parser.parse_args()
+
+    scripts = FindPathScripts(args.filters)
+    if args.list:
+        for script in scripts:
+            print(os.path.relpath(script, SRC_DIR))
+        return 0
+
+    start = time.perf_counter()
+    results = BuildPaths(scripts, args.jobs, not args.no_cache)
+    PrintSummary(results, time.perf_counter() - start)
+    return 1 if any(result[3] for result in results) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,9 +1,13 @@
 #!/usr/bin/env python3
+import mmap
+import os
 import pickle
-from time import strftime
+import queue
+import struct
+import threading
+from time import strftime, monotonic, time
 from os import getcwd
-from os.path import join, split
-from csv import writer
+from os.path import join, split, splitext
 import matplotlib
 from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
 from matplotlib.backends.backend_tkagg import NavigationToolbar2TkAgg
@@ -11,8 +15,36 @@ from matplotlib.figure import Figure
 from tkinter import Tk, E, SUNKEN, W, ttk, LEFT, TOP, filedialog, END, RIGHT,StringVar, BOTH
 from networktables import NetworkTables
 from networktables.instance import NetworkTablesInstance
+import numpy as np
 import pandas as pd
 
+# The data log file format (little-endian).  The file is a header followed by records, and every record starts on an 8 byte boundary:
+#
+#     Header      magic "FRCD", version (uint16), reserved (uint16), start time (float64, seconds since the epoch)
+#     Record      kind (4 bytes), count (uint32), column count (uint32), payload size (uint32), then the payload
+#     "COLS"      count new columns, each a 47 byte ASCII name, zero padded, and a type code ("f" float32 or "d" float64)
+#     "ROWS"      count rows of every column defined so far, one column after another, each zero padded to a multiple of 8 bytes
+#
+# The writer appends a ROWS chunk every time it flushes, so a crash loses at most the chunk being written, and the reader stops at a record
+# that runs past the end of the file.  The columns of a chunk are contiguous, so the reader memory-maps the file and takes them straight out
+# of it.  Columns added during logging get their own COLS record and are NaN in the chunks before it.
+DATA_LOG_MAGIC = b"FRCD"
+DATA_LOG_VERSION = 1
+DATA_LOG_HEADER = struct.Struct("<4sHHd")
+DATA_LOG_RECORD = struct.Struct("<4sIII")
+DATA_LOG_NAME_SIZE = 47
+DATA_LOG_EXTENSION = ".dlog"
+COLUMNS_RECORD = b"COLS"
+ROWS_RECORD = b"ROWS"
+DATA_LOG_TYPES = {"f": np.dtype("<f4"), "d": np.dtype("<f8")}
+
+# The robot timer needs the float64 resolution, everything else is logged as float32
+FLOAT64_COLUMNS = ("TimeStamp",)
+
+
+def _padding(size):
+    return -size % 8
+
 
 class DataLoggerConfigData():
     """
@@ -44,15 +76,301 @@ class DataLoggerConfigData():
         root.destroy()
 
 
+class LogFileWriter():
+    """
+    Writes the log rows on its own thread.  The NetworkTables listener only puts each row on a bounded queue, and the writer thread drains the
+    queue in batches and appends a chunk to the data log file every FLUSH_PERIOD_S or FLUSH_ROWS rows, whichever comes first.  If the writer
+    falls behind and the queue is full, the row is dropped and counted rather than blocking the listener.  Blocks of packed frames (see
+    putBlock) and new columns (see addColumns) go through the same queue, so they stay in order with the rows.
+
+    A new file is started when the robot's TimeStamp goes back, which happens every time the robot is enabled again (the robot timer is reset
+    when it is disabled), and when the file reaches ROTATE_BYTES.  The files after the first are named after it with a count added.
+    """
+
+    QUEUE_SIZE = 10000
+    BATCH_SIZE = 500
+    FLUSH_PERIOD_S = 1.0
+    FLUSH_ROWS = 1000
+    ROTATE_BYTES = 64 * 1024 * 1024
+
+    def __init__(self, file_name, header):
+        self.file_name = file_name
+        self.file_names = []
+        self.header = list(header)
+        self.time_index = None
+        self.last_time_stamp = float("-inf")
+        self.chunk = []
+        self.chunk_rows = 0
+        self.rows = 0
+        self.dropped_rows = 0
+        self.flushes = 0
+        self.queue = queue.Queue(maxsize=self.QUEUE_SIZE)
+        self.lf = None
+        self.openFile(file_name)
+        self.thread = threading.Thread(target=self.run, daemon=True)
+        self.thread.start()
+
+    def put(self, row):
+        """
+        Queue a row to be written.  This never blocks.
+        """
+        try:
+            self.queue.put_nowait(row)
+        except queue.Full:
+            self.dropped_rows += 1
+
+    def putBlock(self, block):
+        """
+        Queue a NumPy block of rows to be written.  The block belongs to the writer after this.  This never blocks.
+        """
+        try:
+            self.queue.put_nowait(block)
+        except queue.Full:
+            self.dropped_rows += len(block)
+
+    def addColumns(self, names):
+        """
+        Add columns to the end of the rows.  The rows queued after this are longer than the rows before it.  This blocks if the queue is
+        full, since the rows after it can't be written without the columns.
+        """
+        self.queue.put(tuple(names))
+
+    def close(self):
+        """
+        Write out the queued rows and close the file.
+        """
+        self.queue.put(None)
+        self.thread.join()
+
+    def openFile(self, file_name):
+        """
+        Start a new data log file with all of the columns so far.
+        """
+        self.file_name = file_name
+        self.file_names.append(file_name)
+        self.lf = open(file_name, "wb")
+        self.lf.write(DATA_LOG_HEADER.pack(DATA_LOG_MAGIC, DATA_LOG_VERSION, 0, time()))
+        self.writeColumns(self.header, 0)
+        self.lf.flush()
+
+    def rotate(self):
+        """
+        Write out the chunk and continue in the next file.
+        """
+        self.writeChunk()
+        self.lf.close()
+        self.last_time_stamp = float("-inf")
+        base_name, extension = splitext(self.file_names[0])
+        self.openFile("%s-%i%s" % (base_name, len(self.file_names), extension))
+
+    def writeColumns(self, names, first_column):
+        """
+        Write a COLS record for the columns starting at first_column.
+        """
+        if not names:
+            return
+        payload = bytearray()
+        for name in names:
+            payload += name.encode("ascii", "replace")[:DATA_LOG_NAME_SIZE].ljust(DATA_LOG_NAME_SIZE, b"\0")
+            payload += b"d" if name in FLOAT64_COLUMNS else b"f"
+        self.lf.write(DATA_LOG_RECORD.pack(COLUMNS_RECORD, len(names), first_column + len(names), len(payload)))
+        self.lf.write(payload)
+        if "TimeStamp" in self.header:
+            self.time_index = self.header.index("TimeStamp")
+
+    def writeChunk(self):
+        """
+        Write the rows collected since the last chunk as a ROWS record.  Rows that are shorter than the header are padded with NaN.
+        """
+        if not self.chunk_rows:
+            return
+        values = np.full((self.chunk_rows, len(self.header)), np.nan)
+        row = 0
+        for item in self.chunk:
+            if isinstance(item, np.ndarray):
+                values[row:row + len(item), :item.shape[1]] = item
+                row += len(item)
+            else:
+                values[row, :len(item)] = item
+                row += 1
+        columns = [np.ascontiguousarray(values[:, i], DATA_LOG_TYPES["d" if name in FLOAT64_COLUMNS else "f"])
+                   for i, name in enumerate(self.header)]
+        size = sum(column.nbytes + _padding(column.nbytes) for column in columns)
+        self.lf.write(DATA_LOG_RECORD.pack(ROWS_RECORD, self.chunk_rows, len(columns), size))
+        for column in columns:
+            self.lf.write(column.tobytes())
+            self.lf.write(b"\0" * _padding(column.nbytes))
+        self.lf.flush()
+        self.flushes += 1
+        self.rows += self.chunk_rows
+        self.chunk = []
+        self.chunk_rows = 0
+        if self.lf.tell() >= self.ROTATE_BYTES:
+            self.rotate()
+
+    def addRows(self, item):
+        """
+        Add a row or a block of rows to the chunk, starting a new file wherever the robot's TimeStamp goes back.
+        """
+        if self.time_index is not None:
+            if isinstance(item, np.ndarray):
+                time_stamps = item[:, self.time_index]
+                resets = np.flatnonzero(time_stamps[1:] < time_stamps[:-1])
+                if len(resets):
+                    self.addRows(item[:resets[0] + 1])
+                    self.rotate()
+                    self.addRows(item[resets[0] + 1:])
+                    return
+                first_time_stamp, last_time_stamp = time_stamps[0], time_stamps[-1]
+            else:
+                first_time_stamp = last_time_stamp = item[self.time_index]
+            if first_time_stamp < self.last_time_stamp:
+                self.rotate()
+            self.last_time_stamp = last_time_stamp
+        self.chunk.append(item)
+        self.chunk_rows += len(item) if isinstance(item, np.ndarray) else 1
+
+    def run(self):
+        last_flush = monotonic()
+        done = False
+        while not done:
+            try:
+                batch = [self.queue.get(timeout=self.FLUSH_PERIOD_S)]
+            except queue.Empty:
+                batch = []
+
+            # Take whatever else is already queued, up to a batch
+            while batch and len(batch) < self.BATCH_SIZE:
+                try:
+                    batch.append(self.queue.get_nowait())
+                except queue.Empty:
+                    break
+            for item in batch:
+                if item is None:
+                    done = True
+                    break
+                if isinstance(item, tuple):
+                    self.writeChunk()
+                    self.header.extend(item)
+                    self.writeColumns(item, len(self.header) - len(item))
+                else:
+                    self.addRows(item)
+            if self.chunk_rows and (done or self.chunk_rows >= self.FLUSH_ROWS or monotonic() - last_flush >= self.FLUSH_PERIOD_S):
+                self.writeChunk()
+                last_flush = monotonic()
+        self.lf.close()
+
+
+class DataLogFile():
+    """
+    A memory-mapped data log file.  Opening a file only reads the record headers, and a column is read straight out of the chunks, so only
+    the columns that are asked for are touched.  A file that is still being written can be opened, the chunk being written is left out, and
+    refresh() picks up the chunks written since.
+    """
+
+    def __init__(self, file_name):
+        self.file_name = file_name
+        self.names = []
+        self.types = []
+        self.chunks = []
+        self.rows = 0
+        self.mapFile()
+        if len(self.mm) < DATA_LOG_HEADER.size:
+            self.close()
+            raise ValueError("%s is not a data log file" % (file_name))
+        magic, version, _, self.start_time = DATA_LOG_HEADER.unpack_from(self.mm, 0)
+        if magic != DATA_LOG_MAGIC:
+            self.close()
+            raise ValueError("%s is not a data log file" % (file_name))
+        if version != DATA_LOG_VERSION:
+            self.close()
+            raise ValueError("%s is data log version %i, expected version %i" % (file_name, version, DATA_LOG_VERSION))
+        self.offset = DATA_LOG_HEADER.size
+        self.readRecords()
+
+    def mapFile(self):
+        with open(self.file_name, "rb") as fp:
+            self.mm = mmap.mmap(fp.fileno(), 0, access=mmap.ACCESS_READ)
+
+    def readRecords(self):
+        """
+        Read the headers of the whole records from the offset on.  The offset is left at the first record that isn't all there yet.
+        """
+        while self.offset + DATA_LOG_RECORD.size <= len(self.mm):
+            kind, count, column_count, size = DATA_LOG_RECORD.unpack_from(self.mm, self.offset)
+            offset = self.offset + DATA_LOG_RECORD.size
+            if offset + size > len(self.mm):
+                break
+            if kind == COLUMNS_RECORD:
+                for i in range(count):
+                    entry = self.mm[offset + i * (DATA_LOG_NAME_SIZE + 1):offset + (i + 1) * (DATA_LOG_NAME_SIZE + 1)]
+                    self.names.append(entry[:DATA_LOG_NAME_SIZE].rstrip(b"\0").decode("ascii"))
+                    self.types.append(DATA_LOG_TYPES[entry[DATA_LOG_NAME_SIZE:].decode("ascii")])
+            elif kind == ROWS_RECORD:
+                column_offsets = []
+                column_offset = offset
+                for column_type in self.types[:column_count]:
+                    column_offsets.append(column_offset)
+                    column_offset += count * column_type.itemsize + _padding(count * column_type.itemsize)
+                self.chunks.append((count, column_offsets))
+                self.rows += count
+            self.offset = offset + size
+
+    def refresh(self):
+        """
+        Map the file again if it has grown and read the records added to it.  Returns the number of new rows.
+        """
+        if os.path.getsize(self.file_name) == len(self.mm):
+            return 0
+        rows = self.rows
+        self.mm.close()
+        self.mapFile()
+        self.readRecords()
+        return self.rows - rows
+
+    def column(self, name, first_chunk=0):
+        """
+        Return the rows of a column as one array, from the first chunk on.
+        """
+        index = self.names.index(name)
+        column_type = self.types[index]
+        parts = []
+        for count, column_offsets in self.chunks[first_chunk:]:
+            if index < len(column_offsets):
+                parts.append(np.frombuffer(self.mm, column_type, count, column_offsets[index]))
+            else:
+                parts.append(np.full(count, np.nan, column_type))
+        if not parts:
+            return np.empty(0, column_type)
+        return np.concatenate(parts)
+
+    def toDataFrame(self, names=None):
+        """
+        Return the columns, all of them by default, as a pandas DataFrame.
+        """
+        return pd.DataFrame({name: self.column(name) for name in (self.names if names is None else names)})
+
+    def close(self):
+        self.mm.close()
+
+
 class DataLoggerClient():
     """
     The Data Logger Client class.
     """
 
+    # The robot's packed mode switch and packed telemetry frame (see utilities/telemetry.py), and the rows of the frame decoded into each
+    # NumPy block.  The frame entry stays in the table after packed mode is switched off, so the mode comes from the switch.
+    PACKED_KEY = "TelemetryPacked"
+    PACKED_FRAME_KEY = "TelemetryFrame"
+    BLOCK_ROWS = 500
+
     def __init__(self, root, config_data):
         self.dl = None
         self.lf = None
         self.dl_keys = []
+        self.dl_entries = []
+        self.block = None
         self.root = root
         self.cd = config_data
 
@@ -97,42 +415,198 @@ class DataLoggerClient():
                                             " Tables!!!")
             else:
                 self.cd.file_name.set(join(self.log_path_entry.get(),
-                                           strftime("%Y%m%d-%H%M%S") + ".txt"))
+                                           strftime("%Y%m%d-%H%M%S") + DATA_LOG_EXTENSION))
+                # If the robot publishes packed frames, log those.  Otherwise log every key when TimeStamp changes.
+                self.packed = self.isPacked(self.dl)
+                self.dl_keys = []
+                self.dl_entries = []
+                if self.packed:
+                    header = self.getPackedNames(0)
+                    self.newBlock(len(header))
+                else:
+                    header = []
+                    for key in self.dl.getKeys():
+                        header.extend(self.addEntry(key))
                 try:
-                    self.lf = open(self.cd.file_name.get(), "w", newline='')
-                    self.lf_csv_writer = writer(self.lf, delimiter=',')
+                    self.lf = LogFileWriter(self.cd.file_name.get(), header)
                 except IOError:
                     self.status.config(text="Failed to open %s!!!" %
                                        (self.cd.file_name.get()))
-                self.dl.addEntryListener(listener=self.timeStampChanged,
-                                         key="TimeStamp")
-                self.dl_keys = self.dl.getKeys()
-                self.lf_csv_writer.writerow(self.dl_keys)
-                self.status.config(text="Started logging data...")
+                    return
+                if self.packed:
+                    self.dl.addEntryListener(listener=self.packedFrameChanged,
+                                             key=self.PACKED_FRAME_KEY)
+                    self.status.config(text="Started logging packed frames...")
+                else:
+                    self.dl.addEntryListener(listener=self.timeStampChanged,
+                                             key="TimeStamp")
+                    self.dl.addEntryListenerEx(self.entryAdded, NetworkTablesInstance.NotifyFlags.NEW)
+                    self.status.config(text="Started logging data...")
                 self.logging_button.config(text="Stop Logging")
         else:
-            self.dl.removeEntryListener(listener=self.timeStampChanged)
+            if self.packed:
+                self.dl.removeEntryListener(listener=self.packedFrameChanged)
+                self.flushBlock()
+            else:
+                self.dl.removeEntryListener(listener=self.timeStampChanged)
+                self.dl.removeEntryListener(listener=self.entryAdded)
             self.lf.close()
-            self.status.config(text="Stopped logging data...")
+            self.status.config(text="Stopped logging data...%i rows in %i files, %i dropped" %
+                                    (self.lf.rows, len(self.lf.file_names), self.lf.dropped_rows))
             self.logging_button.config(text="Start Logging")
 
+    @classmethod
+    def isPacked(cls, table):
+        """
+        Return whether the robot is publishing the packed frame.
+        """
+        return table.getEntry(cls.PACKED_KEY).getBoolean(False)
+
+    def addEntry(self, key):
+        """
+        Resolve the entry for a key once and return the names of its columns.  The telemetry frames are number arrays with their channel
+        names under the frame name plus "Names", so each channel gets its own column.  The packed frame is left out, it is not updated
+        unless the robot is in packed mode.
+        """
+        if key.endswith("Names") or key in self.dl_keys or key == self.PACKED_FRAME_KEY:
+            return []
+        entry = self.dl.getEntry(key)
+        names = self.dl.getEntry(key + "Names").getStringArray(None)
+        if names is None and isinstance(entry.value, (tuple, list)):
+            names = ["%s%i" % (key, i) for i in range(len(entry.value))]
+        self.dl_keys.append(key)
+        if names is None:
+            self.dl_entries.append((entry.getDouble, None))
+            return [key]
+        self.dl_entries.append((entry.getDoubleArray, len(names)))
+        return list(names)
+
+    def entryAdded(self, table, key, value, isNew):
+        """
+        Log the keys that show up after logging has started as new columns.  This runs on the same NetworkTables thread as timeStampChanged.
+        """
+        names = self.addEntry(key)
+        if names:
+            self.lf.addColumns(names)
+
+    def getPackedNames(self, width):
+        """
+        Return the column names of the packed frame, padded out to the width.
+        """
+        names = list(self.dl.getEntry(self.PACKED_FRAME_KEY + "Names").getStringArray(()))
+        names.extend("%s%i" % (self.PACKED_FRAME_KEY, i) for i in range(len(names), width))
+        return names
+
+    def newBlock(self, width):
+        self.block = np.zeros((self.BLOCK_ROWS, width))
+        self.block_row = 0
+        self.block_time = monotonic()
+
+    def flushBlock(self):
+        """
+        Hand the filled part of the block to the writer and start a new block.
+        """
+        if self.block_row:
+            self.lf.putBlock(self.block[:self.block_row])
+        self.newBlock(self.block.shape[1])
+
+    def packedFrameChanged(self, table, key, value, isNew):
+        """
+        Each packed frame is a whole robot loop, so it is copied straight into the next row of the block.  The value passed to the listener is
+        used rather than reading the entry again, which could already hold a newer frame.
+        """
+        width = self.block.shape[1]
+        if len(value) > width:
+            # The robot registered more channels, so add their columns
+            self.flushBlock()
+            self.lf.addColumns(self.getPackedNames(len(value))[width:])
+            self.newBlock(len(value))
+        self.block[self.block_row, :len(value)] = value
+        self.block_row += 1
+        if self.block_row == self.BLOCK_ROWS or monotonic() - self.block_time >= LogFileWriter.FLUSH_PERIOD_S:
+            self.flushBlock()
+
     def timeStampChanged(self, table, key, value, isNew):
         row = []
-        for key in self.dl_keys:
-            row.append(self.dl.getEntry(key).getDouble(0.0))
-        self.lf_csv_writer.writerow(row)
-        self.lf.flush()
+        for get, width in self.dl_entries:
+            if width is None:
+                row.append(get(0.0))
+            else:
+                values = get(())
+                row.extend(values[:width])
+                if len(values) < width:
+                    row.extend([0.0] * (width - len(values)))
+        self.lf.put(row)
+
+
+class LiveBuffer():
+    """
+    Fixed-size ring buffers of the robot's TimeStamp and of each live channel, filled by a NetworkTables listener.  The channels are
+    (name, buffer, getter) tuples and the getter is called with the value passed to the listener.  The listener is the only writer, it writes
+    a sample into every buffer and then counts it, so the Tk thread reads up to the count without a lock.  The oldest sample is left out of
+    a read since the listener may be writing over it.
+    """
+
+    def __init__(self, size):
+        self.size = size
+        self.time = np.full(size, np.nan)
+        self.channels = ()
+        self.count = 0
+
+    def addChannel(self, name, getter):
+        """
+        Add a channel.  Its buffer starts out as NaN, and the tuple of channels is replaced so the listener never sees it change.
+        """
+        buffer = np.full(self.size, np.nan, np.float32)
+        self.channels = self.channels + ((name, buffer, getter),)
+
+    def valueChanged(self, table, key, value, isNew):
+        i = self.count % self.size
+        for name, buffer, getter in self.channels:
+            buffer[i] = getter(value)
+        self.time[i] = value[0] if isinstance(value, (tuple, list)) else value
+        self.count += 1
+
+    def getOrder(self):
+        """
+        Return the indices of the samples in the buffers, oldest first.
+        """
+        count = self.count
+        samples = min(count, self.size) - 1
+        return np.arange(count - samples, count) % self.size if samples > 0 else np.empty(0, int)
 
 
 class DataLoggerPlotter():
     """
     The Data Logger Plotter class.
+
+    In live mode the channels are plotted straight from the NetworkTables connection made on the Logging tab, against the TimeStamp
+    relative to the latest sample.  Each line is kept in a LiveBuffer and redrawn LIVE_FPS times a second with blitting, so only the lines
+    are drawn over a saved copy of the axes.  The axes are redrawn, and saved again, only when their limits change.
     """
 
+    LIVE_BUFFER_ROWS = 1000
+    LIVE_WINDOW_S = 10.0
+    LIVE_FPS = 25
+
     def __init__(self, root, config_data):
         self.root = root
         self.cd = config_data
-        self.data_table = None
+
+        # The live channels and the blitting state
+        self.live_buffer = None
+        self.live_lines = []
+        self.live_frames = 0
+        self.live_fps_time = monotonic()
+        self.live_after = None
+        self.background = None
+
+        # The log file the columns were loaded from, identified by its name, modification time and size, and the columns loaded so far
+        self.data_key = None
+        self.data_log_file = None
+        self.data_names = []
+        self.data_columns = {}
+        self.data_chunks = 0
 
         # Create the tkinter widgets
         self.top_frame = ttk.Frame(self.root)
@@ -155,12 +629,17 @@ class DataLoggerPlotter():
                                        textvariable=self.y_var)
         self.plot_button = ttk.Button(self.right_frame, text="Plot Data",
                                       command=self.plotData)
+        self.live_button = ttk.Button(self.right_frame, text="Start Live",
+                                      command=self.toggleLiveButton)
+        self.status = ttk.Label(self.right_frame, text="", relief=SUNKEN,
+                                anchor=W, width=45)
 
         self.figure = Figure(figsize=(8, 4.5), dpi=100)
         self.ax = self.figure.add_subplot(111)
         self.canvas = FigureCanvasTkAgg(self.figure, master=self.left_frame)
         self.canvas.show()
         self.toolbar = NavigationToolbar2TkAgg(self.canvas, self.left_frame)
+        self.canvas.mpl_connect("draw_event", self.onDraw)
 
         # Layout all of the tkinter widgets
         self.top_frame.pack(side=TOP)
@@ -176,6 +655,8 @@ class DataLoggerPlotter():
         self.y_label.pack(side=TOP)
         self.y_combobox.pack(side=TOP)
         self.plot_button.pack(side=TOP)
+        self.live_button.pack(side=TOP)
+        self.status.pack(side=TOP, pady=5)
 
     def loadNewFile(self):
         [path, file_name] = split(filedialog.askopenfilename(
@@ -184,28 +665,244 @@ class DataLoggerPlotter():
         self.cd.file_name.set(join(path, file_name))
 
     def createDataTable(self):
+        """
+        Read the column names of the log file.  Nothing is read if the file hasn't changed since the last time, and if a data log file has
+        only grown, just the new rows of the columns already loaded are read.  The columns themselves are loaded when they are plotted.
+        """
+        file_name = self.cd.file_name.get()
         try:
-            self.data_table = pd.read_csv(self.cd.file_name.get())
-            header_list = list(self.data_table)
-            self.x_combobox['values'] = header_list
-            self.y_combobox['values'] = header_list
-        except:
-            pass
+            stat = os.stat(file_name)
+        except OSError as e:
+            self.status.config(text="Unable to open %s: %s" % (file_name, e.strerror))
+            return
+        data_key = (file_name, stat.st_mtime, stat.st_size)
+        if data_key == self.data_key:
+            return
+
+        try:
+            if (self.data_log_file is not None and self.data_key[0] == file_name and
+                    stat.st_size > self.data_key[2]):
+                self.tailDataLogFile()
+            else:
+                self.closeDataTable()
+                if file_name.endswith(DATA_LOG_EXTENSION):
+                    self.data_log_file = DataLogFile(file_name)
+                    self.data_names = list(self.data_log_file.names)
+                else:
+                    self.data_names = list(pd.read_csv(file_name, nrows=0).columns)
+        except (OSError, ValueError) as e:
+            self.closeDataTable()
+            self.status.config(text="Unable to read %s: %s" % (file_name, e))
+            return
+        self.data_key = data_key
+        self.x_combobox['values'] = self.data_names
+        self.y_combobox['values'] = self.data_names
+        if self.data_log_file is None:
+            self.status.config(text="%i columns" % (len(self.data_names)))
+        else:
+            self.status.config(text="%i columns, %i rows" % (len(self.data_names), self.data_log_file.rows))
+
+    def tailDataLogFile(self):
+        """
+        Append the rows added to the data log file to the columns already loaded.
+        """
+        self.data_log_file.refresh()
+        self.data_names = list(self.data_log_file.names)
+        for name, column in self.data_columns.items():
+            self.data_columns[name] = np.concatenate((column, self.data_log_file.column(name, self.data_chunks)))
+        self.data_chunks = len(self.data_log_file.chunks)
+
+    def closeDataTable(self):
+        if self.data_log_file is not None:
+            self.data_log_file.close()
+        self.data_key = None
+        self.data_log_file = None
+        self.data_names = []
+        self.data_columns = {}
+        self.data_chunks = 0
+
+    def getColumn(self, name):
+        """
+        Return a column of the log file, loading it the first time it is plotted.  The columns of the old CSV logs are loaded one at a time
+        with a compact type, the same as the data log files.
+        """
+        if name not in self.data_columns:
+            if self.data_log_file is not None:
+                self.data_columns[name] = self.data_log_file.column(name)
+                self.data_chunks = len(self.data_log_file.chunks)
+            else:
+                column_type = np.float64 if name in FLOAT64_COLUMNS else np.float32
+                self.data_columns[name] = pd.read_csv(self.data_key[0], usecols=[name], dtype={name: column_type})[name].values
+        return self.data_columns[name]
 
     def plotData(self):
-        x = self.data_table[self.x_combobox.get()].values
-        y = self.data_table[self.y_combobox.get()].values
+        if self.live_buffer is not None:
+            self.addLiveLine(self.y_combobox.get())
+            return
+        self.createDataTable()
+        if self.x_combobox.get() not in self.data_names or self.y_combobox.get() not in self.data_names:
+            self.status.config(text="Select the X and Y columns to plot")
+            return
+        try:
+            x = self.getColumn(self.x_combobox.get())
+            y = self.getColumn(self.y_combobox.get())
+        except (OSError, ValueError) as e:
+            self.status.config(text="Unable to read %s: %s" % (self.data_key[0], e))
+            return
+        if not np.isfinite(x).any() or not np.isfinite(y).any():
+            self.status.config(text="Nothing to plot")
+            return
         if self.ax.lines:
-            self.line.set_ydata(y)
+            self.line.set_data(x, y)
         else:
             self.line, = self.ax.plot(x, y, marker='x')
-        self.ax.set_ylim([min(y), max(y)])
-        self.ax.set_xlim([min(x), max(x)])
+        self.ax.set_ylim([np.nanmin(y), np.nanmax(y)])
+        self.ax.set_xlim([np.nanmin(x), np.nanmax(x)])
         self.canvas.draw()
         self.toolbar.update()
 
     def onVisibility(self, event):
-        self.createDataTable()
+        if self.live_buffer is None:
+            self.createDataTable()
+
+    def toggleLiveButton(self):
+        if self.live_button.config("text")[-1] == "Start Live":
+            self.startLive()
+        else:
+            self.stopLive()
+
+    def startLive(self):
+        """
+        Start plotting live.  The Y channel is the first line and Plot Data adds the Y channel as another line.
+        """
+        if not NetworkTablesInstance.isConnected(NetworkTables):
+            self.status.config(text="Connect on the Logging tab before going live!!!")
+            return
+        self.dl = NetworkTables.getTable("SmartDashboard")
+
+        # Read the same data as the DataLoggerClient, the packed frame if the robot publishes it or else every key when TimeStamp changes
+        self.live_packed = DataLoggerClient.isPacked(self.dl)
+        self.live_sources = {}
+        if self.live_packed:
+            names = self.dl.getEntry(DataLoggerClient.PACKED_FRAME_KEY + "Names").getStringArray(())
+            for index, name in enumerate(names[1:], 1):
+                self.live_sources[name] = (None, index)
+        else:
+            for key in self.dl.getKeys():
+                if key.endswith("Names") or key == DataLoggerClient.PACKED_FRAME_KEY:
+                    continue
+                entry = self.dl.getEntry(key)
+                names = self.dl.getEntry(key + "Names").getStringArray(None)
+                if names is None:
+                    self.live_sources[key] = (entry, None)
+                else:
+                    for index, name in enumerate(names):
+                        self.live_sources[name] = (entry, index)
+
+        for line in list(self.ax.lines):
+            line.remove()
+        self.ax.set_xlim([-self.LIVE_WINDOW_S, 0.0])
+        self.ax.set_ylim([-1.0, 1.0])
+        self.live_lines = []
+        self.live_buffer = LiveBuffer(self.LIVE_BUFFER_ROWS)
+        if self.live_packed:
+            self.dl.addEntryListener(listener=self.live_buffer.valueChanged, key=DataLoggerClient.PACKED_FRAME_KEY)
+        else:
+            self.dl.addEntryListener(listener=self.live_buffer.valueChanged, key="TimeStamp")
+        self.x_combobox['values'] = ["TimeStamp"]
+        self.x_var.set("TimeStamp")
+        self.y_combobox['values'] = sorted(self.live_sources)
+        self.live_button.config(text="Stop Live")
+        if self.y_combobox.get() in self.live_sources:
+            self.addLiveLine(self.y_combobox.get())
+        self.canvas.draw()
+        self.live_frames = 0
+        self.live_fps_time = monotonic()
+        self.live_after = self.root.after(1000 // self.LIVE_FPS, self.updateLive)
+
+    def stopLive(self):
+        self.root.after_cancel(self.live_after)
+        self.dl.removeEntryListener(listener=self.live_buffer.valueChanged)
+        self.live_buffer = None
+        for line in self.live_lines:
+            line.remove()
+        self.live_lines = []
+        if self.ax.get_legend() is not None:
+            self.ax.get_legend().remove()
+        self.canvas.draw()
+
+        # Live mode replaced the channel lists, so the log file is opened from scratch the next time it is plotted
+        self.closeDataTable()
+        self.live_button.config(text="Start Live")
+        self.status.config(text="Stopped live plotting...")
+
+    def addLiveLine(self, name):
+        """
+        Add a live channel and its line.  The lines are animated, so a full draw of the canvas leaves them out of the background.
+        """
+        if name not in self.live_sources:
+            self.status.config(text="Select a Y channel to plot live")
+            return
+        if any(line.get_label() == name for line in self.live_lines):
+            return
+        entry, index = self.live_sources[name]
+        if self.live_packed:
+            def getter(value, index=index):
+                return value[index] if index < len(value) else np.nan
+        elif index is None:
+            def getter(value, entry=entry):
+                return entry.getDouble(np.nan)
+        else:
+            def getter(value, entry=entry, index=index):
+                values = entry.getDoubleArray(())
+                return values[index] if index < len(values) else np.nan
+        self.live_buffer.addChannel(name, getter)
+        line, = self.ax.plot([], [], label=name, animated=True)
+        self.live_lines.append(line)
+        self.ax.legend(loc="upper left")
+        self.canvas.draw()
+
+    def onDraw(self, event):
+        """
+        Save the axes without the live lines whenever the canvas is fully drawn, including zooming and panning with the toolbar.
+        """
+        self.background = self.canvas.copy_from_bbox(self.ax.bbox)
+
+    def updateLive(self):
+        """
+        Copy the ring buffers into the lines and blit them.  The Y axis grows when a line goes past it, which redraws the background.
+        """
+        self.live_after = self.root.after(1000 // self.LIVE_FPS, self.updateLive)
+        order = self.live_buffer.getOrder()
+        if len(order) == 0 or self.background is None:
+            return
+        time_stamps = self.live_buffer.time[order]
+        x = time_stamps - time_stamps[-1]
+        low, high = self.ax.get_ylim()
+        y_min, y_max = np.inf, -np.inf
+        for line, (name, buffer, getter) in zip(self.live_lines, self.live_buffer.channels):
+            y = buffer[order]
+            line.set_data(x, y)
+            visible = y[(x >= -self.LIVE_WINDOW_S) & np.isfinite(y)]
+            if len(visible):
+                y_min = min(y_min, visible.min())
+                y_max = max(y_max, visible.max())
+        if y_min < low or y_max > high:
+            margin = 0.1 * max(max(y_max, high) - min(y_min, low), 1e-3)
+            self.ax.set_ylim([min(y_min, low) - margin, max(y_max, high) + margin])
+            self.canvas.draw()
+
+        self.canvas.restore_region(self.background)
+        for line in self.live_lines:
+            self.ax.draw_artist(line)
+        self.canvas.blit(self.ax.bbox)
+
+        self.live_frames += 1
+        if monotonic() - self.live_fps_time >= 1.0:
+            self.status.config(text="Live: %i lines at %i FPS" % (len(self.live_lines),
+                                                                 self.live_frames / (monotonic() - self.live_fps_time)))
+            self.live_frames = 0
+            self.live_fps_time = monotonic()
 
 
 matplotlib.use('TkAgg')
@@ -1,29 +1,74 @@
 from wpilib.command import Command
-from utilities.drivetrain_mp_controller import DrivetrainMPController
+from ctre.wpi_talonsrx import WPI_TalonSRX
+from utilities.motion_profile_controller import MotionProfileController
+from utilities.ramsete_controller import RamseteController, LoadRamseteReference
+from utilities.asset_store import ASSET_STORE
+from utilities.trajectory_points import LoadTrajectoryPoints
+from utilities.telemetry import TELEMETRY
 import logging
-from constants import LOGGER_LEVEL
+from constants import LOGGER_LEVEL, PATH_FOLLOWER, DRIVETRAIN_PATH_FOLLOWER
 logger = logging.getLogger(__name__)
 logger.setLevel(LOGGER_LEVEL)
 
+# The telemetry needed to dig into the closed loop motion profile, read from the path follower command.  The buffer counts come from the
+# statuses the controller already has, so they are only published every 100ms.
+MOTION_PROFILE_TELEMETRY = TELEMETRY.register("DrivetrainMP", (
+    ("RightEncPos", lambda command: command.robot.driveTrain.rightTalon.getSensorCollection().getQuadraturePosition()),
+    ("RightActPos", lambda command: command.robot.driveTrain.rightTalon.getActiveTrajectoryPosition()),
+    ("RightEncVel", lambda command: command.robot.driveTrain.rightTalon.getAnalogInVel()),
+    ("RightActVel", lambda command: command.robot.driveTrain.rightTalon.getActiveTrajectoryVelocity()),
+    ("RightPrimaryError", lambda command: command.robot.driveTrain.rightTalon.getClosedLoopError(0)),
+    ("RightSecondaryError", lambda command: command.robot.driveTrain.rightTalon.getClosedLoopError(1)),
+    ("LeftEncPos", lambda command: command.robot.driveTrain.leftTalon.getSensorCollection().getQuadraturePosition()),
+    ("LeftActPos", lambda command: command.robot.driveTrain.leftTalon.getActiveTrajectoryPosition()),
+    ("LeftEncVel", lambda command: command.robot.driveTrain.leftTalon.getAnalogInVel()),
+    ("LeftActVel", lambda command: command.robot.driveTrain.leftTalon.getActiveTrajectoryVelocity()),
+    ("LeftPrimaryError", lambda command: command.robot.driveTrain.leftTalon.getClosedLoopError(0)),
+    ("LeftSecondaryError", lambda command: command.robot.driveTrain.leftTalon.getClosedLoopError(1)),
+    ("RightTopBufferCount", lambda command: command.pathFollower.getStatuses()[1].topBufferCnt, 5),
+    ("LeftTopBufferCount", lambda command: command.pathFollower.getStatuses()[0].topBufferCnt, 5),
+    ("LeftBottomBufferCount", lambda command: command.pathFollower.getStatuses()[0].btmBufferCnt, 5),
+    ("RightBottomBufferCount", lambda command: command.pathFollower.getStatuses()[1].btmBufferCnt, 5)))
+
+RAMSETE_TELEMETRY = TELEMETRY.register("Ramsete", (
+    ("RamseteAlongTrackError", lambda command: command.pathFollower.getErrors()[0]),
+    ("RamseteCrossTrackError", lambda command: command.pathFollower.getErrors()[1]),
+    ("RamseteHeadingError", lambda command: command.pathFollower.getErrors()[2])))
+
 
 class DrivetrainPathFollower(Command):
     """
-    This command will call the path which will go forward. The pickle file should have been created on the PC and placed into the autonomous folder
-    to be uploaded with the robot code.
+    This command will call the path which will go forward. The trajectory file should have been created on the PC and placed into the autonomous folder
+    to be uploaded with the robot code.  The path can either be a loaded path or the name of its trajectory file, which is then loaded through the
+    shared asset store.
+
+    The path is either streamed to the Talon MPEs (PATH_FOLLOWER.MotionProfile) or tracked on the RoboRIO by the Ramsete controller
+    (PATH_FOLLOWER.Ramsete), selected per path with the follower argument or for every path with DRIVETRAIN_PATH_FOLLOWER in constants.py.
     """
-    def __init__(self, robot, path, reverse, pid_kludge=False):
+    def __init__(self, robot, path, reverse, pid_kludge=False, follower=None):
         super().__init__()
         self.requires(robot.driveTrain)
 
         # Create references to the robot and the path to follow
         self.robot = robot
-        self.path = path
+        self.path = ASSET_STORE.loadTrajectory(path) if isinstance(path, str) else path
         self.reverse = reverse
         self.pidKludge = pid_kludge
+        self.follower = DRIVETRAIN_PATH_FOLLOWER if follower is None else follower
 
         # Control variables
         self.finished = True
 
+        # Build the Talon trajectory points or the Ramsete reference once here rather than every time the path is run.  Both sides use the left
+        # side heading.
+        if self.follower == PATH_FOLLOWER.Ramsete:
+            self.reference = LoadRamseteReference(self.path, reverse)
+        else:
+            self.leftPoints = LoadTrajectoryPoints(self.path['left'], reverse, robot.driveTrain.MP_SLOT0_SELECT,
+                                                   robot.driveTrain.MP_SLOT1_SELECT)
+            self.rightPoints = LoadTrajectoryPoints(self.path['right'], reverse, robot.driveTrain.MP_SLOT0_SELECT,
+                                                    robot.driveTrain.MP_SLOT1_SELECT, heading_points=self.path['left'])
+
         # 4th value in MP's is sample period.  Assume the left and right sides are the same.  The
         # divide by 2 value is used to set the Talon control frames and notifier to twice the rate
         # of the trajectory duration.
@@ -42,15 +87,17 @@ class DrivetrainPathFollower(Command):
         """
         self.finished = False
         self.robot.driveTrain.initiaizeDrivetrainMotionProfileControllers(self._streamRate)
+        if self.follower == PATH_FOLLOWER.Ramsete:
+            self.pathFollower = RamseteController(self.robot.driveTrain, self.reference)
+            self.pathFollower.start()
+            return
+
         if self.pidKludge:
             self.robot.driveTrain.pidKludge()
-        self.pathFollower = DrivetrainMPController(self.robot.driveTrain.leftTalon,
-                                                   self.path['left'],
-                                                   self.robot.driveTrain.rightTalon,
-                                                   self.path['right'],
-                                                   self.reverse,
-                                                   self.robot.driveTrain.MP_SLOT0_SELECT,
-                                                   self.robot.driveTrain.MP_SLOT1_SELECT)
+        self.pathFollower = MotionProfileController((self.robot.driveTrain.leftTalon, self.robot.driveTrain.rightTalon),
+                                                    (self.leftPoints, self.rightPoints),
+                                                    WPI_TalonSRX.ControlMode.MotionProfileArc,
+                                                    ("Left", "Right"))
         self.pathFollower.start()
 
     def execute(self):
@@ -61,10 +108,21 @@ class DrivetrainPathFollower(Command):
         if self.pathFollower.isFinished():
             self.finished = True
         else:
-            self.pathFollower.control(self.robot.timer.get(), self.robot.smartDashboard)
+            self.pathFollower.control()
+
+            # Publish the telemetry of the path follower.  This does nothing unless telemetry is switched on.
+            if self.follower == PATH_FOLLOWER.Ramsete:
+                RAMSETE_TELEMETRY.update(self)
+            else:
+                MOTION_PROFILE_TELEMETRY.update(self)
 
     def end(self):
         '''
         Exit the DrivetrainMotionProfileControllers
         '''
+        self.pathFollower.stop()
+        if self.follower == PATH_FOLLOWER.Ramsete:
+            self.pathFollower.dump(self.__class__.__name__)
+        else:
+            self.pathFollower.getRecorder().dump(self.__class__.__name__)
         self.robot.driveTrain.cleanUpDrivetrainMotionProfileControllers()
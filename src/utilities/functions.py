@@ -1,10 +1,23 @@
 import math
-import pickle
 import os.path
 from constants import *
 import matplotlib.pyplot as plt
 import numpy as np
 import pathfinder as pf
+from utilities.path_cache import PathCache
+from utilities.trajectory_file import WriteTrajectoryFile
+
+# Fields of a pathfinder segment, in the order they are stored by TrajectoryColumns()
+SEGMENT_FIELDS = ("dt", "x", "y", "position", "velocity", "acceleration", "jerk", "heading")
+
+# The review plots can be turned off so the generators can run headless (see utilities/build_paths.py)
+ENABLE_PLOTTING = True
+
+# Every path file written by the generators since this module was imported
+GENERATED_FILES = []
+
+# Cache of the generated trajectories and paths.  Set PATH_CACHE.enabled to False to force a full rebuild.
+PATH_CACHE = PathCache()
 
 
 def CalculateFeedForwardVoltage(leftSide, velocity, acceleration):
@@ -15,11 +28,12 @@ def CalculateFeedForwardVoltage(leftSide, velocity, acceleration):
 
     Vapp = kV * Velocity + kA * Acceleration + V-Intercept
 
+    The velocity and acceleration can either be single values or NumPy arrays holding a whole trajectory.
     """
-    if acceleration >= DRIVETRAIN_MAX_ACCELERATION:
+    if np.any(np.asarray(acceleration) >= DRIVETRAIN_MAX_ACCELERATION):
         print("WARNING: The acceration is larger than the max!!")
 
-    if velocity >= DRIVETRAIN_MAX_VELOCITY:
+    if np.any(np.asarray(velocity) >= DRIVETRAIN_MAX_VELOCITY):
         print("WARNING: The velocity is larger than the max!!")
 
     if leftSide:
@@ -34,73 +48,146 @@ def CalculateFeedForwardVoltage(leftSide, velocity, acceleration):
     return kV * velocity + kA * acceleration + VIntercept
 
 
+def TrajectoryColumns(trajectory):
+    """
+    This function will walk a pathfinder trajectory once and return the segment fields as a dictionary of NumPy arrays (one array per field).
+    All of the unit conversions are then done on whole arrays instead of segment by segment.
+    """
+    table = np.array([(segment.dt, segment.x, segment.y, segment.position, segment.velocity,
+                       segment.acceleration, segment.jerk, segment.heading) for segment in trajectory],
+                     dtype=np.float64).reshape(-1, len(SEGMENT_FIELDS))
+    return dict(zip(SEGMENT_FIELDS, table.T))
+
+
+def GenerateTrajectory(waypoints, settings):
+    """
+    This function will use pathfinder to fit a trajectory through the waypoints and return it as trajectory columns.  The spline fit is by far
+    the slowest part of building a path, so the result is cached on the waypoints and the pathfinder settings.
+    """
+    key = PATH_CACHE.trajectoryKey(waypoints, settings)
+    columns = PATH_CACHE.loadTrajectory(key)
+    if columns is None:
+        info, trajectory = pf.generate(waypoints, settings.order, settings.samples, settings.period,
+                                       settings.maxVelocity, settings.maxAcceleration, settings.maxJerk)
+        columns = TrajectoryColumns(trajectory)
+        PATH_CACHE.storeTrajectory(key, columns)
+    return columns
+
+
+def TankModify(columns, wheelbase):
+    """
+    This function will split a center trajectory into the left and right trajectories of a differential drive.  It is the same math as the
+    pathfinder TankModifier, done on the trajectory columns so it also works on cached trajectories.
+    """
+    w = wheelbase / 2
+    sinHeading = np.sin(columns["heading"])
+    cosHeading = np.cos(columns["heading"])
+    sides = []
+    for sign in (1, -1):
+        side = dict(columns)
+        side["x"] = columns["x"] - sign * (w * sinHeading)
+        side["y"] = columns["y"] + sign * (w * cosHeading)
+
+        # The first segment keeps the center kinematics, every other segment is measured from the previous one
+        dx = np.diff(side["x"])
+        dy = np.diff(side["y"])
+        distance = np.sqrt(dx * dx + dy * dy)
+        dt = columns["dt"][1:]
+        side["position"] = np.cumsum(np.concatenate((columns["position"][:1], distance)))
+        side["velocity"] = np.concatenate((columns["velocity"][:1], distance / dt))
+        side["acceleration"] = np.concatenate((columns["acceleration"][:1], np.diff(side["velocity"]) / dt))
+        side["jerk"] = np.concatenate((columns["jerk"][:1], np.diff(side["acceleration"]) / dt))
+        sides.append(side)
+    return sides[0], sides[1]
+
+
+def UnwrapHeadings(headings):
+    """
+    This function will remove the +-360 degree jumps from an array of headings (in degrees).  The Pigeon IMU yaw is continuous, so a path which
+    turns through +-180 degrees needs a continuous heading target as well.  Headings which never jump are returned unchanged.
+    """
+    if len(headings) < 2:
+        return headings
+    corrections = -360.0 * np.round(np.diff(headings) / 360.0)
+    return headings + np.concatenate(([0.0], np.cumsum(corrections)))
+
+
+def TalonPathPoints(columns, leftSide, headings):
+    """
+    This function will convert the trajectory columns of one side of the drivetrain into the [position, feed-forward, heading, duration] points
+    read up by the RoboRIO robot code.  The headings must already be in the units the Talon expects.
+    """
+    positions = columns["position"] * 4096 / (ROBOT_WHEEL_DIAMETER_FT * math.pi)      # Position: CTRE SRX Mag encoder: 4096 units per rotation
+    feedForwards = CalculateFeedForwardVoltage(leftSide,                                # Voltage / Feed-Forward
+                                               columns["velocity"],
+                                               columns["acceleration"])
+    durations = (columns["dt"] * 1000).astype(int)                                       # Duration
+    return [list(point) for point in zip(positions.tolist(), feedForwards.tolist(), headings.tolist(), durations.tolist())]
+
+
+def WritePathFile(file_name, path):
+    """
+    This function will write a path into a trajectory file (see utilities/trajectory_file.py).  The data is written to a temporary file first and
+    then moved into place, so the robot code (or another generator running at the same time) never sees a partially written file.
+    """
+    tempFileName = "%s.%i.tmp" % (file_name, os.getpid())
+    with open(tempFileName, "wb") as fp:
+        WriteTrajectoryFile(fp, path)
+    os.replace(tempFileName, file_name)
+    GENERATED_FILES.append(file_name)
+
+
 def GeneratePath(path_name, file_name, waypoints, settings, reverse=False, heading_overide=False, headingValue=0.0):
     """
     This function will take a set of pathfinder waypoints and create the trajectories to follow a path going through the waypoints.  This path is
     specific for the drivetrain controllers, so the position will use the CTRE quadrature encoders and the velocity will use the feed-forward in
     units of Volts.
     """
-    # Generate the path using pathfinder.
-    info, trajectory = pf.generate(waypoints, settings.order, settings.samples, settings.period,
-                                   settings.maxVelocity, settings.maxAcceleration, settings.maxJerk)
+    # Nothing needs to be regenerated if this path was already built with the same inputs and robot constants
+    pathKey = PATH_CACHE.pathKey(PATH_CACHE.trajectoryKey(waypoints, settings), "GeneratePath", reverse, heading_overide, headingValue)
+    path = PATH_CACHE.loadPath(pathKey)
+    if path is not None and not ENABLE_PLOTTING:
+        WritePathFile(os.path.join(path_name, file_name+".traj"), path)
+        return
 
-    # Modify the path for the differential drive based on the calibrated wheelbase
-    modifier = pf.modifiers.TankModifier(trajectory).modify(ROBOT_WHEELBASE_FT)
+    # Generate the path using pathfinder.
+    trajectory = GenerateTrajectory(waypoints, settings)
 
-    # Ge the left and right trajectories...left and right are reversed
-    rightTrajectory = modifier.getLeftTrajectory()
-    leftTrajectory = modifier.getRightTrajectory()
+    # Modify the path for the differential drive based on the calibrated wheelbase.  Get the left and right trajectories...left and right are
+    # reversed
+    rightTrajectory, leftTrajectory = TankModify(trajectory, ROBOT_WHEELBASE_FT)
 
-    # Grab the position, velocity + acceleration for feed-forward, heading, and duration
-    path = {"left": [], "right": []}
-    headingOut = []
-    for i in range(len(leftTrajectory)):
+    # Grab the heading for the whole path.  Both sides use the heading of the left trajectory.
+    if heading_overide:
+        headingOut = np.full(len(leftTrajectory["heading"]), float(headingValue))
+    else:
+        degrees = leftTrajectory["heading"] * 180 / math.pi
         if not reverse:
-            if heading_overide:
-                heading = headingValue
-            elif abs(pf.r2d(leftTrajectory[i].heading)) > 180:
-                heading = -(pf.r2d(leftTrajectory[i].heading) - 360)
-            else:
-                heading = -pf.r2d(leftTrajectory[i].heading)
+            headingOut = np.where(np.abs(degrees) > 180, -(degrees - 360), -degrees)
         else:
-            if heading_overide:
-                heading = headingValue
-            else:
-                heading = pf.r2d(leftTrajectory[i].heading) - 180
-
-        headingOut.append(heading)
-        path["left"].append([leftTrajectory[i].position * 4096 /                            # Position: CTRE SRX Mag encoder: 4096 units per rotation
-                             (ROBOT_WHEEL_DIAMETER_FT * math.pi),                           # Voltage / Feed-Forward
-                             CalculateFeedForwardVoltage(True,
-                                                         leftTrajectory[i].velocity,
-                                                         leftTrajectory[i].acceleration),
-                             heading / 360,                                                 # Pigeon IMU setup for 3600 units per rotation
-                             int(leftTrajectory[i].dt * 1000)])                             # Duration
-        path["right"].append([rightTrajectory[i].position * 4096 /
-                              (ROBOT_WHEEL_DIAMETER_FT * math.pi),
-                              CalculateFeedForwardVoltage(False,
-                                                          rightTrajectory[i].velocity,
-                                                          rightTrajectory[i].acceleration),
-                              heading / 360,
-                              int(rightTrajectory[i].dt * 1000)])
-
-    # Dump the path into a pickle file which will be read up later by the RoboRIO robot code
-    with open(os.path.join(path_name, file_name+".pickle"), "wb") as fp:
-        pickle.dump(path, fp)
+            headingOut = degrees - 180
+        headingOut = UnwrapHeadings(headingOut)
+
+    # Grab the position, velocity + acceleration for feed-forward, heading, and duration
+    if path is None:
+        path = {"left": TalonPathPoints(leftTrajectory, True, headingOut / 360),          # Pigeon IMU setup for 3600 units per rotation
+                "right": TalonPathPoints(rightTrajectory, False, headingOut / 360)}
+        PATH_CACHE.storePath(pathKey, path)
+
+    # Write the path into a trajectory file which will be read up later by the RoboRIO robot code
+    WritePathFile(os.path.join(path_name, file_name+".traj"), path)
+    if not ENABLE_PLOTTING:
+        return
 
     # Plot the data for review
-    x = list(i * (settings.period) for i, _ in enumerate(leftTrajectory))
+    x = np.arange(len(leftTrajectory["dt"])) * settings.period
 
     plt.figure()
     # plt.plot(aspect=0.5)
     plt.title("Trajectory")
     drawField(plt)
-    plt.plot([segment.y for segment in leftTrajectory],
-             [segment.x for segment in leftTrajectory],
-             marker='.', color='b')
-    plt.plot([segment.y for segment in rightTrajectory],
-             [segment.x for segment in rightTrajectory],
-             marker='.', color='r')
+    plt.plot(leftTrajectory["y"], leftTrajectory["x"], marker='.', color='b')
+    plt.plot(rightTrajectory["y"], rightTrajectory["x"], marker='.', color='r')
     plt.gca().set_yticks(np.arange(0, 30.1, 1.0), minor=True)
     plt.gca().set_yticks(np.arange(0, 30.1, 3))
     plt.gca().set_xticks(np.arange(0, 27.1, 1.0), minor=True)
@@ -117,14 +204,14 @@ def GeneratePath(path_name, file_name, waypoints, settings, reverse=False, headi
     plt.figure()
     plt.subplot(2, 1, 1)
     plt.title("Velocity")
-    plt.plot(x, [segment.velocity for segment in leftTrajectory], marker='.', color='b')
-    plt.plot(x, [segment.velocity for segment in rightTrajectory], marker='.', color='r')
+    plt.plot(x, leftTrajectory["velocity"], marker='.', color='b')
+    plt.plot(x, rightTrajectory["velocity"], marker='.', color='r')
     plt.yticks(np.arange(0, DRIVETRAIN_MAX_VELOCITY + 0.1, 1.0))
     plt.grid()
     plt.subplot(2, 1, 2)
     plt.title("Acceleration")
-    plt.plot(x, [segment.acceleration for segment in leftTrajectory], marker='.', color='b')
-    plt.plot(x, [segment.acceleration for segment in rightTrajectory], marker='.', color='r')
+    plt.plot(x, leftTrajectory["acceleration"], marker='.', color='b')
+    plt.plot(x, rightTrajectory["acceleration"], marker='.', color='r')
     plt.yticks(np.arange(-DRIVETRAIN_MAX_ACCELERATION, DRIVETRAIN_MAX_ACCELERATION + 1.1, 2.0))
     plt.grid()
     plt.tight_layout()
@@ -138,77 +225,55 @@ def GenerateTalonMotionProfileArcPath(path_name, file_name, waypoints, settings,
     specific for the drivetrain controllers, so the position will use the CTRE quadrature encoders, the velocity will use the feed-forward in
     units of Volts, and the heading will use the Pigeon IMU.
     """
-    # Generate the path using pathfinder.
-    info, trajectory = pf.generate(waypoints, settings.order, settings.samples, settings.period,
-                                   settings.maxVelocity, settings.maxAcceleration, settings.maxJerk)
+    # Nothing needs to be regenerated if this path was already built with the same inputs and robot constants
+    pathKey = PATH_CACHE.pathKey(PATH_CACHE.trajectoryKey(waypoints, settings), "GenerateTalonMotionProfileArcPath", reverse,
+                                 heading_overide, headingValue)
+    path = PATH_CACHE.loadPath(pathKey)
+    if path is not None and not ENABLE_PLOTTING:
+        WritePathFile(os.path.join(path_name, file_name+".traj"), path)
+        return
 
-    # Modify the path for the differential drive based on the calibrated wheelbase
-    modifier = pf.modifiers.TankModifier(trajectory).modify(ROBOT_WHEELBASE_FT)
+    # Generate the path using pathfinder.
+    trajectory = GenerateTrajectory(waypoints, settings)
 
-    # Ge the left and right trajectories
-    leftTrajectory = modifier.getLeftTrajectory()
-    rightTrajectory = modifier.getRightTrajectory()
+    # Modify the path for the differential drive based on the calibrated wheelbase and get the left and right trajectories
+    leftTrajectory, rightTrajectory = TankModify(trajectory, ROBOT_WHEELBASE_FT)
 
-    # Grab the position, velocity + acceleration for feed-forward, heading, and duration.  Apply the proper conversions for the position,
-    # feed-forward, and heading.  The headings from pathfinder will likely be fixed
-    path = {"left": [], "right": []}
-    headings = {"left": [], "right": []}
-    for i in range(len(leftTrajectory)):
-        heading = pf.r2d(leftTrajectory[i].heading)
+    # Apply the heading conversions to each side.  The headings from pathfinder are 0 to 360 degrees, so fold them into +-180 degrees and then
+    # unwrap them so the heading target stays continuous.
+    headings = {}
+    for side, columns in (("left", leftTrajectory), ("right", rightTrajectory)):
         if heading_overide:
-            heading = headingValue
+            headings[side] = np.full(len(columns["heading"]), float(headingValue))
         else:
+            degrees = columns["heading"] * 180 / math.pi
             if not reverse:
-                if pf.r2d(leftTrajectory[i].heading) > 180:
-                    heading = pf.r2d(leftTrajectory[i].heading) - 360
+                heading = np.where(degrees > 180, degrees - 360, degrees)
             else:
-                    heading = -(pf.r2d(leftTrajectory[i].heading) - 180)
-            
-            
-        headings["left"].append(heading)
-        path["left"].append([leftTrajectory[i].position * 4096 /                            # Position: CTRE SRX Mag encoder: 4096 units per rotation
-                             (ROBOT_WHEEL_DIAMETER_FT * math.pi),                           # Voltage / Feed-Forward
-                             CalculateFeedForwardVoltage(True,
-                                                         leftTrajectory[i].velocity,
-                                                         leftTrajectory[i].acceleration),
-                             3600 * heading / 360,                                          # Pigeon IMU setup for 3600 units per rotation
-                             int(leftTrajectory[i].dt * 1000)])                             # Duration
-        heading = pf.r2d(rightTrajectory[i].heading)
-        if heading_overide:
-            heading = headingValue
-        else:
-            if not reverse:
-                if pf.r2d(rightTrajectory[i].heading) > 180:
-                    heading = pf.r2d(rightTrajectory[i].heading) - 360
-            else:
-                    heading = -(pf.r2d(rightTrajectory[i].heading) - 180)
+                heading = -(degrees - 180)
+            headings[side] = UnwrapHeadings(heading)
 
-        headings["right"].append(heading)
-        path["right"].append([rightTrajectory[i].position * 4096 /
-                              (ROBOT_WHEEL_DIAMETER_FT * math.pi),
-                              CalculateFeedForwardVoltage(False,
-                                                          rightTrajectory[i].velocity,
-                                                          rightTrajectory[i].acceleration),
-                              3600 * heading / 360,
-                              int(rightTrajectory[i].dt * 1000)])
+    # Grab the position, velocity + acceleration for feed-forward, heading, and duration.  Apply the proper conversions for the position,
+    # feed-forward, and heading.
+    if path is None:
+        path = {"left": TalonPathPoints(leftTrajectory, True, 3600 * headings["left"] / 360),      # Pigeon IMU setup for 3600 units per rotation
+                "right": TalonPathPoints(rightTrajectory, False, 3600 * headings["right"] / 360)}
+        PATH_CACHE.storePath(pathKey, path)
 
-    # Dump the path into a pickle file which will be read up later by the RoboRIO robot code
-    with open(os.path.join(path_name, file_name+".pickle"), "wb") as fp:
-        pickle.dump(path, fp)
+    # Write the path into a trajectory file which will be read up later by the RoboRIO robot code
+    WritePathFile(os.path.join(path_name, file_name+".traj"), path)
+    if not ENABLE_PLOTTING:
+        return
 
     # Plot the X,Y points to see if the paths go where desired
-    x = list(i * (settings.period) for i, _ in enumerate(leftTrajectory))
+    x = np.arange(len(leftTrajectory["dt"])) * settings.period
     plt.figure()
     plt.title("Trajectory")
     drawField(plt)
     # Pathfinder +X is forward and +Y is right, flip axis for easier viewing also flip the label of the trajectory sides.  The velocity and heading
     # plots are the gold standards for direction.
-    plt.plot([-segment.y for segment in leftTrajectory],
-             [segment.x for segment in leftTrajectory],
-             marker='.', color='b')
-    plt.plot([-segment.y for segment in rightTrajectory],
-             [segment.x for segment in rightTrajectory],
-             marker='.', color='r')
+    plt.plot(-leftTrajectory["y"], leftTrajectory["x"], marker='.', color='b')
+    plt.plot(-rightTrajectory["y"], rightTrajectory["x"], marker='.', color='r')
     plt.gca().set_yticks(np.arange(0, 30.1, 1.0), minor=True)
     plt.gca().set_yticks(np.arange(0, 30.1, 3))
     plt.gca().set_xticks(np.arange(0, 27.1, 1.0), minor=True)
@@ -226,14 +291,14 @@ def GenerateTalonMotionProfileArcPath(path_name, file_name, waypoints, settings,
     plt.figure()
     plt.subplot(2, 1, 1)
     plt.title("Velocity")
-    plt.plot(x, [segment.velocity for segment in leftTrajectory], marker='.', color='b')
-    plt.plot(x, [segment.velocity for segment in rightTrajectory], marker='.', color='r')
+    plt.plot(x, leftTrajectory["velocity"], marker='.', color='b')
+    plt.plot(x, rightTrajectory["velocity"], marker='.', color='r')
     plt.yticks(np.arange(0, DRIVETRAIN_MAX_VELOCITY + 0.1, 1.0))
     plt.grid()
     plt.subplot(2, 1, 2)
     plt.title("Acceleration")
-    plt.plot(x, [segment.acceleration for segment in leftTrajectory], marker='.', color='b')
-    plt.plot(x, [segment.acceleration for segment in rightTrajectory], marker='.', color='r')
+    plt.plot(x, leftTrajectory["acceleration"], marker='.', color='b')
+    plt.plot(x, rightTrajectory["acceleration"], marker='.', color='r')
     plt.yticks(np.arange(-DRIVETRAIN_MAX_ACCELERATION, DRIVETRAIN_MAX_ACCELERATION + 1.1, 2.0))
     plt.grid()
     plt.tight_layout()
@@ -242,46 +307,43 @@ def GenerateTalonMotionProfileArcPath(path_name, file_name, waypoints, settings,
 def GenerateMotionProfile(motion_profile_name, file_name, trajectory,
                           position_units, velocity_units):
     """
-    This function will use the pathfinder to generate a single-axis motion profile.
+    This function will use the pathfinder to generate a single-axis motion profile.  The trajectory can either be a pathfinder trajectory or
+    the trajectory columns returned by GenerateTrajectory().
     """
-    # Grab the position, velocity, and duration
-    path = []
-    output = open(os.path.join(FILE_OUTPUT_PATH, file_name+".txt"), "w")
-    output.write("position, velocity, acceration, dt\n")
-    for i in range(len(trajectory)):
-        path.append([trajectory[i].position * position_units,
-                     trajectory[i].velocity * velocity_units,
-                     0.0,  # No heading is used for single-axis
-                     int(trajectory[i].dt * 1000)])
+    columns = trajectory if isinstance(trajectory, dict) else TrajectoryColumns(trajectory)
 
-        output.write("%3.4f, %3.4f, %3.4f, %1.3f\n" %
-                     (trajectory[i].position, trajectory[i].velocity,
-                      trajectory[i].acceleration, trajectory[i].dt))
+    # Grab the position, velocity, and duration
+    positions = columns["position"] * position_units
+    velocities = columns["velocity"] * velocity_units
+    durations = (columns["dt"] * 1000).astype(int)
+    path = [[position, velocity, 0.0, duration]  # No heading is used for single-axis
+            for position, velocity, duration in zip(positions.tolist(), velocities.tolist(), durations.tolist())]
 
-    output.close()
+    np.savetxt(os.path.join(FILE_OUTPUT_PATH, file_name+".txt"),
+               np.column_stack((columns["position"], columns["velocity"], columns["acceleration"], columns["dt"])),
+               fmt="%3.4f, %3.4f, %3.4f, %1.3f", header="position, velocity, acceration, dt", comments="")
 
-    # Dump the path into a pickle file which will be read up later by the RoboRIO robot code
-    with open(os.path.join(motion_profile_name, file_name+".pickle"), "wb") as fp:
-        pickle.dump(path, fp)
+    # Write the path into a trajectory file which will be read up later by the RoboRIO robot code
+    WritePathFile(os.path.join(motion_profile_name, file_name+".traj"), path)
+    if not ENABLE_PLOTTING:
+        return
 
     # Plot the data for review
     plt.figure()
     plt.title("Trajectory(Native Units)")
-    plt.plot([segment.y * position_units for segment in trajectory],
-             [segment.x * position_units for segment in trajectory],
-             marker='.', color='b')
-    x = list(i * (trajectory[i].dt) for i, _ in enumerate(trajectory))
+    plt.plot(columns["y"] * position_units, columns["x"] * position_units, marker='.', color='b')
+    x = np.arange(len(columns["dt"])) * columns["dt"][-1]
 
     # Plot the velocity and acceleration and look for any discontinuities
     plt.figure()
     plt.subplot(2, 1, 1)
     plt.title("Velocity")
-    plt.plot(x, [segment.velocity for segment in trajectory], marker='.', color='r',
+    plt.plot(x, columns["velocity"], marker='.', color='r',
              label='velocity')
     plt.grid()
     plt.subplot(2, 1, 2)
     plt.title("Acceleration")
-    plt.plot(x, [segment.acceleration for segment in trajectory], marker='.', color='b',
+    plt.plot(x, columns["acceleration"], marker='.', color='b',
              label='acceration')
     plt.grid()
     plt.tight_layout()
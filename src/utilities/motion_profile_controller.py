@@ -1,8 +1,10 @@
-from wpilib.notifier import Notifier
+import time
 from ctre._impl.autogen.ctre_sim_enums import SetValueMotionProfile
-from ctre._impl.motionprofilestatus import MotionProfileStatus
-from ctre.trajectorypoint import TrajectoryPoint
 from ctre.wpi_talonsrx import WPI_TalonSRX
+from utilities.trajectory_points import GetDurationMS
+from utilities.motion_profile_recorder import MotionProfileRecorder
+from utilities.notifier_scheduler import NOTIFIER_SCHEDULER
+from utilities.status_snapshot import StatusSnapshot
 from constants import LOGGER_LEVEL
 import logging
 logger = logging.getLogger(__name__)
@@ -14,6 +16,13 @@ class MotionProfileController():
     This controller is is used to manage the interface when runing Motion Profiles on the TalonSRX
     motor controllers.
 
+    Any number of Talons (axes) are run in lockstep, one point sequence per Talon.  The boom runs a single axis in MotionProfile mode and the
+    drivetrain runs the left and right sides in MotionProfileArc mode.  Every call to control() gets the status of all of the axes once (from
+    the notifier's snapshot while streaming) and any recovery needed before a start is done on all of the axes in that same loop.
+
+    The points are prebuilt TrajectoryPoint sequences from utilities/trajectory_points.py, so the direction and PID slot selection are already
+    applied.
+
     This code is based off of the following java example:
     https://github.com/CrossTheRoadElec/Phoenix-Examples-Languages/tree/master/Java/MotionProfiles
     """
@@ -22,19 +31,44 @@ class MotionProfileController():
     MIN_NUM_POINTS = 5
     NUM_LOOPS_TIMEOUT = 15
 
-    def __init__(self, talon, points, reverse, profile_slot_select0, profile_slot_select1):
+    # The top buffer is filled a chunk at a time, one chunk per call to control().  Each chunk tops the Talon buffers back up to
+    # TOP_BUFFER_TARGET points, limited by the free space the Talon reports and by FILL_CHUNK_MAX so a single loop never spends long
+    # pushing points.
+    TOP_BUFFER_TARGET = 200
+    FILL_CHUNK_MAX = 50
 
-        # Reference to the motion profile to run
-        self._points = points
-        self._profileSlotSelect0 = profile_slot_select0
-        self._profileSlotSelect1 = profile_slot_select1
-        self.reverse = reverse
+    # The bottom buffer size is 128.  Only move points into it while there is room.
+    BTM_BUFFER_LIMIT = 100
+
+    # The notifier moves one point into the bottom buffer per call and adapts its period to the bottom buffer occupancy.  Below
+    # BTM_BUFFER_LOW points it runs at twice the point rate (the old fixed rate) to build up a lead, between the thresholds it matches the
+    # point rate, and above BTM_BUFFER_HIGH points it runs at half the point rate and lets the executor drain the lead.  Below
+    # UNDERRUN_RISK_POINTS points a callback is counted as an underrun risk.
+    BTM_BUFFER_LOW = 20
+    BTM_BUFFER_HIGH = 60
+    UNDERRUN_RISK_POINTS = 5
+
+    # When new points are spliced onto a running motion profile, this many are moved into the bottom buffers straight away so the executor
+    # never runs dry waiting for the notifier.
+    SPLICE_LEAD_POINTS = 10
 
-        # Reference to the Talon SRX being used
-        self._talon = talon
+    def __init__(self, talons, points, control_mode=WPI_TalonSRX.ControlMode.MotionProfile, names=None):
 
-        # Create objects to receive the status.  This way, the status will be saved in a nice named tuple.
-        self._status = MotionProfileStatus
+        # Reference to the Talon SRXs being used and the motion profile each one runs
+        self._talons = tuple(talons)
+        self._points = tuple(points)
+        if len(self._talons) != len(self._points):
+            raise ValueError("Every Talon needs a motion profile")
+        if len(set(len(points) for points in self._points)) > 1:
+            raise ValueError("Every motion profile needs the same number of points")
+        self._names = tuple(names) if names is not None else tuple("Talon %i" % (i) for i in range(len(self._talons)))
+        self._controlMode = control_mode
+        self._numPoints = len(self._points[0])
+
+        # The status of each Talon, polled once per call to control(), and the instrumentation of the run
+        self._statuses = [None] * len(self._talons)
+        self._errors = [(0, 0)] * len(self._talons)
+        self._recorder = MotionProfileRecorder(self._names)
 
         # Control variables
         self._start = False
@@ -42,12 +76,22 @@ class MotionProfileController():
         self._finished = True
         self._loopTimeout = -1
         self._debugCnt = self.NOTIFIER_DEBUG_CNT
+        self._fillIndex = 0
+
+        # The trajectory points are streamed into the talon from a callback on the shared notifier (utilities/notifier_scheduler.py).  If the
+        # input stream_rate_ms is greater than 40ms, then it would be better to call streamMotionProfileBuffer() in the teleop/autonomous loops
+        # since we will stream at twice the rate of the motion profile...assuming all of the motion profile points match the first.  Assume every
+        # axis uses the same duration.  The notifier starts at the fastest stream rate and _updateStreamRate() adapts it from there.
+        self._pointDurationMS = GetDurationMS(self._points[0][0])
+        self._streamRateMS = int(self._pointDurationMS / 2)   # MP Duration
+        self._notifierPeriodMS = self._streamRateMS
 
-        # Create a _notifier to stream trajectory points into the talon.  If the input stream_rate_ms is greater than 40ms, then it would be better
-        # to call streamMotionProfileBuffer() in the teleop/autonomous loops since we will stream at twice the rate of the motion profile...assuming
-        # all of the motion profile points match the first.
-        self._streamRateMS = int(points[0][3] / 2)   # MP Duration
-        self._notifier = Notifier(self._streamToMotionProfileBuffer)
+        # While streaming, the notifier polls the status of every Talon on each callback and publishes it to control() through the snapshot, so
+        # neither side acts on a status that is a loop old.
+        self._snapshot = StatusSnapshot(len(self._talons))
+        self._snapshotSequence = self._snapshot.sequence
+        self._executing = False
+        self._resetStreamStats()
 
     def start(self):
         """
@@ -59,83 +103,177 @@ class MotionProfileController():
         self._finished = False
         self._loopTimeout = -1
         self._debugCnt = self.NOTIFIER_DEBUG_CNT
+        self._executing = False
+        self._notifierPeriodMS = self._streamRateMS
+        self._resetStreamStats()
+        self._recorder.reset()
 
     def isFinished(self):
         """
-        This method is called by a command to know when the path follower is finished.
+        This method is called by a command to know when this controller is finished.
         """
         return self._finished
 
+    def stop(self):
+        """
+        This method will stop streaming points to the Talons.  It is called by the command when it ends, so an interrupted motion profile does
+        not leave its callback on the notifier.
+        """
+        NOTIFIER_SCHEDULER.unregister(self._streamToMotionProfileBuffer)
+
+    def splice(self, points):
+        """
+        This method will replace the rest of a running motion profile with new points, one point sequence per Talon, without disabling the
+        Talon MPEs.  The buffered points are cleared and the first of the new points are moved straight into the bottom buffers, so the
+        executor goes from its active point into the new points.  The new points must continue from the active point and must not zero the
+        position (see BuildTrajectoryPoints).  Raises ValueError for empty point sequences.  Returns False, and does nothing, if the motion
+        profile isn't executing or is already at its last point.
+
+        The Talon API can only clear the top and bottom buffers together, so the bottom buffers are empty from the clear until the first of
+        the new points is processed (the spliceGapMS stat).  The executor keeps running its active point through the gap, which is a few CAN
+        frames, so it only underruns if the active point runs out first.  An underrun flagged during the splice is counted (spliceUnderruns)
+        and cleared, so it isn't taken for a streaming underrun when the next motion profile starts.
+        """
+        points = tuple(points)
+        if len(points) != len(self._talons):
+            raise ValueError("Every Talon needs a motion profile")
+        if len(set(len(axisPoints) for axisPoints in points)) > 1:
+            raise ValueError("Every motion profile needs the same number of points")
+        if len(points[0]) == 0:
+            raise ValueError("A splice needs at least one point, the buffered points would be cleared with nothing to run")
+        if self._state != 2 or not self._executing:
+            return False
+        if any(talon.getMotionProfileStatus().isLast for talon in self._talons):
+            return False
+
+        # The notifier keeps running.  If it fires part way through, it either finds an empty top buffer or moves the next of the new points.
+        hadUnderrun = [talon.getMotionProfileStatus().hasUnderrun for talon in self._talons]
+        self._points = points
+        self._numPoints = len(points[0])
+        chunk = min(self.FILL_CHUNK_MAX, self._numPoints)
+
+        # The points are pushed into the top buffer on the RoboRIO, so the gap is the clear and the first process call over CAN
+        spliceStart = time.perf_counter()
+        for talon, axisPoints in zip(self._talons, self._points):
+            talon.clearMotionProfileTrajectories()
+            for point in axisPoints[:chunk]:
+                talon.pushMotionProfileTrajectory(point)
+        self._fillIndex = chunk
+        for i in range(min(chunk, self.SPLICE_LEAD_POINTS)):
+            for talon in self._talons:
+                talon.processMotionProfileBuffer()
+                self._streamStats["processCalls"] += 1
+            if i == 0:
+                gapMS = (time.perf_counter() - spliceStart) * 1000
+                self._streamStats["maxSpliceGapMS"] = max(self._streamStats["maxSpliceGapMS"], gapMS)
+
+        for name, talon, underrun in zip(self._names, self._talons, hadUnderrun):
+            if talon.getMotionProfileStatus().hasUnderrun and not underrun:
+                logger.warning("%s Talon MPE underran during the splice (%1.1f ms gap)" % (name, gapMS))
+                talon.clearMotionProfileHasUnderrun(0)
+                self._streamStats["spliceUnderruns"] += 1
+
+        self._loopTimeout = self.NUM_LOOPS_TIMEOUT
+        self._streamStats["splices"] += 1
+        logger.info("Spliced %i points onto the running motion profile" % (self._numPoints))
+        return True
+
+    def getStatuses(self):
+        """
+        This method will return the motion profile status of each Talon from the last call to control().
+        """
+        return self._statuses
+
+    def getRecorder(self):
+        """
+        This method will return the MotionProfileRecorder of the current run.  Call its dump() method when the command ends.
+        """
+        return self._recorder
+
+    def getStreamStats(self):
+        """
+        This method will return the streaming and underrun risk counters of the current run as a dictionary:
+
+            notifierPeriodMS    the current notifier period
+            periodChanges       the number of times the notifier period was changed
+            callbacks           the number of notifier callbacks
+            processCalls        the number of processMotionProfileBuffer() calls
+            skippedProcessCalls the number of processMotionProfileBuffer() calls skipped (empty top buffer or full bottom buffer)
+            snapshotLoops       the number of control loops that used the status published by the notifier instead of polling
+            minOccupancy        the lowest bottom buffer occupancy while executing, in points
+            minLeadMS           minOccupancy as time left before the executor runs out of points
+            riskCallbacks       the number of callbacks below UNDERRUN_RISK_POINTS while executing
+            underrunLoops       the number of control loops with a Talon reporting an underrun
+            splices             the number of times new points were spliced onto the motion profile
+            maxSpliceGapMS      the longest time the bottom buffers were empty during a splice, as seen from the RoboRIO
+            spliceUnderruns     the number of underruns flagged during a splice
+        """
+        stats = dict(self._streamStats)
+        stats["notifierPeriodMS"] = self._notifierPeriodMS
+        stats["minLeadMS"] = int(stats["minOccupancy"] * self._pointDurationMS) if stats["minOccupancy"] is not None else None
+        return stats
+
     def control(self):
         """
         This method is called by the command every 20ms in autonomous or teleop.
         """
-        # Get the current status of the motion profiler controller
-        self._status = self._talon.getMotionProfileStatus()
+        # Get the current status of all of the Talon MPEs in one pass
+        self._pollStatuses()
 
-        # In this state, we are waiting for the start signal.  Once received, make sure the Talon MPE is in a state to begin executing a new
+        # In this state, we are waiting for the start signal.  Once received, make sure the Talon MPEs are in a state to begin executing a new
         # motion profile.  The talon's should already be in a good start from the _initialize() method.
         if self._state == 0:
             if self._start:
-                # Make sure the Talon MPE is disabled before servicing the start signal
-                if self._status.outputEnable != SetValueMotionProfile.Disable:
-                    logger.warning("Disabling the Talon MPE")
-                    self._talon.set(WPI_TalonSRX.ControlMode.MotionProfile, SetValueMotionProfile.Disable)
-
-                # Log any prior underrun conitions
-                elif self._status.hasUnderrun:
-                    logger.warning("Clearing Talon MPE underrun")
-                    self._talon.clearMotionProfileHasUnderrun(0)
-
-                # Make sure the top and bottom buffers are empty
-                elif self._status.btmBufferCnt != 0 or self._status.topBufferCnt != 0:
-                    logger.warning("Clearing Talon MPE buffer(s)")
-                    self._talon.clearMotionProfileTrajectories()
-
-                # The Talon MPE status is in a good state, start filling the top buffer and kick
-                # off the notifier which moves the top buffer data into the bottom buffer.
-                else:
+                # Any recovery is done on every axis that needs it in this loop.  The next loop's status will confirm the Talon MPEs are ready.
+                if not self._recover():
+
+                    # The Talon MPE statuses are in a good state, start filling the top buffers and kick off the notifier which moves the top
+                    # buffer data into the bottom buffers.
                     logger.info("Starting the Motion Profile Controller")
                     self._start = False
                     self._state = 1
                     self._loopTimeout = self.NUM_LOOPS_TIMEOUT
                     self._startFilling()
-                    self._notifier.startPeriodic(self._streamRateMS / 1000)
+                    NOTIFIER_SCHEDULER.register(self._streamToMotionProfileBuffer, self._streamRateMS)
 
-        # In this state, the Talon MPE has started filling the buffer.  Once enough points have been loaded into the bottom buffer, enable the
-        # Talon MPE.
+        # In this state, the Talon MPEs have started filling the buffer.  Once enough points have been loaded into all of the bottom buffers,
+        # enable the Talon MPEs.
         elif self._state == 1:
-            if self._status.btmBufferCnt > self.MIN_NUM_POINTS:
-                logger.info("Talon MPE bottom buffer is ready, enabling the Talon MPE")
+            self._fillTopBuffer()
+            if all(status.btmBufferCnt > self.MIN_NUM_POINTS for status in self._statuses):
+                logger.info("Talon MPE bottom buffers are ready, enabling the Talon MPEs")
                 self._loopTimeout = self.NUM_LOOPS_TIMEOUT
-                self._talon.set(WPI_TalonSRX.ControlMode.MotionProfile, SetValueMotionProfile.Enable)
+                self._setAll(SetValueMotionProfile.Enable)
+                self._recorder.recordEnable()
+                self._executing = True
                 self._state = 2
 
         # In this state, check status of the MP and if there isn't an underrun condition, reset the loop timeout.  This is basically waiting for the
         # motion profile executer to complete processing the trajectories.
         elif self._state == 2:
-            if not self._status.isUnderrun:
+            self._fillTopBuffer()
+            if not any(status.isUnderrun for status in self._statuses):
                 self._loopTimeout = self.NUM_LOOPS_TIMEOUT
             else:
+                self._streamStats["underrunLoops"] += 1
                 self._outputStatus()
 
-            # If both of the Talon's are at their last trajectory points then stop the notifier, disable the Motion Profile Executer and move on to
-            # state 3.
-            if self._status.activePointValid and self._status.isLast:
-                logger.info("Talon MPE is at the last trajectory point")
-                self._notifier.stop()
-                self._talon.set(WPI_TalonSRX.ControlMode.MotionProfile, SetValueMotionProfile.Disable)
+            # If all of the Talon's are at their last trajectory points then stop the notifier, disable the Motion Profile Executers and move on
+            # to state 3.
+            if all(status.activePointValid and status.isLast for status in self._statuses):
+                logger.info("Talon MPEs are at the last trajectory point")
+                self.stop()
+                self._setAll(SetValueMotionProfile.Disable)
+                self._executing = False
                 self._state = 3
 
-        # In this state, we are ready to exit the motion profile.  Mark the command as complete and remove the notifier.
+        # In this state, we are ready to exit the motion profile.  Mark the command as complete.
         elif self._state == 3:
+            logger.info("Stopping the Motion Profile Controller")
+            logger.info("Streaming: %(callbacks)i callbacks, %(processCalls)i points, %(periodChanges)i period changes, minimum lead %(minLeadMS)s ms, "
+                        "%(riskCallbacks)i underrun risk callbacks, %(underrunLoops)i underrun loops" % self.getStreamStats())
             self._finished = True
 
-            # Call the free method on the notifier to hopefully stop/destroy it.  Dereference the notifier object...not sure if the garbage collector
-            # will do the rest.  This needs Chris's help.
-            self._notifier.free()
-            del(self._notifier)
-
         # Service the loop timeout.  If the loop is stalled out, report the motion profile status, set the state to 3, and stop the notifier.  This
         # will hopefully exit gracefully.
         if self._loopTimeout < 0:
@@ -145,82 +283,186 @@ class MotionProfileController():
                 logger.warning("No progress being made - State = %i" % (self._state))
                 self._outputStatus()
                 self._state = 3
-                self._notifier.stop()
+                self.stop()
             else:
                 self._loopTimeout -= 1
 
+        self._recorder.recordLoop(self._state, self._statuses, self._errors)
+
+    def _pollStatuses(self):
+        """
+        This method will get the motion profile status of every Talon.  If the notifier has published a new snapshot since the last loop, that
+        is used, otherwise the Talons are polled here.
+        """
+        statuses, _, sequence = self._snapshot.read()
+        if sequence != self._snapshotSequence and NOTIFIER_SCHEDULER.isRegistered(self._streamToMotionProfileBuffer):
+            self._snapshotSequence = sequence
+            self._statuses[:] = statuses
+            self._streamStats["snapshotLoops"] += 1
+        else:
+            for i, talon in enumerate(self._talons):
+                self._statuses[i] = talon.getMotionProfileStatus()
+
+        for i, talon in enumerate(self._talons):
+            # The tracking error only means something while the Talon MPE is executing
+            if self._executing:
+                self._errors[i] = (talon.getClosedLoopError(0), talon.getClosedLoopError(1))
+            else:
+                self._errors[i] = (0, 0)
+
+    def _setAll(self, value):
+        """
+        This method will set the motion profile output of every Talon.
+        """
+        for talon in self._talons:
+            talon.set(self._controlMode, value)
+
+    def _recover(self, when=""):
+        """
+        This method will get every Talon MPE ready for a new motion profile: disabled, no underrun, and empty buffers.  All of the actions needed
+        are done in one pass.  Returns True if any Talon needed a recovery action.
+        """
+        recovered = False
+        for name, talon, status in zip(self._names, self._talons, self._statuses):
+
+            # Make sure the Talon MPE is disabled before servicing the start signal
+            if status.outputEnable != SetValueMotionProfile.Disable:
+                logger.warning("Disabling the %s Talon MPE%s" % (name, when))
+                talon.set(self._controlMode, SetValueMotionProfile.Disable)
+                recovered = True
+
+            # Log any prior underrun conitions
+            if status.hasUnderrun:
+                logger.warning("Clearing %s Talon MPE underrun%s" % (name, when))
+                talon.clearMotionProfileHasUnderrun(0)
+                recovered = True
+
+            # Make sure the top and bottom buffers are empty
+            if status.btmBufferCnt != 0 or status.topBufferCnt != 0:
+                logger.warning("Clearing %s Talon MPE buffer(s)%s" % (name, when))
+                talon.clearMotionProfileTrajectories()
+                recovered = True
+        return recovered
+
     def _initialize(self):
         """
         This method will initialize the motion profile controller by clearing out any trajectories still in the buffer, setting the control mode to
         motion profile (disabled), change the control frame period to the stream rate, and clearing any prior buffer underruns.
         """
-        self._talon.changeMotionControlFramePeriod(self._streamRateMS)
-        self._talon.set(WPI_TalonSRX.ControlMode.MotionProfile, SetValueMotionProfile.Disable)
-        if self._status.hasUnderrun:
-            logger.warning("Clearing UNDERRUN condition during reset")
-            self._talon.clearMotionProfileHasUnderrun(0)
-        if self._status.btmBufferCnt != 0 or self._status.topBufferCnt != 0:
-            logger.warning("Clearing MPE buffer(s)")
-            self._talon.clearMotionProfileTrajectories()
+        for talon in self._talons:
+            talon.changeMotionControlFramePeriod(self._streamRateMS)
+        self._setAll(SetValueMotionProfile.Disable)
+        self._pollStatuses()
+        self._recover(" during initialization")
 
     def _streamToMotionProfileBuffer(self):
         """
         This method will move the trajectory points from the top-buffer to the bottom-buffer.
         """
+        # Print out a message letting the us know that the notifier is running.
         if self._debugCnt == 0:
             if self._finished:
-                logger.warning('Motion Profile Controller notifier is running')
+                logger.warning('Motion Profile Controller notifier is still running')
             self._debugCnt = self.NOTIFIER_DEBUG_CNT
         else:
             self._debugCnt -= 1
 
-        # The bottom buffer size is 128.  Make sure there is space before moving trying to move the data.
-        if self._status.btmBufferCnt < 100:
-            self._talon.processMotionProfileBuffer()
+        # Poll the Talons and only move a point when there is one in the top buffer and space for it in the bottom buffer.  The statuses are
+        # published to control() when the callback is done.
+        self._recorder.recordCallback(self._notifierPeriodMS)
+        self._streamStats["callbacks"] += 1
+        statuses = self._snapshot.back()
+        occupancy = self.BTM_BUFFER_LIMIT
+        pointsPending = self._fillIndex < self._numPoints
+        for i, talon in enumerate(self._talons):
+            status = talon.getMotionProfileStatus()
+            btmBufferCnt = status.btmBufferCnt
+            if status.topBufferCnt > 0 and btmBufferCnt < self.BTM_BUFFER_LIMIT:
+                talon.processMotionProfileBuffer()
+                self._streamStats["processCalls"] += 1
+                btmBufferCnt += 1
+            else:
+                self._streamStats["skippedProcessCalls"] += 1
+            if status.topBufferCnt > 1:
+                pointsPending = True
+            occupancy = min(occupancy, btmBufferCnt)
+            statuses[i] = status
+        self._snapshot.publish()
 
-    def _startFilling(self):
+        self._updateStreamRate(occupancy, pointsPending)
+
+    def _updateStreamRate(self, occupancy, points_pending):
+        """
+        This method will pick the notifier period for the bottom buffer occupancy (the lowest of all of the axes) and record the underrun risk
+        counters.  Once every point is in the bottom buffers, the occupancy running down is the end of the profile rather than a risk.
         """
-        This method will start filling the top buffer of the Talon MPE.  This will execute quickly.  The closed loop postion values will be zero'd
-        out at the beginning of each path.
-        """
-        for i in range(len(self._points)):
-            point = TrajectoryPoint(-self._points[i][0] if self.reverse else self._points[i][0],
-                                    -self._points[i][1] if self.reverse else self._points[i][1],
-                                    self._points[i][2],
-                                    self._profileSlotSelect0,
-                                    self._profileSlotSelect1,
-                                    True if i+1 == len(self._points) else False,
-                                    True if i == 0 else False,
-                                    self._getTrajectoryDuration(self._points[0][3]))
-            self._talon.pushMotionProfileTrajectory(point)
-
-    def _getTrajectoryDuration(self, duration):
-        """
-        This method will return the trajectory duration enumeration.
-        """
-        if duration == 0:
-            return TrajectoryPoint.TrajectoryDuration.T0ms
-        elif duration == 5:
-            return TrajectoryPoint.TrajectoryDuration.T5ms
-        elif duration == 10:
-            return TrajectoryPoint.TrajectoryDuration.T10ms
-        elif duration == 20:
-            return TrajectoryPoint.TrajectoryDuration.T20ms
-        elif duration == 30:
-            return TrajectoryPoint.TrajectoryDuration.T30ms
-        elif duration == 40:
-            return TrajectoryPoint.TrajectoryDuration.T40ms
-        elif duration == 50:
-            return TrajectoryPoint.TrajectoryDuration.T50ms
-        elif duration == 100:
-            return TrajectoryPoint.TrajectoryDuration.T100ms
+        if self._executing and points_pending:
+            if self._streamStats["minOccupancy"] is None or occupancy < self._streamStats["minOccupancy"]:
+                self._streamStats["minOccupancy"] = occupancy
+            if occupancy < self.UNDERRUN_RISK_POINTS:
+                self._streamStats["riskCallbacks"] += 1
+
+        if occupancy < self.BTM_BUFFER_LOW:
+            periodMS = self._streamRateMS
+        elif occupancy < self.BTM_BUFFER_HIGH:
+            periodMS = self._pointDurationMS
         else:
-            logger.critical("Unsupported duration %i" % (duration))
-            return TrajectoryPoint.TrajectoryDuration.T0ms
+            periodMS = 2 * self._pointDurationMS
+
+        # The scheduler won't move the callback if control() has just stopped it
+        if periodMS != self._notifierPeriodMS and NOTIFIER_SCHEDULER.setPeriod(self._streamToMotionProfileBuffer, periodMS):
+            self._notifierPeriodMS = periodMS
+            self._streamStats["periodChanges"] += 1
+            self._recorder.recordPeriodChange()
+
+    def _resetStreamStats(self):
+        self._streamStats = {"periodChanges": 0,
+                             "callbacks": 0,
+                             "processCalls": 0,
+                             "skippedProcessCalls": 0,
+                             "snapshotLoops": 0,
+                             "minOccupancy": None,
+                             "riskCallbacks": 0,
+                             "underrunLoops": 0,
+                             "splices": 0,
+                             "maxSpliceGapMS": 0.0,
+                             "spliceUnderruns": 0}
+
+    def _startFilling(self):
+        """
+        This method will start filling the top buffers of the Talon MPEs.  Only the first chunk of points is pushed here, the rest of the points
+        are pushed by _fillTopBuffer() on the following loops.
+        """
+        self._fillIndex = 0
+        self._fillTopBuffer()
+
+    def _getFillChunkSize(self, status):
+        """
+        This method will return how many points can be pushed into a Talon this loop, based on the points already queued and the free space in
+        the top buffer.
+        """
+        queued = status.topBufferCnt + status.btmBufferCnt
+        return max(0, min(self.FILL_CHUNK_MAX, status.topBufferRem, self.TOP_BUFFER_TARGET - queued))
+
+    def _fillTopBuffer(self):
+        """
+        This method will push the next chunk of trajectory points into the top buffer of every Talon.  The closed loop postion values will be
+        zero'd out at the beginning of each path.  This does not include the zero'ing of the gyro.
+        """
+        if self._fillIndex >= self._numPoints:
+            return
+
+        # All of the axes are pushed in lockstep, so use the smallest of the chunks
+        chunk = min(self._getFillChunkSize(status) for status in self._statuses)
+        end = min(self._fillIndex + chunk, self._numPoints)
+        for talon, points in zip(self._talons, self._points):
+            for point in points[self._fillIndex:end]:
+                talon.pushMotionProfileTrajectory(point)
+        self._fillIndex = end
 
     def _outputStatus(self):
-        logger.warning("isUnderrun: %s, hasUnderrun: %s, topBufferRem: %s, topBufferCnt: %i, btmBufferCnt: %i, activePointValid: %s, "
-                       " isLast: %s, mode: %i, timeDureMS: %i" %
-                       (self._status.isUnderrun, self._status.hasUnderrun, self._status.topBufferRem, self._status.topBufferCnt,
-                        self._status.btmBufferCnt, self._status.activePointValid, self._status.isLast, self._status.outputEnable,
-                        self._status.timeDurMs))
+        for name, status in zip(self._names, self._statuses):
+            logger.warning("%s: isUnderrun: %s, hasUnderrun: %s, topBufferRem: %s, topBufferCnt: %i, btmBufferCnt: %i, activePointValid: %s, "
+                           "isLast: %s, mode: %i, timeDureMS: %i" %
+                           (name, status.isUnderrun, status.hasUnderrun, status.topBufferRem, status.topBufferCnt, status.btmBufferCnt,
+                            status.activePointValid, status.isLast, status.outputEnable, status.timeDurMs))
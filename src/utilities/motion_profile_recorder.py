@@ -0,0 +1,217 @@
+import array
+import copy
+import csv
+import os
+import queue
+import threading
+import time
+from constants import LOGGER_LEVEL, MP_RECORDING_PATH
+import logging
+logger = logging.getLogger(__name__)
+logger.setLevel(LOGGER_LEVEL)
+
+
+class MotionProfileRecorder():
+    """
+    This recorder keeps the instrumentation of one motion profile run: the time spent in each controller state, the loops it took to enable
+    the Talon MPEs, the underrun count and duration, the notifier callback jitter, and a per-loop series of the top/bottom buffer counts and
+    closed loop errors of each Talon.  The closed loop errors are read once per control() loop (every 20ms), not once per trajectory point or
+    notifier callback.  The series are kept in preallocated ring buffers, so recording never allocates in the control loop.  Call dump() when
+    the command ends.
+    """
+
+    CAPACITY = 1024             # Control loops, about 20s at 20ms
+    JITTER_CAPACITY = 4096      # Notifier callbacks
+    NUM_STATES = 4
+    AXIS_COLUMNS = ("TopBufferCnt", "BtmBufferCnt", "PrimaryError", "SecondaryError")
+
+    def __init__(self, names):
+        self._names = tuple(names)
+        self.columns = ("Time", "State") + tuple(name + column for name in self._names for column in self.AXIS_COLUMNS)
+        self._samples = array.array("d", bytes(8 * self.CAPACITY * len(self.columns)))
+        self._jitter = array.array("d", bytes(8 * self.JITTER_CAPACITY))
+        self.reset()
+
+    def reset(self):
+        """
+        This method will clear the recording for a new run.
+        """
+        self._startTime = time.monotonic()
+        self._sampleCnt = 0
+        self._jitterCnt = 0
+        self._lastTime = None
+        self._lastState = 0
+        self._lastCallbackTime = None
+        self._underrun = False
+        self.loops = 0
+        self.loopsToEnable = None
+        self.stateTimes = [0.0] * self.NUM_STATES
+        self.underrunCnt = 0
+        self.underrunTime = 0.0
+        self.maxJitterMS = 0.0
+
+    def recordLoop(self, state, statuses, errors):
+        """
+        This method is called at the end of every control loop with the controller state, the polled status of each Talon, and the
+        (primary, secondary) closed loop error of each Talon.
+        """
+        now = time.monotonic()
+        if self._lastTime is not None:
+            dt = now - self._lastTime
+            self.stateTimes[self._lastState] += dt
+            if self._underrun:
+                self.underrunTime += dt
+        self._lastTime = now
+        self._lastState = state
+        self.loops += 1
+
+        underrun = any(status.isUnderrun for status in statuses)
+        if underrun and not self._underrun:
+            self.underrunCnt += 1
+        self._underrun = underrun
+
+        # Write the sample into the next row of the ring buffer
+        width = len(self.columns)
+        row = (self._sampleCnt % self.CAPACITY) * width
+        self._samples[row] = now - self._startTime
+        self._samples[row + 1] = state
+        column = row + 2
+        for status, (primaryError, secondaryError) in zip(statuses, errors):
+            self._samples[column] = status.topBufferCnt
+            self._samples[column + 1] = status.btmBufferCnt
+            self._samples[column + 2] = primaryError
+            self._samples[column + 3] = secondaryError
+            column += len(self.AXIS_COLUMNS)
+        self._sampleCnt += 1
+
+    def recordEnable(self):
+        """
+        This method is called when the Talon MPEs are enabled.
+        """
+        if self.loopsToEnable is None:
+            self.loopsToEnable = self.loops
+
+    def recordCallback(self, period_ms):
+        """
+        This method is called by every notifier callback with the notifier period it was scheduled at.  The jitter is the difference between
+        the measured and the scheduled time between callbacks.
+        """
+        now = time.monotonic()
+        if self._lastCallbackTime is not None:
+            jitterMS = (now - self._lastCallbackTime) * 1000 - period_ms
+            self._jitter[self._jitterCnt % self.JITTER_CAPACITY] = jitterMS
+            self._jitterCnt += 1
+            if abs(jitterMS) > abs(self.maxJitterMS):
+                self.maxJitterMS = jitterMS
+        self._lastCallbackTime = now
+
+    def recordPeriodChange(self):
+        """
+        This method is called when the notifier is restarted at a new period, so the next interval is not counted as jitter.
+        """
+        self._lastCallbackTime = None
+
+    def getSamples(self):
+        """
+        This method will return the recorded loops, oldest first, as a list of rows matching the columns.
+        """
+        width = len(self.columns)
+        count = min(self._sampleCnt, self.CAPACITY)
+        first = self._sampleCnt - count
+        return [self._samples[(i % self.CAPACITY) * width:(i % self.CAPACITY + 1) * width].tolist() for i in range(first, self._sampleCnt)]
+
+    def getJitter(self):
+        """
+        This method will return the recorded notifier callback jitter in ms, oldest first.
+        """
+        count = min(self._jitterCnt, self.JITTER_CAPACITY)
+        return [self._jitter[i % self.JITTER_CAPACITY] for i in range(self._jitterCnt - count, self._jitterCnt)]
+
+    def dump(self, name):
+        """
+        This method will hand a copy of the recording to the RECORDING_WRITER thread, which logs the summary and saves the files (see save()).
+        Only the ring buffers are copied here, so a command can call this from end() without holding up the robot loop, and the recorder can be
+        reset for the next run straight away.
+        """
+        recording = copy.copy(self)
+        recording._samples = self._samples[:]
+        recording._jitter = self._jitter[:]
+        recording.stateTimes = list(self.stateTimes)
+        RECORDING_WRITER.put(recording, name)
+
+    def save(self, name):
+        """
+        This method will log a summary of the run.  If MP_RECORDING_PATH is set, the loop series and the jitter are also saved there as
+        <name>_<time>.csv and <name>_<time>_jitter.csv.  It is run on the RECORDING_WRITER thread by dump().
+        """
+        jitter = self.getJitter()
+        logger.info("%s: state times %s s, %s loops to enable, %i underruns (%1.3f s), jitter mean %1.2f ms max %1.2f ms" %
+                    (name, ", ".join("%1.3f" % (stateTime) for stateTime in self.stateTimes), self.loopsToEnable, self.underrunCnt,
+                     self.underrunTime, sum(jitter) / len(jitter) if jitter else 0.0, self.maxJitterMS))
+
+        # Only the loops where the Talon MPEs were executing (state 2) say anything about the buffers and the tracking
+        samples = self.getSamples()
+        executing = [sample for sample in samples if sample[1] == 2]
+        for i, axisName in enumerate(self._names):
+            column = 2 + i * len(self.AXIS_COLUMNS)
+            if executing:
+                logger.info("%s %s: min bottom buffer %i, max primary error %i, max secondary error %i" %
+                            (name, axisName, min(sample[column + 1] for sample in executing),
+                             max(abs(sample[column + 2]) for sample in executing), max(abs(sample[column + 3]) for sample in executing)))
+
+        if MP_RECORDING_PATH is None:
+            return
+        try:
+            os.makedirs(MP_RECORDING_PATH, exist_ok=True)
+            fileName = os.path.join(MP_RECORDING_PATH, "%s_%s" % (name, time.strftime("%Y%m%d_%H%M%S")))
+            with open(fileName + ".csv", "w", newline="") as fp:
+                writer = csv.writer(fp)
+                writer.writerow(self.columns)
+                writer.writerows(samples)
+            with open(fileName + "_jitter.csv", "w", newline="") as fp:
+                writer = csv.writer(fp)
+                writer.writerow(("JitterMS",))
+                writer.writerows((value,) for value in jitter)
+        except OSError:
+            logger.exception("Unable to save the motion profile recording")
+
+
+class RecordingWriter():
+    """
+    Logs the summaries and saves the files of the finished motion profile runs on its own thread, so the robot loops never wait on them.  The
+    thread is started the first time a recording is put.  Use the RECORDING_WRITER instance below instead of creating a new writer.
+    """
+
+    def __init__(self):
+        self._queue = queue.Queue()
+        self._lock = threading.Lock()
+        self._thread = None
+
+    def put(self, recorder, name):
+        """
+        Queue a recording to be saved.  This never blocks.
+        """
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="MotionProfileRecordingWriter", daemon=True)
+                self._thread.start()
+        self._queue.put((recorder, name))
+
+    def flush(self):
+        """
+        Wait until every queued recording has been saved.  Only for scripts that exit once they are done, never call this in the robot loops.
+        """
+        self._queue.join()
+
+    def _run(self):
+        while True:
+            recorder, name = self._queue.get()
+            try:
+                recorder.save(name)
+            except Exception:
+                logger.exception("Unable to save the %s motion profile recording" % (name))
+            finally:
+                self._queue.task_done()
+
+
+RECORDING_WRITER = RecordingWriter()
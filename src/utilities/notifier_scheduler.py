@@ -0,0 +1,124 @@
+import threading
+from wpilib.notifier import Notifier
+from wpilib.timer import Timer
+from constants import LOGGER_LEVEL
+import logging
+logger = logging.getLogger(__name__)
+logger.setLevel(LOGGER_LEVEL)
+
+
+class NotifierScheduler():
+    """
+    A single long-lived notifier that runs the periodic streaming callbacks of all of the motion profile controllers.  Callbacks with the same
+    period are grouped and run back to back on one wakeup, and the notifier is re-armed for the next group that is due.  The notifier thread is
+    created the first time a callback is registered and lives for the rest of the program, so starting and stopping a controller never
+    creates or frees a thread.  Use the NOTIFIER_SCHEDULER instance below instead of creating a new scheduler.
+    """
+
+    # Groups due within this time of a wakeup are run on that wakeup
+    COALESCE_WINDOW_S = 0.0005
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._notifier = None
+
+        # Period in ms -> [next run time in s, list of callbacks]
+        self._groups = {}
+        self._periods = {}
+
+    def register(self, callback, period_ms):
+        """
+        This method will start calling the callback every period_ms.  The first call is one period from now, or with the other callbacks of
+        the same period if there are any.
+        """
+        with self._lock:
+            if self._notifier is None:
+                self._notifier = Notifier(self._run)
+            if callback in self._periods:
+                self._remove(callback)
+            group = self._groups.get(period_ms)
+            if group is None:
+                group = [Timer.getFPGATimestamp() + period_ms / 1000, []]
+                self._groups[period_ms] = group
+            group[1].append(callback)
+            self._periods[callback] = period_ms
+            self._arm()
+
+    def unregister(self, callback):
+        """
+        This method will stop calling the callback.  It is safe to call for a callback that is not registered.  A call that is already running
+        on the notifier thread will still finish.
+        """
+        with self._lock:
+            if callback in self._periods:
+                self._remove(callback)
+                self._arm()
+
+    def setPeriod(self, callback, period_ms):
+        """
+        This method will move a registered callback to a new period.  Returns False, and does nothing, if the callback is not registered, so a
+        callback can't re-register itself after being unregistered.
+        """
+        with self._lock:
+            if callback not in self._periods:
+                return False
+            if self._periods[callback] != period_ms:
+                self.register(callback, period_ms)
+            return True
+
+    def isRegistered(self, callback):
+        with self._lock:
+            return callback in self._periods
+
+    def getPeriods(self):
+        """
+        This method will return a dictionary of the number of callbacks registered at each period.
+        """
+        with self._lock:
+            return {periodMS: len(group[1]) for periodMS, group in self._groups.items()}
+
+    def _remove(self, callback):
+        periodMS = self._periods.pop(callback)
+        callbacks = self._groups[periodMS][1]
+        callbacks.remove(callback)
+        if not callbacks:
+            del self._groups[periodMS]
+
+    def _arm(self):
+        """
+        Set the notifier for the next group that is due, or stop it if there are no callbacks.
+        """
+        if not self._groups:
+            self._notifier.stop()
+            return
+        nextTime = min(group[0] for group in self._groups.values())
+        self._notifier.startSingle(max(0.0, nextTime - Timer.getFPGATimestamp()))
+
+    def _run(self):
+        """
+        The notifier handler.  Run every group that is due and re-arm the notifier.  A group that has fallen more than a period behind skips
+        the missed calls rather than running them back to back.
+        """
+        with self._lock:
+            now = Timer.getFPGATimestamp()
+            due = []
+            for periodMS, group in self._groups.items():
+                if group[0] <= now + self.COALESCE_WINDOW_S:
+                    due.extend(group[1])
+                    group[0] += periodMS / 1000
+                    if group[0] < now:
+                        group[0] = now + periodMS / 1000
+            if self._groups:
+                self._arm()
+
+        # Run the callbacks outside of the lock, so they can change their own registration
+        for callback in due:
+            if callback not in self._periods:
+                continue
+            try:
+                callback()
+            except Exception:
+                logger.exception("Notifier callback failed")
+
+
+NOTIFIER_SCHEDULER = NotifierScheduler()
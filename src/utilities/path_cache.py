@@ -0,0 +1,127 @@
+import hashlib
+import os
+import pickle
+import numpy as np
+import constants
+
+SRC_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+CACHE_DIR = os.path.join(SRC_DIR, ".path_cache")
+
+# Bump this when the cached data or the conversions change so old entries are not reused
+CACHE_VERSION = 1
+
+# The fields of the pathfinder settings that change the generated trajectory
+SETTINGS_FIELDS = ("order", "samples", "period", "maxVelocity", "maxAcceleration", "maxJerk")
+
+# The robot constants read by the drivetrain path conversions
+CONVERSION_CONSTANTS = ("ROBOT_WHEELBASE_FT", "ROBOT_WHEEL_DIAMETER_FT",
+                        "DRIVETRAIN_LEFT_KV", "DRIVETRAIN_LEFT_KA", "DRIVETRAIN_LEFT_V_INTERCEPT",
+                        "DRIVETRAIN_RIGHT_KV", "DRIVETRAIN_RIGHT_KA", "DRIVETRAIN_RIGHT_V_INTERCEPT")
+
+
+def WaypointsKey(waypoints):
+    """
+    This function will return the hashable part of a list of pathfinder waypoints.
+    """
+    return tuple((waypoint.x, waypoint.y, waypoint.angle) for waypoint in waypoints)
+
+
+def SettingsKey(settings):
+    """
+    This function will return the hashable part of the pathfinder settings.  The settings can be the PathFinderSettings named tuple or a class
+    with the same attributes.
+    """
+    return tuple(getattr(settings, field) for field in SETTINGS_FIELDS)
+
+
+def ConstantsKey():
+    """
+    This function will return the current values of the robot constants used by the drivetrain path conversions.
+    """
+    return tuple((name, getattr(constants, name)) for name in CONVERSION_CONSTANTS)
+
+
+class PathCache():
+    """
+    A content-addressed cache for the path generators.  There are two levels:
+
+    1. The pathfinder trajectory, keyed on the waypoints and the pathfinder settings.  This is the expensive spline fit.
+    2. The converted path written for the robot code, keyed on the level 1 key, the conversion options and the robot constants.
+
+    Changing a robot constant (wheelbase, kV, kA...) only misses level 2, so the spline fit is reused.
+    """
+
+    def __init__(self, cache_dir=CACHE_DIR):
+        self.cacheDir = cache_dir
+        self.enabled = True
+        self.hits = {"trajectory": 0, "path": 0}
+        self.misses = {"trajectory": 0, "path": 0}
+
+    def trajectoryKey(self, waypoints, settings):
+        """
+        This method will return the level 1 key for a pathfinder trajectory.
+        """
+        return self._hash("trajectory", WaypointsKey(waypoints), SettingsKey(settings))
+
+    def pathKey(self, trajectory_key, *options):
+        """
+        This method will return the level 2 key for a converted path.  The options should include the name of the conversion and all of its
+        arguments.
+        """
+        return self._hash("path", trajectory_key, options, ConstantsKey())
+
+    def loadTrajectory(self, key):
+        """
+        This method will return the cached trajectory columns (see functions.TrajectoryColumns) or None on a miss.
+        """
+        fileName = self._fileName(key, ".npz")
+        if self.enabled and os.path.exists(fileName):
+            with np.load(fileName) as data:
+                columns = {field: data[field] for field in data.files}
+            self.hits["trajectory"] += 1
+            return columns
+        self.misses["trajectory"] += 1
+        return None
+
+    def storeTrajectory(self, key, columns):
+        """
+        This method will save the trajectory columns under the given key.
+        """
+        if self.enabled:
+            self._write(self._fileName(key, ".npz"), lambda fp: np.savez(fp, **columns))
+
+    def loadPath(self, key):
+        """
+        This method will return the cached robot path or None on a miss.
+        """
+        fileName = self._fileName(key, ".pickle")
+        if self.enabled and os.path.exists(fileName):
+            with open(fileName, "rb") as fp:
+                path = pickle.load(fp)
+            self.hits["path"] += 1
+            return path
+        self.misses["path"] += 1
+        return None
+
+    def storePath(self, key, path):
+        """
+        This method will save the robot path under the given key.
+        """
+        if self.enabled:
+            self._write(self._fileName(key, ".pickle"), lambda fp: pickle.dump(path, fp))
+
+    def _hash(self, *parts):
+        return hashlib.sha256(repr((CACHE_VERSION,) + parts).encode("utf-8")).hexdigest()
+
+    def _fileName(self, key, extension):
+        return os.path.join(self.cacheDir, key[:2], key + extension)
+
+    def _write(self, file_name, dump):
+        """
+        Write the file under a temporary name and move it into place, so parallel builds never read a partial entry.
+        """
+        os.makedirs(os.path.dirname(file_name), exist_ok=True)
+        tempFileName = "%s.%i.tmp" % (file_name, os.getpid())
+        with open(tempFileName, "wb") as fp:
+            dump(fp)
+        os.replace(tempFileName, file_name)
@@ -0,0 +1,269 @@
+import math
+import threading
+import time
+import numpy as np
+from wpilib.timer import Timer
+from ctre.wpi_talonsrx import WPI_TalonSRX
+from utilities.asset_store import ASSET_STORE
+from utilities.notifier_scheduler import NOTIFIER_SCHEDULER
+from constants import LOGGER_LEVEL, ROBOT_WHEELBASE_FT, ROBOT_WHEEL_DIAMETER_FT, \
+    DRIVETRAIN_LEFT_KV, DRIVETRAIN_LEFT_KA, DRIVETRAIN_LEFT_V_INTERCEPT, \
+    DRIVETRAIN_RIGHT_KV, DRIVETRAIN_RIGHT_KA, DRIVETRAIN_RIGHT_V_INTERCEPT
+import logging
+logger = logging.getLogger(__name__)
+logger.setLevel(LOGGER_LEVEL)
+
+# CTRE SRX Mag encoder: 4096 units per rotation
+FEET_PER_TICK = ROBOT_WHEEL_DIAMETER_FT * math.pi / 4096
+
+# Columns of the reference table
+REFERENCE_COLUMNS = ("x", "y", "theta", "v", "omega", "leftAcceleration", "rightAcceleration")
+
+
+class RamseteReference():
+    """
+    The reference trajectory of a drivetrain path for the RamseteController.  The path files only hold the wheel positions (encoder units) and
+    a heading, so the reference pose is rebuilt from them the same way the robot's odometry is: the center distance is integrated along the
+    heading.  This keeps the reference in the same frame as the odometry.  All of the columns are built once with NumPy when the path is
+    loaded, and each lookup is one interpolation between two rows of the table.
+
+    The heading column can't be used, since the committed paths were built with different heading units (tenths of a degree in the older
+    files, rotations from the current GeneratePath) and the reverse paths hold the heading of the forward path.  The heading is taken from
+    the difference of the wheel positions instead, which is how TankModify built them, relative to the heading at the start of the path.
+    """
+
+    def __init__(self, path, reverse):
+        sign = -1 if reverse else 1
+        left = sign * FEET_PER_TICK * np.asarray(path["left"].position, dtype=np.float64)
+        right = sign * FEET_PER_TICK * np.asarray(path["right"].position, dtype=np.float64)
+        left -= left[0]
+        right -= right[0]
+        theta = (right - left) / ROBOT_WHEELBASE_FT
+
+        # Assume all of the points have the same duration as the first, the same as the motion profile controller
+        self.dt = path["left"].duration[0] / 1000
+        self.duration = self.dt * (len(left) - 1)
+        t = np.arange(len(left)) * self.dt
+
+        center = (left + right) / 2
+        ds = np.diff(center, prepend=center[0])
+        midTheta = theta - np.diff(theta, prepend=theta[0]) / 2
+        x = np.cumsum(ds * np.cos(midTheta))
+        y = np.cumsum(ds * np.sin(midTheta))
+        v = np.gradient(center, t) if len(t) > 1 else np.zeros(1)
+        omega = np.gradient(theta, t) if len(t) > 1 else np.zeros(1)
+        leftAcceleration = np.gradient(np.gradient(left, t), t) if len(t) > 1 else np.zeros(1)
+        rightAcceleration = np.gradient(np.gradient(right, t), t) if len(t) > 1 else np.zeros(1)
+
+        # One row per point, plus a copy of the last row so the interpolation never reads past the end
+        self.table = np.column_stack((x, y, theta, v, omega, leftAcceleration, rightAcceleration))
+        self.table = np.vstack((self.table, self.table[-1:]))
+        self.lastIndex = len(left) - 1
+
+    def sample(self, t):
+        """
+        This method will return the reference row (see REFERENCE_COLUMNS) at t seconds into the path.
+        """
+        position = min(max(t / self.dt, 0.0), self.lastIndex)
+        index = int(position)
+        fraction = position - index
+        return self.table[index] + fraction * (self.table[index + 1] - self.table[index])
+
+
+def LoadRamseteReference(path, reverse):
+    """
+    This function will return the RamseteReference of a path, built once and then shared through the asset store.
+    """
+    return ASSET_STORE.getDerived(("RamseteReference", path["left"], path["right"], reverse), lambda: RamseteReference(path, reverse))
+
+
+def FeedForwardVoltage(left_side, velocity, acceleration):
+    """
+    This function will return the voltage needed for a wheel velocity (ft/s) and acceleration (ft/s^2).  It is the same model used to build the
+    feed-forward of the motion profile paths (see functions.CalculateFeedForwardVoltage), with the intercept following the direction of travel.
+    """
+    if left_side:
+        kV, kA, VIntercept = DRIVETRAIN_LEFT_KV, DRIVETRAIN_LEFT_KA, DRIVETRAIN_LEFT_V_INTERCEPT
+    else:
+        kV, kA, VIntercept = DRIVETRAIN_RIGHT_KV, DRIVETRAIN_RIGHT_KA, DRIVETRAIN_RIGHT_V_INTERCEPT
+    if abs(velocity) < 1e-3:
+        VIntercept = 0.0
+    return kV * velocity + kA * acceleration + math.copysign(VIntercept, velocity)
+
+
+class RamseteController():
+    """
+    This controller follows a drivetrain path on the RoboRIO instead of streaming it to the Talon MPEs.  On every notifier callback it updates
+    the robot pose from the encoders and the Pigeon yaw, runs the Ramsete tracking law against the reference pose, and drives each side with the
+    wheel velocity feed-forward plus a proportional velocity correction.  The outputs are sent as percent output with the Talon's 12V voltage
+    compensation, since this version of the Talon API has no arbitrary feed-forward for velocity mode.  Position and heading errors that build
+    up along the path are corrected, which the MPE can't do.
+
+    Ramsete: https://www.dis.uniroma1.it/~labrob/pub/papers/Ramsete01.pdf (equation 5.12)
+    """
+
+    PERIOD_MS = 10
+    B = 2.0 * 0.3048 ** 2       # rad^2 / ft^2, the usual 2.0 rad^2 / m^2 in feet
+    ZETA = 0.7
+    KP_VELOCITY = 0.5           # V / ft/s of wheel velocity error
+    COMPENSATION_VOLTAGE = 12.0
+
+    def __init__(self, drive_train, reference):
+        self._driveTrain = drive_train
+        self._leftTalon = drive_train.leftTalon
+        self._rightTalon = drive_train.rightTalon
+        self._reference = reference
+        self._finished = True
+
+        # An _update already running on the notifier thread when stop() is called still finishes, so the outputs are only set under the lock
+        # and not at all once stopped
+        self._outputLock = threading.Lock()
+        self._stopped = True
+        self._resetStats()
+
+    def start(self):
+        """
+        This method is called by a command to begin following the path.  The encoder positions and the yaw are zero'd here, since the
+        reference heading is relative to the start of the path.
+        """
+        self._startLeft = self._leftTalon.getSelectedSensorPosition(0)
+        self._startRight = self._rightTalon.getSelectedSensorPosition(0)
+        self._startYaw = self._driveTrain.getYaw()
+        self._lastLeft = 0.0
+        self._lastRight = 0.0
+        self._theta = 0.0
+        self._x = 0.0
+        self._y = 0.0
+        self._finished = False
+        self._stopped = False
+        self._resetStats()
+        self._startTime = Timer.getFPGATimestamp()
+        NOTIFIER_SCHEDULER.register(self._update, self.PERIOD_MS)
+
+    def isFinished(self):
+        """
+        This method is called by a command to know when this controller is finished.
+        """
+        return self._finished
+
+    def control(self):
+        """
+        This method is called by the command every 20ms.  The tracking runs on the notifier, so there is nothing to do here.
+        """
+        pass
+
+    def stop(self):
+        """
+        This method will stop following the path and stop the motors.  It is called by the command when it ends.
+        """
+        NOTIFIER_SCHEDULER.unregister(self._update)
+        with self._outputLock:
+            self._stopped = True
+            self._leftTalon.set(WPI_TalonSRX.ControlMode.PercentOutput, 0.0)
+            self._rightTalon.set(WPI_TalonSRX.ControlMode.PercentOutput, 0.0)
+
+    def getErrors(self):
+        """
+        This method will return the latest (along-track, cross-track, heading) errors in ft, ft and radians.
+        """
+        return self._errors
+
+    def getStats(self):
+        """
+        This method will return the tracking and CPU cost counters of the current run as a dictionary.
+        """
+        stats = dict(self._stats)
+        updates = max(stats["updates"], 1)
+        stats["rmsPositionError"] = math.sqrt(stats.pop("sumSquaredPositionError") / updates)
+        stats["meanUpdateMS"] = stats.pop("totalUpdateMS") / updates
+        return stats
+
+    def dump(self, name):
+        """
+        This method will log the tracking and CPU cost of the run.
+        """
+        stats = self.getStats()
+        stats["name"] = name
+        logger.info("%(name)s: %(updates)i updates, %(meanUpdateMS)1.3f ms mean / %(maxUpdateMS)1.3f ms max per update, position error "
+                    "%(rmsPositionError)1.3f ft rms / %(maxPositionError)1.3f ft max / %(finalPositionError)1.3f ft final, heading error "
+                    "%(maxHeadingError)1.1f deg max" % stats)
+
+    def _resetStats(self):
+        self._errors = (0.0, 0.0, 0.0)
+        self._stats = {"updates": 0,
+                       "totalUpdateMS": 0.0,
+                       "maxUpdateMS": 0.0,
+                       "sumSquaredPositionError": 0.0,
+                       "maxPositionError": 0.0,
+                       "finalPositionError": 0.0,
+                       "maxHeadingError": 0.0}
+
+    def _update(self):
+        """
+        The notifier callback.  Update the odometry, look up the reference, and set the motor outputs.
+        """
+        startTime = time.perf_counter()
+        t = Timer.getFPGATimestamp() - self._startTime
+
+        # Odometry: integrate the center distance along the average heading since the last update
+        left = (self._leftTalon.getSelectedSensorPosition(0) - self._startLeft) * FEET_PER_TICK
+        right = (self._rightTalon.getSelectedSensorPosition(0) - self._startRight) * FEET_PER_TICK
+        theta = math.radians(self._driveTrain.getYaw() - self._startYaw)
+        ds = ((left - self._lastLeft) + (right - self._lastRight)) / 2
+        midTheta = (theta + self._theta) / 2
+        self._x += ds * math.cos(midTheta)
+        self._y += ds * math.sin(midTheta)
+        self._theta = theta
+        self._lastLeft = left
+        self._lastRight = right
+
+        xRef, yRef, thetaRef, vRef, omegaRef, leftAcceleration, rightAcceleration = self._reference.sample(t).tolist()
+
+        # The error in the robot frame
+        cosTheta = math.cos(theta)
+        sinTheta = math.sin(theta)
+        dx = xRef - self._x
+        dy = yRef - self._y
+        eX = cosTheta * dx + sinTheta * dy
+        eY = -sinTheta * dx + cosTheta * dy
+        eTheta = math.atan2(math.sin(thetaRef - theta), math.cos(thetaRef - theta))
+        self._errors = (eX, eY, eTheta)
+
+        if t >= self._reference.duration:
+            self._finish(math.hypot(eX, eY))
+            return
+
+        # Ramsete tracking law
+        k = 2 * self.ZETA * math.sqrt(omegaRef * omegaRef + self.B * vRef * vRef)
+        sinc = math.sin(eTheta) / eTheta if abs(eTheta) > 1e-6 else 1.0
+        v = vRef * math.cos(eTheta) + k * eX
+        omega = omegaRef + k * eTheta + self.B * vRef * sinc * eY
+
+        # Wheel velocities, feed-forward and velocity correction.  The Talon velocity is in encoder units per 100ms.
+        leftVelocity = v - omega * ROBOT_WHEELBASE_FT / 2
+        rightVelocity = v + omega * ROBOT_WHEELBASE_FT / 2
+        leftMeasured = self._leftTalon.getSelectedSensorVelocity(0) * FEET_PER_TICK * 10
+        rightMeasured = self._rightTalon.getSelectedSensorVelocity(0) * FEET_PER_TICK * 10
+        leftVoltage = FeedForwardVoltage(True, leftVelocity, leftAcceleration) + self.KP_VELOCITY * (leftVelocity - leftMeasured)
+        rightVoltage = FeedForwardVoltage(False, rightVelocity, rightAcceleration) + self.KP_VELOCITY * (rightVelocity - rightMeasured)
+        with self._outputLock:
+            if self._stopped:
+                return
+            self._leftTalon.set(WPI_TalonSRX.ControlMode.PercentOutput, max(-1.0, min(1.0, leftVoltage / self.COMPENSATION_VOLTAGE)))
+            self._rightTalon.set(WPI_TalonSRX.ControlMode.PercentOutput, max(-1.0, min(1.0, rightVoltage / self.COMPENSATION_VOLTAGE)))
+
+        # Tracking and CPU cost counters
+        positionError = math.hypot(eX, eY)
+        updateMS = (time.perf_counter() - startTime) * 1000
+        self._stats["updates"] += 1
+        self._stats["totalUpdateMS"] += updateMS
+        self._stats["maxUpdateMS"] = max(self._stats["maxUpdateMS"], updateMS)
+        self._stats["sumSquaredPositionError"] += positionError * positionError
+        self._stats["maxPositionError"] = max(self._stats["maxPositionError"], positionError)
+        self._stats["maxHeadingError"] = max(self._stats["maxHeadingError"], abs(math.degrees(eTheta)))
+
+    def _finish(self, position_error):
+        logger.info("Ramsete controller is at the end of the path")
+        self._stats["finalPositionError"] = position_error
+        self.stop()
+        self._finished = True
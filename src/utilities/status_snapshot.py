@@ -0,0 +1,46 @@
+import time
+
+
+class StatusSnapshot():
+    """
+    A double-buffered snapshot of the motion profile status of a set of Talons, written by the notifier thread and read by the control loop
+    without a lock.  The writer fills the back buffer and then publishes it by flipping the front index, a single assignment.  The reader
+    copies the front buffer and checks nothing was published during the copy, so it never sees a buffer that is half written.  Only one thread may write.
+    """
+
+    def __init__(self, size):
+        self._buffers = ([None] * size, [None] * size)
+        self._front = 0
+        self._timestamps = [0.0, 0.0]
+
+        # Incremented on every publish, so the reader can tell whether a snapshot is new
+        self.sequence = 0
+
+    def back(self):
+        """
+        This method will return the buffer for the writer to fill in.
+        """
+        return self._buffers[1 - self._front]
+
+    def publish(self):
+        """
+        This method will make the back buffer the front buffer.
+        """
+        back = 1 - self._front
+        self._timestamps[back] = time.monotonic()
+        self._front = back
+        self.sequence += 1
+
+    def read(self):
+        """
+        This method will return a copy of the latest published statuses, the time they were published (time.monotonic), and their sequence
+        number.
+        """
+        # If the writer published while the copy was being made, it may have started on the buffer being copied, so copy again
+        while True:
+            sequence = self.sequence
+            front = self._front
+            statuses = tuple(self._buffers[front])
+            timestamp = self._timestamps[front]
+            if sequence == self.sequence:
+                return statuses, timestamp, sequence
@@ -0,0 +1,275 @@
+#!/usr/bin/env python3
+"""
+A software stand-in for the motion profile executor (MPE) of a Talon SRX, so the motion profile controllers can be run and benchmarked on a PC
+without the robot.  The emulator models the API top buffer, the 128 point bottom buffer in the Talon, processMotionProfileBuffer(), the point
+durations, the isLast/activePointValid flags, the underrun flags, and enabling/disabling the MPE in the MotionProfile and MotionProfileArc
+control modes.  The sensors follow the active trajectory point exactly, so the closed loop errors are always zero.
+
+To run a trajectory file through the MotionProfileController with emulated Talons and report the timing, run this from the src directory:
+
+    python -m utilities.talon_mp_emulator [--loop-ms 20] file.traj [file.traj ...]
+"""
+import argparse
+import collections
+import os
+import threading
+import time
+from ctre._impl.autogen.ctre_sim_enums import SetValueMotionProfile
+from ctre._impl.motionprofilestatus import MotionProfileStatus
+from ctre.wpi_talonsrx import WPI_TalonSRX
+from constants import LOGGER_LEVEL
+import logging
+logger = logging.getLogger(__name__)
+logger.setLevel(LOGGER_LEVEL)
+
+MOTION_PROFILE_MODES = (WPI_TalonSRX.ControlMode.MotionProfile, WPI_TalonSRX.ControlMode.MotionProfileArc)
+
+
+class TalonSRXEmulator():
+    """
+    An emulated Talon SRX with the motion profile part of the WPI_TalonSRX interface.  The executor is advanced from the clock every time the
+    emulator is used.  The clock defaults to time.monotonic, pass a different function returning seconds to run on simulated time.
+    """
+
+    TOP_BUFFER_CAPACITY = 2048
+    BTM_BUFFER_CAPACITY = 128
+
+    ControlMode = WPI_TalonSRX.ControlMode
+
+    def __init__(self, device_number=0, clock=time.monotonic):
+        self.deviceNumber = device_number
+        self._clock = clock
+        self._lock = threading.RLock()
+
+        self._topBuffer = collections.deque()
+        self._btmBuffer = collections.deque()
+        self._controlMode = WPI_TalonSRX.ControlMode.PercentOutput
+        self._outputEnable = SetValueMotionProfile.Disable
+        self._activePoint = None
+        self._nextShiftTime = 0.0
+        self._basePeriodMS = 0
+        self._isUnderrun = False
+        self._hasUnderrun = False
+        self._position = 0.0
+        self._positionOffset = 0.0
+
+        # Counters for benchmarking
+        self.motionControlFramePeriodMS = None
+        self.pushCnt = 0
+        self.processCnt = 0
+        self.underrunCnt = 0
+
+    def set(self, mode, value):
+        with self._lock:
+            self._update()
+            self._controlMode = mode
+            if mode not in MOTION_PROFILE_MODES:
+                self._setOutputEnable(SetValueMotionProfile.Disable)
+            else:
+                self._setOutputEnable(SetValueMotionProfile(int(value)))
+
+    def getControlMode(self):
+        return self._controlMode
+
+    def changeMotionControlFramePeriod(self, period_ms):
+        self.motionControlFramePeriodMS = period_ms
+
+    def configMotionProfileTrajectoryPeriod(self, duration_ms, timeout_ms=0):
+        self._basePeriodMS = duration_ms
+
+    def pushMotionProfileTrajectory(self, point):
+        with self._lock:
+            if len(self._topBuffer) >= self.TOP_BUFFER_CAPACITY:
+                return False
+            self._topBuffer.append(point)
+            self.pushCnt += 1
+            return True
+
+    def processMotionProfileBuffer(self):
+        """
+        Move one point from the top buffer into the bottom buffer, the same as the Talon API does.
+        """
+        with self._lock:
+            self._update()
+            if self._topBuffer and len(self._btmBuffer) < self.BTM_BUFFER_CAPACITY:
+                self._btmBuffer.append(self._topBuffer.popleft())
+                self.processCnt += 1
+            self._update()
+
+    def clearMotionProfileTrajectories(self):
+        with self._lock:
+            self._update()
+            self._topBuffer.clear()
+            self._btmBuffer.clear()
+
+    def clearMotionProfileHasUnderrun(self, timeout_ms=0):
+        with self._lock:
+            self._update()
+            self._hasUnderrun = False
+
+    def getMotionProfileTopLevelBufferCount(self):
+        with self._lock:
+            return len(self._topBuffer)
+
+    def isMotionProfileTopLevelBufferFull(self):
+        with self._lock:
+            return len(self._topBuffer) >= self.TOP_BUFFER_CAPACITY
+
+    def getMotionProfileStatus(self):
+        with self._lock:
+            self._update()
+            active = self._activePoint
+            return MotionProfileStatus(self.TOP_BUFFER_CAPACITY - len(self._topBuffer),
+                                       len(self._topBuffer),
+                                       len(self._btmBuffer),
+                                       self._hasUnderrun,
+                                       self._isUnderrun,
+                                       active is not None,
+                                       active is not None and active.isLastPoint,
+                                       active.profileSlotSelect0 if active is not None else 0,
+                                       active.profileSlotSelect1 if active is not None else 0,
+                                       self._outputEnable,
+                                       self._getDurationMS(active) if active is not None else 0)
+
+    def getActiveTrajectoryPosition(self):
+        with self._lock:
+            self._update()
+            return self._activePoint.position if self._activePoint is not None else 0
+
+    def getActiveTrajectoryVelocity(self):
+        with self._lock:
+            self._update()
+            return self._activePoint.velocity if self._activePoint is not None else 0
+
+    def getActiveTrajectoryHeading(self):
+        with self._lock:
+            self._update()
+            return self._activePoint.headingDeg if self._activePoint is not None else 0
+
+    # The PID index is required, the same as the WPI_TalonSRX getters, so a getter registered without one fails here too
+    def getClosedLoopTarget(self, pid_idx):
+        return self.getActiveTrajectoryPosition()
+
+    def getClosedLoopError(self, pid_idx):
+        return 0
+
+    def getSelectedSensorPosition(self, pid_idx):
+        with self._lock:
+            self._update()
+            return int(self._position - self._positionOffset)
+
+    def getSelectedSensorVelocity(self, pid_idx):
+        return int(self.getActiveTrajectoryVelocity())
+
+    def getSensorCollection(self):
+        return self
+
+    # The sensor collection getters used by the commands
+    def getQuadraturePosition(self):
+        return self.getSelectedSensorPosition(0)
+
+    def getAnalogInRaw(self):
+        return self.getSelectedSensorPosition(0)
+
+    def getAnalogInVel(self):
+        return self.getSelectedSensorVelocity(0)
+
+    def _setOutputEnable(self, value):
+        if value == SetValueMotionProfile.Enable and self._outputEnable != SetValueMotionProfile.Enable:
+            self._nextShiftTime = self._clock()
+        elif value == SetValueMotionProfile.Disable:
+            self._activePoint = None
+            self._isUnderrun = False
+        self._outputEnable = value
+
+    def _getDurationMS(self, point):
+        return self._basePeriodMS + int(point.timeDur)
+
+    def _update(self):
+        """
+        Advance the executor to the current time.  Each time the active point's duration runs out, the next point is shifted in from the bottom
+        buffer.  The executor holds on a point flagged as the last point, and it is in underrun if the bottom buffer is empty when a point is
+        needed.
+        """
+        if self._outputEnable != SetValueMotionProfile.Enable:
+            return
+        now = self._clock()
+        while now >= self._nextShiftTime:
+            if self._activePoint is not None and self._activePoint.isLastPoint:
+                break
+            if not self._btmBuffer:
+                if not self._isUnderrun:
+                    self.underrunCnt += 1
+                self._isUnderrun = True
+                self._hasUnderrun = True
+                break
+
+            # Pick up from the current time after an underrun instead of racing through the late points
+            if self._isUnderrun:
+                self._nextShiftTime = now
+                self._isUnderrun = False
+            self._activePoint = self._btmBuffer.popleft()
+            if self._activePoint.zeroPos:
+                self._positionOffset = self._position
+            self._position = self._positionOffset + self._activePoint.position
+            self._nextShiftTime += max(self._getDurationMS(self._activePoint), 1) / 1000
+
+
+def RunMotionProfile(controller, loop_period=0.02, timeout=60.0):
+    """
+    This function will start the controller and call control() every loop period, the same as a command would, until the controller is
+    finished.  Returns the wall time and the number of loops.
+    """
+    controller.start()
+    start = time.monotonic()
+    loops = 0
+    while not controller.isFinished():
+        controller.control()
+        loops += 1
+        elapsed = time.monotonic() - start
+        if elapsed > timeout:
+            logger.warning("Motion profile did not finish in %1.1fs" % (timeout))
+            break
+        time.sleep(max(0.0, start + loops * loop_period - time.monotonic()))
+    controller.stop()
+    return time.monotonic() - start, loops
+
+
+def main():
+    from utilities.motion_profile_controller import MotionProfileController
+    from utilities.motion_profile_recorder import RECORDING_WRITER
+    from utilities.trajectory_file import LoadTrajectoryFile, TrajectoryFile
+    from utilities.trajectory_points import LoadTrajectoryPoints
+
+    parser = argparse.ArgumentParser(description="Run trajectory files through the motion profile controller with emulated Talons.")
+    parser.add_argument("files", nargs="+", help="the .traj files to run")
+    parser.add_argument("--loop-ms", type=float, default=20.0, help="the command loop period (default: 20ms)")
+    args = parser.parse_args()
+    logging.basicConfig(level=LOGGER_LEVEL)
+
+    for fileName in args.files:
+        path = LoadTrajectoryFile(fileName)
+        if isinstance(path, TrajectoryFile):
+            names = ("Left", "Right")
+            points = (LoadTrajectoryPoints(path["left"], False, 0, 1),
+                      LoadTrajectoryPoints(path["right"], False, 0, 1, heading_points=path["left"]))
+            mode = WPI_TalonSRX.ControlMode.MotionProfileArc
+        else:
+            names = ("Boom",)
+            points = (LoadTrajectoryPoints(path, False, 0, 0),)
+            mode = WPI_TalonSRX.ControlMode.MotionProfile
+        talons = [TalonSRXEmulator(i) for i in range(len(names))]
+        controller = MotionProfileController(talons, points, mode, names)
+
+        wallTime, loops = RunMotionProfile(controller, args.loop_ms / 1000)
+        pathTime = sum(int(point.timeDur) for point in points[0]) / 1000
+        print("%s: %i points, path %1.2fs, run %1.2fs (%1.2fs overhead) in %i loops, %i underruns" %
+              (os.path.basename(fileName), len(points[0]), pathTime, wallTime, wallTime - pathTime, loops,
+               sum(talon.underrunCnt for talon in talons)))
+        print("    %s" % (controller.getStreamStats()))
+        controller.getRecorder().dump(os.path.splitext(os.path.basename(fileName))[0])
+    RECORDING_WRITER.flush()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,162 @@
+from wpilib.smartdashboard import SmartDashboard
+from constants import LOGGER_LEVEL
+import logging
+logger = logging.getLogger(__name__)
+logger.setLevel(LOGGER_LEVEL)
+
+
+class TelemetryFrame():
+    """
+    The telemetry of one subsystem.  The channels are registered once, as (name, getter, decimation) tuples, and every call to update() samples
+    the channels that are due and publishes the whole frame as one number array on the SmartDashboard.  A channel with a decimation of N is
+    sampled every Nth update and keeps its last value in between.  The channel names are published once, as a string array under the frame
+    name plus "Names", so a client can unpack the frame.
+
+    The getters are called with the source passed to update(), so a frame can be registered at import time and shared by every instance of a
+    command.
+    """
+
+    def __init__(self, telemetry, name, channels):
+        self.name = name
+        self.names = tuple(channel[0] for channel in channels)
+        self._getters = tuple(channel[1] for channel in channels)
+        self._decimations = tuple(channel[2] if len(channel) > 2 else 1 for channel in channels)
+        self._values = [0.0] * len(self.names)
+        self._telemetry = telemetry
+        self._entry = None
+        self._tick = 0
+        self.publishCount = 0
+
+    def update(self, source):
+        """
+        This method is called from the control loop.  It does nothing while telemetry is disabled.
+        """
+        if not self._telemetry.enabled:
+            return
+
+        tick = self._tick
+        self._tick += 1
+        sampled = False
+        for i, (getter, decimation) in enumerate(zip(self._getters, self._decimations)):
+            if tick % decimation == 0:
+                self._values[i] = getter(source)
+                sampled = True
+        if sampled:
+            self._publish()
+
+    def _publish(self):
+        # In packed mode the values are published with all of the other frames by Telemetry.periodic()
+        if self._telemetry.packed:
+            self._telemetry.published = True
+            return
+        if self._entry is None:
+            self._entry = SmartDashboard.getEntry(self.name)
+            SmartDashboard.getEntry(self.name + "Names").setStringArray(self.names)
+        self._entry.setDoubleArray(self._values)
+        self.publishCount += 1
+        self._telemetry.published = True
+
+
+class Telemetry():
+    """
+    The telemetry published to the SmartDashboard for debugging and for the data logger.  Each subsystem registers a TelemetryFrame once and
+    updates it from its control loop.  Telemetry can be switched on and off at runtime from the SmartDashboard (SWITCH_KEY), and a disabled
+    frame update is a single attribute check.  Use the TELEMETRY instance below instead of creating a new one.
+
+    periodic() is called once per robot loop, after the commands have run.  It reads the switches and, if any frame was published during the
+    loop, publishes the loop's TimeStamp, which the data logger uses to know a loop's frames are complete.
+
+    NetworkTables doesn't update keys together, so a logger reading the frames when TimeStamp changes can mix values from different loops.
+    In packed mode (PACKED_KEY) the frames are not published on their own.  Instead periodic() publishes one number array per loop,
+    PACKED_FRAME_KEY, holding the TimeStamp followed by the channels of every frame in the order they were registered.  The channel names
+    are under PACKED_FRAME_KEY plus "Names".  Frames not updated during a loop repeat their last values.
+    """
+
+    SWITCH_KEY = "Telemetry"
+    PACKED_KEY = "TelemetryPacked"
+    PACKED_FRAME_KEY = "TelemetryFrame"
+
+    def __init__(self, enabled=False, packed=False):
+        self.enabled = enabled
+        self.packed = packed
+        self.published = False
+        self._frames = {}
+        self._switchEntry = None
+        self._packedSwitchEntry = None
+        self._timeStampEntry = None
+        self._packedEntry = None
+        self._packedValues = [0.0]
+        self._packedNamesPublished = False
+
+    def register(self, name, channels):
+        """
+        This method will create the frame for a subsystem.  The name is the SmartDashboard key of the frame and must be unique.
+        """
+        if name in self._frames:
+            raise ValueError("Telemetry frame %s is already registered" % (name))
+        frame = TelemetryFrame(self, name, channels)
+        self._frames[name] = frame
+        self._packedValues = [0.0] * (1 + sum(len(frame.names) for frame in self._frames.values()))
+        self._packedNamesPublished = False
+        return frame
+
+    def getFrames(self):
+        return dict(self._frames)
+
+    def setEnabled(self, enabled):
+        """
+        This method will switch the telemetry on or off.
+        """
+        enabled = bool(enabled)
+        if enabled != self.enabled:
+            logger.info("Telemetry %s" % ("enabled" if enabled else "disabled"))
+            self.enabled = enabled
+
+    def setPacked(self, packed):
+        """
+        This method will switch packed mode on or off.
+        """
+        packed = bool(packed)
+        if packed != self.packed:
+            logger.info("Telemetry packed mode %s" % ("on" if packed else "off"))
+            self.packed = packed
+
+    def periodic(self, time_stamp):
+        """
+        This method is called once per robot loop with the robot timer.
+        """
+        if self._switchEntry is None:
+            self._switchEntry = SmartDashboard.getEntry(self.SWITCH_KEY)
+            self._switchEntry.setDefaultBoolean(self.enabled)
+            self._packedSwitchEntry = SmartDashboard.getEntry(self.PACKED_KEY)
+            self._packedSwitchEntry.setDefaultBoolean(self.packed)
+            self._timeStampEntry = SmartDashboard.getEntry("TimeStamp")
+            self._packedEntry = SmartDashboard.getEntry(self.PACKED_FRAME_KEY)
+        self.setEnabled(self._switchEntry.getBoolean(self.enabled))
+        self.setPacked(self._packedSwitchEntry.getBoolean(self.packed))
+
+        if not self.published:
+            return
+        self.published = False
+        if not self.packed:
+            self._timeStampEntry.setDouble(time_stamp)
+            return
+
+        # Copy every frame into the packed values and publish them as one entry
+        if not self._packedNamesPublished:
+            names = ["TimeStamp"]
+            for frame in self._frames.values():
+                names.extend(frame.names)
+            SmartDashboard.getEntry(self.PACKED_FRAME_KEY + "Names").setStringArray(names)
+            self._packedNamesPublished = True
+        values = self._packedValues
+        values[0] = time_stamp
+        offset = 1
+        for frame in self._frames.values():
+            values[offset:offset + len(frame.names)] = frame._values
+            offset += len(frame.names)
+        self._packedEntry.setDoubleArray(values)
+
+
+# Telemetry starts on when debugging, the same as the old LOGGER_LEVEL switch, and can then be changed from the SmartDashboard
+TELEMETRY = Telemetry(LOGGER_LEVEL == logging.DEBUG)
@@ -0,0 +1,263 @@
+#!/usr/bin/env python3
+"""
+A recorder that samples the registered telemetry channels on the shared notifier and saves them on the RoboRIO, so nothing is lost when the
+NetworkTables connection to the data logger drops.  The samples go into a preallocated ring buffer and a background thread writes them out, so
+the notifier callback only ever writes into memory and the robot loops never touch the file.
+
+Log file layout (little-endian):
+
+    Header      magic "FRCL", version (uint16), channel count (uint16), sample period in ms (uint16), reserved (uint16), start time (float64)
+    Names       channel count * 24 bytes, ASCII and zero padded.  The first channel is always "Time".
+    Rows        one float32 per channel, until the end of the file.  Time is in seconds from the start time (FPGA timestamp).
+
+To convert a log into a CSV file the data logger plotter can open, run this from the src directory:
+
+    python -m utilities.telemetry_recorder file.tlog ...
+"""
+import argparse
+import array
+import os
+import struct
+import sys
+import threading
+from time import strftime
+from wpilib.timer import Timer
+from utilities.notifier_scheduler import NOTIFIER_SCHEDULER
+from constants import LOGGER_LEVEL, TELEMETRY_RECORDING_PATH
+import logging
+logger = logging.getLogger(__name__)
+logger.setLevel(LOGGER_LEVEL)
+
+MAGIC = b"FRCL"
+VERSION = 1
+HEADER = struct.Struct("<4sHHHHd")
+NAME_SIZE = 24
+FILE_EXTENSION = ".tlog"
+
+
+class TelemetryRecorder():
+    """
+    Records the registered channels every SAMPLE_PERIOD_MS while started, one log file per start (a match is started in autonomousInit and
+    stopped in disabledInit).  The ring buffer holds CAPACITY rows.  The notifier callback is the only writer and the flush thread is the only
+    reader, so the rows are copied to the file outside of the lock and the lock only guards the row counts.  If the flush thread falls a whole
+    buffer behind, new rows are dropped and counted rather than blocking the notifier.  Use the TELEMETRY_RECORDER instance below instead of
+    creating a new recorder.
+    """
+
+    SAMPLE_PERIOD_MS = 10
+    CAPACITY = 2048
+    FLUSH_PERIOD_S = 0.5
+    CLOSE_TIMEOUT_S = 1.0
+
+    def __init__(self, path=TELEMETRY_RECORDING_PATH):
+        self.path = path
+        self._names = ["Time"]
+        self._getters = []
+        self._sessionGetters = ()
+        self._failedChannels = set()
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._closed = threading.Event()
+        self._closed.set()
+        self._thread = None
+
+        # The ring buffer and the session.  These are replaced by start() when the channels have changed.
+        self._ring = array.array("f")
+        self._width = 0
+        self._writeRow = 0
+        self._readRow = 0
+        self._count = 0
+        self._startTime = 0.0
+        self._recording = False
+        self._fileName = None
+        self._file = None
+        self.rows = 0
+        self.droppedRows = 0
+
+    def register(self, name, getter):
+        """
+        This method will add a channel.  The getter is called with no arguments on the notifier thread and must return a number.  Channels
+        registered while recording are picked up by the next start().
+        """
+        if name in self._names:
+            raise ValueError("Telemetry channel %s is already registered" % (name))
+        if len(name.encode("ascii")) > NAME_SIZE:
+            raise ValueError("Telemetry channel name %s is longer than %i characters" % (name, NAME_SIZE))
+        self._names.append(name)
+        self._getters.append(getter)
+
+    def isRecording(self):
+        return self._recording
+
+    def start(self, name):
+        """
+        This method will start recording into a new log file.  The file name is the date and time plus the name.  Does nothing if there is
+        no recording path or the recorder is already recording.
+        """
+        if self.path is None or self._recording:
+            return
+
+        # The flush thread may still be writing out the last log if this is a quick restart
+        if not self._closed.wait(self.CLOSE_TIMEOUT_S):
+            logger.warning("The last telemetry log is still being written, not recording")
+            return
+
+        # Size the ring for the registered channels.  This is the only allocation, the samples are written in place after this.
+        with self._lock:
+            width = len(self._names)
+            if width != self._width:
+                self._ring = array.array("f", bytes(4 * width * self.CAPACITY))
+                self._width = width
+            self._sessionGetters = tuple(self._getters[:width - 1])
+            self._writeRow = 0
+            self._readRow = 0
+            self._count = 0
+            self.rows = 0
+            self.droppedRows = 0
+            self._failedChannels.clear()
+            self._startTime = Timer.getFPGATimestamp()
+            self._fileName = os.path.join(self.path, "%s-%s%s" % (strftime("%Y%m%d-%H%M%S"), name, FILE_EXTENSION))
+            self._closed.clear()
+            self._recording = True
+
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="TelemetryRecorder", daemon=True)
+            self._thread.start()
+        NOTIFIER_SCHEDULER.register(self._sample, self.SAMPLE_PERIOD_MS)
+        logger.info("Recording %i telemetry channels to %s" % (width - 1, self._fileName))
+
+    def stop(self):
+        """
+        This method will stop recording.  The flush thread writes out the rest of the rows and closes the file.
+        """
+        if not self._recording:
+            return
+        NOTIFIER_SCHEDULER.unregister(self._sample)
+        self._recording = False
+        self._wakeup.set()
+
+    def _sample(self):
+        """
+        The notifier callback.  Sample every channel straight into the next free row of the ring buffer.  A channel whose getter raises
+        is recorded as NaN, and the first exception of each channel is logged once per log file.  Only the channels of this log file are
+        sampled, so a channel registered while recording never changes the width of the rows.
+        """
+        with self._lock:
+            if self._count >= self.CAPACITY:
+                self.droppedRows += 1
+                return
+            offset = self._writeRow * self._width
+
+        ring = self._ring
+        ring[offset] = Timer.getFPGATimestamp() - self._startTime
+        for i, getter in enumerate(self._sessionGetters, offset + 1):
+            try:
+                ring[i] = getter()
+            except Exception:
+                ring[i] = float("nan")
+                channel = i - offset
+                if channel not in self._failedChannels:
+                    self._failedChannels.add(channel)
+                    logger.exception("Telemetry channel %s failed, recording NaN" % (self._names[channel]))
+
+        with self._lock:
+            self._writeRow = (self._writeRow + 1) % self.CAPACITY
+            self._count += 1
+            self.rows += 1
+
+    def _run(self):
+        """
+        The flush thread.  Write out the rows every FLUSH_PERIOD_S and close the file once recording has stopped.
+        """
+        while True:
+            self._wakeup.wait(self.FLUSH_PERIOD_S)
+            self._wakeup.clear()
+            self._flush()
+            if not self._recording and not self._closed.is_set():
+                if self._file is not None:
+                    self._file.close()
+                    self._file = None
+                logger.info("Recorded %i telemetry rows to %s, %i dropped" % (self.rows, self._fileName, self.droppedRows))
+                self._closed.set()
+
+    def _flush(self):
+        with self._lock:
+            count = self._count
+            readRow = self._readRow
+        if count == 0:
+            return
+
+        # The rows between the read row and the write row are never touched by the notifier, so they can be written without the lock
+        try:
+            if self._file is None:
+                os.makedirs(self.path, exist_ok=True)
+                self._file = open(self._fileName, "wb")
+                self._writeHeader(self._file)
+            ring = memoryview(self._ring)
+            firstRows = min(count, self.CAPACITY - readRow)
+            self._file.write(ring[readRow * self._width:(readRow + firstRows) * self._width])
+            if count > firstRows:
+                self._file.write(ring[:(count - firstRows) * self._width])
+            self._file.flush()
+        except OSError:
+            logger.exception("Unable to write the telemetry log, recording stopped")
+            self.path = None
+            self.stop()
+
+        with self._lock:
+            self._readRow = (readRow + count) % self.CAPACITY
+            self._count -= count
+
+    def _writeHeader(self, fp):
+        names = self._names[:self._width]
+        fp.write(HEADER.pack(MAGIC, VERSION, len(names), self.SAMPLE_PERIOD_MS, 0, self._startTime))
+        for name in names:
+            fp.write(name.encode("ascii").ljust(NAME_SIZE, b"\0"))
+
+
+def ReadTelemetryLog(file_name):
+    """
+    This function will read a telemetry log and return the channel names and a list of rows.
+    """
+    with open(file_name, "rb") as fp:
+        data = fp.read()
+    magic, version, channelCount, _, _, _ = HEADER.unpack_from(data, 0)
+    if magic != MAGIC:
+        raise ValueError("%s is not a telemetry log" % (file_name))
+    if version != VERSION:
+        raise ValueError("%s is telemetry log version %i, expected version %i" % (file_name, version, VERSION))
+
+    offset = HEADER.size
+    names = []
+    for _ in range(channelCount):
+        names.append(data[offset:offset + NAME_SIZE].rstrip(b"\0").decode("ascii"))
+        offset += NAME_SIZE
+
+    # A log cut short by a power loss can end part way through a row
+    rowSize = 4 * channelCount
+    end = offset + (len(data) - offset) // rowSize * rowSize
+    values = array.array("f", data[offset:end])
+    if sys.byteorder != "little":
+        values.byteswap()
+    return names, [values[i:i + channelCount].tolist() for i in range(0, len(values), channelCount)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Convert telemetry logs into CSV files.")
+    parser.add_argument("files", nargs="+", help="telemetry log files")
+    args = parser.parse_args()
+
+    for fileName in args.files:
+        names, rows = ReadTelemetryLog(fileName)
+        csvFileName = os.path.splitext(fileName)[0] + ".csv"
+        with open(csvFileName, "w") as fp:
+            fp.write(",".join(names) + "\n")
+            for row in rows:
+                fp.write(",".join("%g" % (value) for value in row) + "\n")
+        print("%s: %i rows of %i channels" % (csvFileName, len(rows), len(names)))
+
+
+TELEMETRY_RECORDER = TelemetryRecorder()
+
+if __name__ == "__main__":
+    main()
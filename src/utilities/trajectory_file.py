@@ -0,0 +1,223 @@
+#!/usr/bin/env python3
+"""
+The trajectory file format used for the drivetrain paths and boom motion profiles.  The files are memory-mapped by the robot code and the points
+are read straight out of the file, so nothing needs to be deserialized when a path is loaded.
+
+Layout (little-endian):
+
+    Header      magic "FRCT", version (uint16), flags (uint16), side count (uint16), reserved (uint16), point count (uint32)
+    Side names  side count * 16 bytes, ASCII and zero padded
+    Columns     for each side: position (float32 * points), velocity or feed-forward (float32 * points), heading (float32 * points),
+                duration in ms (int16 * points), zero padded to a multiple of 4 bytes
+
+A path with left and right sides reads back like the old {"left": [...], "right": [...]} pickles and a single-axis motion profile reads back like
+the old list of [position, velocity, heading, duration] points.  To convert the old pickle files, run this from the src directory:
+
+    python -m utilities.trajectory_file [--remove] [directory ...]
+"""
+import argparse
+import array
+import mmap
+import os
+import pickle
+import struct
+import sys
+
+MAGIC = b"FRCT"
+VERSION = 1
+HEADER = struct.Struct("<4sHHHHI")
+SIDE_NAME_SIZE = 16
+FLAG_SINGLE_AXIS = 0x0001
+SINGLE_AXIS_SIDE = "profile"
+FILE_EXTENSION = ".traj"
+
+
+def _columnSize(count):
+    """
+    The size of one side's columns in bytes.  Three float32 columns, one int16 column, and padding to keep the next side aligned.
+    """
+    size = count * (3 * 4 + 2)
+    return size + (-size % 4)
+
+
+class TrajectorySide():
+    """
+    A read-only sequence of (position, velocity, heading, duration) points for one side of a path.  The columns are views into the file, so
+    indexing a point does not copy or deserialize the rest of the path.
+    """
+
+    def __init__(self, buffer, offset, count):
+        floatSize = 4 * count
+        self.position = self._column(buffer[offset:offset + floatSize], "f")
+        self.velocity = self._column(buffer[offset + floatSize:offset + 2 * floatSize], "f")
+        self.heading = self._column(buffer[offset + 2 * floatSize:offset + 3 * floatSize], "f")
+        self.duration = self._column(buffer[offset + 3 * floatSize:offset + 3 * floatSize + 2 * count], "h")
+
+    @staticmethod
+    def _column(buffer, type_code):
+        if sys.byteorder == "little":
+            return buffer.cast(type_code)
+
+        # Big-endian hosts get a byte swapped copy instead of a view
+        column = array.array(type_code, buffer.tobytes())
+        column.byteswap()
+        return column
+
+    def __len__(self):
+        return len(self.position)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        return (self.position[index], self.velocity[index], self.heading[index], self.duration[index])
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self[i]
+
+    def release(self):
+        """
+        This method will release the views into the file so it can be closed.
+        """
+        for column in (self.position, self.velocity, self.heading, self.duration):
+            if isinstance(column, memoryview):
+                column.release()
+
+
+class TrajectoryFile():
+    """
+    A memory-mapped trajectory file.  Index it by side name ("left", "right") to get a TrajectorySide.
+    """
+
+    def __init__(self, file_name):
+        self.fileName = file_name
+        with open(file_name, "rb") as fp:
+            self._mmap = mmap.mmap(fp.fileno(), 0, access=mmap.ACCESS_READ)
+        self._buffer = memoryview(self._mmap)
+
+        magic, version, self.flags, sideCount, _, self.pointCount = HEADER.unpack_from(self._buffer, 0)
+        if magic != MAGIC:
+            self.close()
+            raise ValueError("%s is not a trajectory file" % (file_name))
+        if version != VERSION:
+            self.close()
+            raise ValueError("%s is trajectory file version %i, expected version %i" % (file_name, version, VERSION))
+
+        self.sides = {}
+        offset = HEADER.size
+        names = []
+        for _ in range(sideCount):
+            names.append(bytes(self._buffer[offset:offset + SIDE_NAME_SIZE]).rstrip(b"\0").decode("ascii"))
+            offset += SIDE_NAME_SIZE
+        for name in names:
+            self.sides[name] = TrajectorySide(self._buffer, offset, self.pointCount)
+            offset += _columnSize(self.pointCount)
+
+    @property
+    def size(self):
+        """
+        The size of the file in bytes.
+        """
+        return len(self._mmap)
+
+    def keys(self):
+        return self.sides.keys()
+
+    def __getitem__(self, name):
+        return self.sides[name]
+
+    def __contains__(self, name):
+        return name in self.sides
+
+    def __len__(self):
+        return len(self.sides)
+
+    def close(self):
+        """
+        This method will release the columns and unmap the file.  Any points still held by the caller are plain values and stay valid.
+        """
+        for side in getattr(self, "sides", {}).values():
+            side.release()
+        self._buffer.release()
+        self._mmap.close()
+
+
+def LoadTrajectoryFile(file_name):
+    """
+    This function will memory-map a trajectory file.  A drivetrain path is returned as the TrajectoryFile (index it with "left" and "right") and
+    a single-axis motion profile is returned as its TrajectorySide, the same shapes the old pickle files loaded as.
+    """
+    trajectoryFile = TrajectoryFile(file_name)
+    if trajectoryFile.flags & FLAG_SINGLE_AXIS:
+        return trajectoryFile[SINGLE_AXIS_SIDE]
+    return trajectoryFile
+
+
+def WriteTrajectoryFile(fp, path):
+    """
+    This function will write a path to an open binary file.  The path is either a dictionary of sides or a single-axis list of
+    [position, velocity, heading, duration] points.  Every side must have the same number of points.
+    """
+    flags = 0
+    if not isinstance(path, dict):
+        flags |= FLAG_SINGLE_AXIS
+        path = {SINGLE_AXIS_SIDE: path}
+
+    counts = set(len(points) for points in path.values())
+    if len(counts) > 1:
+        raise ValueError("Every side of a trajectory needs the same number of points")
+    count = counts.pop() if counts else 0
+
+    fp.write(HEADER.pack(MAGIC, VERSION, flags, len(path), 0, count))
+    for name in path:
+        encodedName = name.encode("ascii")
+        if len(encodedName) > SIDE_NAME_SIZE:
+            raise ValueError("Side name %s is longer than %i characters" % (name, SIDE_NAME_SIZE))
+        fp.write(encodedName.ljust(SIDE_NAME_SIZE, b"\0"))
+
+    for points in path.values():
+        columns = [array.array("f", (point[0] for point in points)),
+                   array.array("f", (point[1] for point in points)),
+                   array.array("f", (point[2] for point in points)),
+                   array.array("h", (int(point[3]) for point in points))]
+        for column in columns:
+            if sys.byteorder != "little":
+                column.byteswap()
+            column.tofile(fp)
+        fp.write(b"\0" * (_columnSize(count) - count * (3 * 4 + 2)))
+
+
+def ConvertPickleFile(file_name, remove=False):
+    """
+    This function will convert one of the old pickled path files into a trajectory file next to it and return the new file name.
+    """
+    with open(file_name, "rb") as fp:
+        path = pickle.load(fp)
+    trajectoryFileName = os.path.splitext(file_name)[0] + FILE_EXTENSION
+    with open(trajectoryFileName, "wb") as fp:
+        WriteTrajectoryFile(fp, path)
+    if remove:
+        os.remove(file_name)
+    return trajectoryFileName
+
+
+def main():
+    srcDir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    parser = argparse.ArgumentParser(description="Convert the pickled path files into trajectory files.")
+    parser.add_argument("directories", nargs="*", default=[os.path.join(srcDir, "autonomous"), os.path.join(srcDir, "commands")],
+                        help="directories to search for .pickle files (default: autonomous and commands)")
+    parser.add_argument("--remove", action="store_true", help="remove the .pickle files after converting them")
+    args = parser.parse_args()
+
+    for directory in args.directories:
+        for dirPath, _, fileNames in os.walk(directory):
+            for fileName in sorted(fileNames):
+                if fileName.endswith(".pickle"):
+                    pickleFileName = os.path.join(dirPath, fileName)
+                    pickleSize = os.path.getsize(pickleFileName)
+                    trajectoryFileName = ConvertPickleFile(pickleFileName, args.remove)
+                    print("%s: %i -> %i bytes" % (trajectoryFileName, pickleSize, os.path.getsize(trajectoryFileName)))
+
+
+if __name__ == "__main__":
+    main()
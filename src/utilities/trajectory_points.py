@@ -0,0 +1,72 @@
+from ctre.trajectorypoint import TrajectoryPoint
+from utilities.asset_store import ASSET_STORE
+from constants import LOGGER_LEVEL
+import logging
+logger = logging.getLogger(__name__)
+logger.setLevel(LOGGER_LEVEL)
+
+# The trajectory durations supported by the Talon MPE, in ms
+TRAJECTORY_DURATIONS = {0: TrajectoryPoint.TrajectoryDuration.T0ms,
+                        5: TrajectoryPoint.TrajectoryDuration.T5ms,
+                        10: TrajectoryPoint.TrajectoryDuration.T10ms,
+                        20: TrajectoryPoint.TrajectoryDuration.T20ms,
+                        30: TrajectoryPoint.TrajectoryDuration.T30ms,
+                        40: TrajectoryPoint.TrajectoryDuration.T40ms,
+                        50: TrajectoryPoint.TrajectoryDuration.T50ms,
+                        100: TrajectoryPoint.TrajectoryDuration.T100ms}
+DURATIONS_MS = {duration: ms for ms, duration in TRAJECTORY_DURATIONS.items()}
+
+
+def GetTrajectoryDuration(duration):
+    """
+    This function will return the trajectory duration enumeration for a duration in ms.
+    """
+    if duration in TRAJECTORY_DURATIONS:
+        return TRAJECTORY_DURATIONS[duration]
+    logger.warning("Unsupported duration %i" % (duration))
+    return TrajectoryPoint.TrajectoryDuration.T0ms
+
+
+def GetDurationMS(point):
+    """
+    This function will return the duration of a trajectory point in ms.
+    """
+    return DURATIONS_MS[point.timeDur]
+
+
+def BuildTrajectoryPoints(points, reverse, profile_slot_select0, profile_slot_select1, heading_points=None, zero_position=True):
+    """
+    This function will convert the [position, velocity, heading, duration] points of a path into the TrajectoryPoints pushed into the Talon MPE.
+    If the motion profile is meant to be run backwards, then the position target and the velocity/FF are negated.  The heading can be taken from
+    another set of points (the drivetrain uses the left side heading for both sides).  The first point zeroes the position unless zero_position
+    is False, which is used for points spliced onto a running motion profile.  The result is an immutable tuple which can be pushed into the
+    Talon as many times as needed.
+    """
+    if heading_points is None:
+        heading_points = points
+    sign = -1 if reverse else 1
+    lastIndex = len(points) - 1
+    return tuple(TrajectoryPoint(sign * point[0],                           # Position
+                                 sign * point[1],                           # Velocity / Feed-Forward
+                                 headingPoint[2],                           # Heading
+                                 profile_slot_select0,                      # PID0 slot index
+                                 profile_slot_select1,                      # PID1 slot index
+                                 i == lastIndex,                            # Last point flag
+                                 zero_position and i == 0,                  # Zero postion flag
+                                 GetTrajectoryDuration(point[3]))           # Duration
+                 for i, (point, headingPoint) in enumerate(zip(points, heading_points)))
+
+
+def LoadTrajectoryPoints(points, reverse, profile_slot_select0, profile_slot_select1, heading_points=None):
+    """
+    This function will return the TrajectoryPoints for a path (see BuildTrajectoryPoints).  The points are built once per path, direction and
+    PID slot selection and then shared through the asset store, so call this when the path is loaded rather than when it is run.
+    """
+    key = ("TrajectoryPoints", points, heading_points, reverse, profile_slot_select0, profile_slot_select1)
+    try:
+        hash(key)
+    except TypeError:
+        # Plain lists of points can't be shared, so just build them
+        return BuildTrajectoryPoints(points, reverse, profile_slot_select0, profile_slot_select1, heading_points)
+    return ASSET_STORE.getDerived(key, lambda: BuildTrajectoryPoints(points, reverse, profile_slot_select0, profile_slot_select1,
+                                                                     heading_points))